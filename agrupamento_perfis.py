@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agrupamento de perfis de aprendizagem (k-means sobre as médias de bloco)
+As regras fixas de gerar_perfil_basico deixam a maioria dos alunos como
+'Perfil Equilibrado'. Este job agrupa as 7 médias de bloco do questionário
+(lidas de VetorPerfilAluno) com k-means++ em NumPy, para a escola inteira ou
+para todos os alunos, e grava os centróides em ExecucaoAgrupamento /
+CentroidePerfil.
+
+- Cada centróide recebe um dos tipos de perfil já usados pelo sistema
+  (filtros do professor, perfis-alvo das trilhas), conforme os blocos em que
+  o grupo se destaca em relação à média da escola
+- Ao salvar o questionário, tipo_por_centroide escolhe o centróide mais
+  próximo da execução ativa (O(k)); sem agrupamento valem as regras fixas
+- relatorio_agrupamento mostra o tamanho dos grupos e a deriva entre
+  execuções (períodos letivos)
+
+Uso:
+    python agrupamento_perfis.py --executar [-k 6] [--escola dominio | --por-escola] [--aplicar]
+    python agrupamento_perfis.py --relatorio [--escola dominio]
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy.orm import selectinload
+
+from modelos import db, Aluno, VetorPerfilAluno, PerfilAprendizagem, ExecucaoAgrupamento, CentroidePerfil
+from alunos_similares import NUM_QUESTOES, DIMENSAO, escola_do_aluno
+from recomendacoes_trilhas import recalcular_recomendacoes
+from analytics_turma import registrar_mudancas_tipo
+
+K_PADRAO = int(os.environ.get('AGRUPAMENTO_K', 6))
+# Validade (s) dos centróides em cache usados na classificação ao salvar
+TTL_CENTROIDES = float(os.environ.get('AGRUPAMENTO_TTL', 300))
+INICIALIZACOES = 3
+MAX_ITERACOES = 100
+TOLERANCIA = 1e-4
+AMOSTRA_INICIAL = 20000  # pontos usados no k-means++
+MINIMO_ALUNOS_ESCOLA = 30
+
+NOMES_BLOCOS = ('Percepção Sensorial', 'Atenção e Foco', 'Comunicação', 'Organização',
+                'Aprendizagem', 'Interação Social', 'Criatividade')
+# Tipos de perfil e os blocos (1-7) que os caracterizam, como em gerar_perfil_basico
+TIPOS_PERFIL = (
+    ('Pensador Criativo', (5, 7)),
+    ('Organizador Metódico', (2, 4)),
+    ('Comunicador Social', (3, 6)),
+    ('Observador Detalhista', (1,)),
+)
+PERFIL_PADRAO = 'Perfil Equilibrado'
+# Destaque mínimo (pontos na escala 1-5 acima da média da escola) para nomear um grupo
+LIMIAR_DESTAQUE = 0.25
+
+
+def periodo_letivo(data=None):
+    """'2025.1' (jan-jun) ou '2025.2' (jul-dez)"""
+    data = data or datetime.utcnow()
+    return f'{data.year}.{1 if data.month <= 6 else 2}'
+
+
+# ===== DADOS =====
+
+def carregar_medias():
+    """(ids, médias de bloco 1-5 [n × 7], escolas) de todos os alunos com vetor gravado"""
+    ids, blobs, escolas = [], [], []
+    for aluno_id, vetor, email_escola in db.session.query(
+        VetorPerfilAluno.aluno_id, VetorPerfilAluno.vetor, Aluno.email_escola
+    ).join(Aluno, Aluno.id == VetorPerfilAluno.aluno_id).order_by(VetorPerfilAluno.aluno_id):
+        ids.append(aluno_id)
+        blobs.append(vetor)
+        escolas.append(escola_do_aluno(email_escola))
+    vetores = np.frombuffer(b''.join(blobs), dtype=np.float32).reshape(-1, DIMENSAO)
+    # O vetor guarda as médias em [0, 1]; o agrupamento usa a escala do questionário
+    medias = vetores[:, NUM_QUESTOES:].astype(np.float64) * 4 + 1
+    return np.asarray(ids, dtype=np.int64), medias, np.asarray(escolas, dtype=object)
+
+def listar_escolas(escolas, minimo=MINIMO_ALUNOS_ESCOLA):
+    valores, contagens = np.unique(escolas.astype(str), return_counts=True)
+    return [escola for escola, total in zip(valores.tolist(), contagens.tolist()) if escola and total >= minimo]
+
+
+# ===== K-MEANS =====
+
+def _distancias(pontos, centroides):
+    """Distâncias² [n × k] sem materializar as diferenças"""
+    distancias = (pontos * pontos).sum(axis=1)[:, None] - 2 * pontos @ centroides.T
+    distancias += (centroides * centroides).sum(axis=1)[None, :]
+    return np.maximum(distancias, 0)
+
+def kmeans_mais_mais(pontos, k, gerador):
+    """Sementes espalhadas: cada nova semente é sorteada com peso pela distância² às anteriores"""
+    centroides = np.empty((k, pontos.shape[1]), dtype=pontos.dtype)
+    centroides[0] = pontos[gerador.integers(len(pontos))]
+    distancias = ((pontos - centroides[0]) ** 2).sum(axis=1)
+    for i in range(1, k):
+        total = distancias.sum()
+        escolhido = gerador.choice(len(pontos), p=distancias / total) if total > 0 else gerador.integers(len(pontos))
+        centroides[i] = pontos[escolhido]
+        distancias = np.minimum(distancias, ((pontos - centroides[i]) ** 2).sum(axis=1))
+    return centroides
+
+def kmeans(pontos, k, semente=0, max_iteracoes=MAX_ITERACOES, tolerancia=TOLERANCIA):
+    """Lloyd vetorizado; retorna (centróides, rótulos, inércia, iterações)"""
+    gerador = np.random.default_rng(semente)
+    amostra = pontos[gerador.choice(len(pontos), min(len(pontos), AMOSTRA_INICIAL), replace=False)]
+    centroides = kmeans_mais_mais(amostra, k, gerador)
+    indices = np.arange(len(pontos))
+
+    for iteracao in range(1, max_iteracoes + 1):
+        distancias = _distancias(pontos, centroides)
+        rotulos = distancias.argmin(axis=1)
+        contagem = np.bincount(rotulos, minlength=k)
+        novos = np.stack([np.bincount(rotulos, weights=pontos[:, j], minlength=k)
+                          for j in range(pontos.shape[1])], axis=1)
+        vazios = contagem == 0
+        novos[~vazios] /= contagem[~vazios, None]
+        if vazios.any():
+            # Grupo vazio recomeça nos pontos mais mal atendidos
+            distantes = distancias[indices, rotulos].argsort()[-int(vazios.sum()):]
+            novos[vazios] = pontos[distantes]
+        deslocamento = np.abs(novos - centroides).max()
+        centroides = novos
+        if deslocamento < tolerancia:
+            break
+
+    distancias = _distancias(pontos, centroides)
+    rotulos = distancias.argmin(axis=1)
+    return centroides, rotulos, float(distancias[indices, rotulos].sum()), iteracao
+
+def nomear_grupos(centroides, media_geral):
+    """Um tipo de perfil por centróide, pelos blocos acima da média da escola
+
+    Cada tipo vai primeiro para o grupo em que mais se destaca; grupos que
+    sobram herdam o tipo mais próximo ou ficam como PERFIL_PADRAO.
+    """
+    desvios = centroides - media_geral
+    pontuacao = np.array([[desvios[i, [bloco - 1 for bloco in blocos]].mean() for _, blocos in TIPOS_PERFIL]
+                          for i in range(len(centroides))])
+    nomes = [None] * len(centroides)
+    livres = pontuacao.copy()
+    while livres.size:
+        i, j = np.unravel_index(livres.argmax(), livres.shape)
+        if livres[i, j] < LIMIAR_DESTAQUE:
+            break
+        nomes[i] = TIPOS_PERFIL[j][0]
+        livres[i, :] = -np.inf
+        livres[:, j] = -np.inf
+    for i, nome in enumerate(nomes):
+        if nome is None:
+            j = int(pontuacao[i].argmax())
+            nomes[i] = TIPOS_PERFIL[j][0] if pontuacao[i, j] >= LIMIAR_DESTAQUE else PERFIL_PADRAO
+    return nomes
+
+
+# ===== EXECUÇÃO =====
+
+def executar_agrupamento(escola='', k=K_PADRAO, periodo=None, semente=0, aplicar=False, dados=None):
+    """Agrupa os alunos da escola ('' = todos), grava os centróides e ativa a execução
+
+    dados: resultado de carregar_medias() já lido (para rodar várias escolas)
+    aplicar=True também grava o novo tipo_perfil dos alunos e recalcula as
+    recomendações de quem mudou.
+    """
+    inicio = time.perf_counter()
+    ids, medias, escolas = dados if dados is not None else carregar_medias()
+    if escola:
+        selecionados = escolas == escola
+        ids, medias = ids[selecionados], medias[selecionados]
+    if len(ids) < k:
+        raise ValueError(f'São necessários ao menos {k} alunos com questionário (encontrados: {len(ids)})')
+
+    centroides, rotulos, inercia, iteracoes = min(
+        (kmeans(medias, k, semente + i) for i in range(INICIALIZACOES)), key=lambda resultado: resultado[2]
+    )
+    # Índice 0 = maior grupo
+    contagem = np.bincount(rotulos, minlength=k)
+    ordem = np.argsort(-contagem, kind='stable')
+    centroides, contagem = centroides[ordem], contagem[ordem]
+    rotulos = np.argsort(ordem)[rotulos]
+    nomes = nomear_grupos(centroides, medias.mean(axis=0))
+
+    ExecucaoAgrupamento.query.filter_by(escola=escola, ativa=True).update({'ativa': False})
+    execucao = ExecucaoAgrupamento(escola=escola, periodo=periodo or periodo_letivo(), k=k,
+                                   total_alunos=len(ids), inercia=round(inercia, 4), ativa=True)
+    execucao.centroides = [
+        CentroidePerfil(indice=i, tipo_perfil=nomes[i], medias=centroides[i].astype(np.float32).tobytes(),
+                        tamanho=int(contagem[i]))
+        for i in range(k)
+    ]
+    db.session.add(execucao)
+    db.session.commit()
+    invalidar_centroides()
+
+    alterados = aplicar_tipos(ids, [nomes[r] for r in rotulos.tolist()]) if aplicar else 0
+    return {
+        'execucao_id': execucao.id,
+        'escola': escola,
+        'k': k,
+        'total_alunos': len(ids),
+        'inercia': round(inercia, 2),
+        'iteracoes': iteracoes,
+        'alterados': alterados,
+        'segundos': round(time.perf_counter() - inicio, 2),
+        'grupos': [{'tipo_perfil': nomes[i], 'tamanho': int(contagem[i])} for i in range(k)],
+    }
+
+def aplicar_tipos(ids, tipos):
+    """Grava tipo_perfil dos perfis existentes; retorna quantos mudaram"""
+    atuais = dict(db.session.query(PerfilAprendizagem.aluno_id, PerfilAprendizagem.tipo_perfil))
+    mudancas = {}
+    for aluno_id, tipo in zip(ids.tolist(), tipos):
+        if aluno_id in atuais and atuais[aluno_id] != tipo:
+            mudancas.setdefault(tipo, []).append(aluno_id)
+    for tipo, alunos in mudancas.items():
+        for inicio in range(0, len(alunos), 900):
+            PerfilAprendizagem.query.filter(PerfilAprendizagem.aluno_id.in_(alunos[inicio:inicio + 900])).update(
+                {'tipo_perfil': tipo}, synchronize_session=False)
+    registrar_mudancas_tipo([(aluno_id, atuais[aluno_id], tipo)
+                             for tipo, alunos in mudancas.items() for aluno_id in alunos])
+    db.session.commit()
+    alterados = sorted(aluno_id for alunos in mudancas.values() for aluno_id in alunos)
+    if alterados:
+        recalcular_recomendacoes(alterados)
+    return len(alterados)
+
+
+# ===== CLASSIFICAÇÃO AO SALVAR =====
+
+_cache_centroides = {'grupos': None, 'validade': 0.0}
+_lock_centroides = threading.Lock()
+
+def carregar_centroides():
+    """{escola: (centróides [k × 7], tipos)} das execuções ativas"""
+    grupos = {}
+    for execucao in ExecucaoAgrupamento.query.filter_by(ativa=True).options(
+        selectinload(ExecucaoAgrupamento.centroides)
+    ):
+        matriz = np.stack([np.frombuffer(c.medias, dtype=np.float32) for c in execucao.centroides])
+        grupos[execucao.escola] = (matriz, [c.tipo_perfil for c in execucao.centroides])
+    return grupos
+
+def obter_centroides():
+    with _lock_centroides:
+        if _cache_centroides['grupos'] is None or time.monotonic() >= _cache_centroides['validade']:
+            _cache_centroides['grupos'] = carregar_centroides()
+            _cache_centroides['validade'] = time.monotonic() + TTL_CENTROIDES
+        return _cache_centroides['grupos']
+
+def invalidar_centroides():
+    with _lock_centroides:
+        _cache_centroides['grupos'] = None
+
+def tipo_por_centroide(medias, email_escola=None):
+    """Tipo do centróide mais próximo (da escola do aluno ou geral); None sem agrupamento
+
+    medias: as 7 médias de bloco na escala 1-5
+    """
+    grupos = obter_centroides()
+    grupo = grupos.get(escola_do_aluno(email_escola)) or grupos.get('')
+    if grupo is None:
+        return None
+    matriz, tipos = grupo
+    return tipos[int(((matriz - np.asarray(medias, dtype=np.float32)) ** 2).sum(axis=1).argmin())]
+
+
+# ===== RELATÓRIO =====
+
+def relatorio_agrupamento(escola='', limite=8):
+    """Últimas execuções da escola, da mais antiga para a mais recente
+
+    Para cada grupo: tamanho, participação, médias e, a partir da segunda
+    execução, o centróide anterior mais próximo e a distância até ele
+    (deriva). variacao_tipos traz a mudança de participação (pontos
+    percentuais) de cada tipo de perfil em relação à execução anterior.
+    """
+    execucoes = ExecucaoAgrupamento.query.filter_by(escola=escola).options(
+        selectinload(ExecucaoAgrupamento.centroides)
+    ).order_by(ExecucaoAgrupamento.data_execucao.desc(), ExecucaoAgrupamento.id.desc()).limit(limite).all()
+
+    relatorio = []
+    anterior = None
+    for execucao in reversed(execucoes):
+        matriz = np.stack([np.frombuffer(c.medias, dtype=np.float32) for c in execucao.centroides])
+        participacao_tipos = {}
+        grupos = []
+        for centroide, medias in zip(execucao.centroides, matriz):
+            participacao = 100 * centroide.tamanho / max(execucao.total_alunos, 1)
+            participacao_tipos[centroide.tipo_perfil] = participacao_tipos.get(centroide.tipo_perfil, 0) + participacao
+            grupo = {
+                'indice': centroide.indice,
+                'tipo_perfil': centroide.tipo_perfil,
+                'tamanho': centroide.tamanho,
+                'participacao': round(participacao, 1),
+                'medias': {nome: round(float(valor), 2) for nome, valor in zip(NOMES_BLOCOS, medias)},
+            }
+            if anterior is not None:
+                distancias = np.sqrt(((anterior['matriz'] - medias) ** 2).sum(axis=1))
+                j = int(distancias.argmin())
+                grupo['grupo_anterior'] = anterior['tipos'][j]
+                grupo['deslocamento'] = round(float(distancias[j]), 3)
+            grupos.append(grupo)
+
+        entrada = {
+            'execucao_id': execucao.id,
+            'periodo': execucao.periodo,
+            'data_execucao': execucao.data_execucao.isoformat(),
+            'k': execucao.k,
+            'total_alunos': execucao.total_alunos,
+            'inercia_media': round(execucao.inercia / max(execucao.total_alunos, 1), 4) if execucao.inercia else None,
+            'ativa': execucao.ativa,
+            'grupos': grupos,
+            'participacao_tipos': {tipo: round(valor, 1) for tipo, valor in participacao_tipos.items()},
+        }
+        if anterior is not None:
+            tipos = set(participacao_tipos) | set(anterior['participacao'])
+            entrada['variacao_tipos'] = {
+                tipo: round(participacao_tipos.get(tipo, 0) - anterior['participacao'].get(tipo, 0), 1)
+                for tipo in sorted(tipos)
+            }
+        relatorio.append(entrada)
+        anterior = {'matriz': matriz, 'tipos': [c.tipo_perfil for c in execucao.centroides],
+                    'participacao': participacao_tipos}
+    return relatorio
+
+
+if __name__ == '__main__':
+    import argparse
+    from fabrica import create_app
+
+    parser = argparse.ArgumentParser(description='Agrupamento k-means dos perfis do questionário')
+    parser.add_argument('--executar', action='store_true', help='agrupa os alunos e ativa os novos centróides')
+    parser.add_argument('--relatorio', action='store_true', help='tamanho dos grupos e deriva entre execuções')
+    parser.add_argument('-k', type=int, default=K_PADRAO, help='número de grupos')
+    parser.add_argument('--escola', default='', help='domínio do email escolar (padrão: todos os alunos)')
+    parser.add_argument('--por-escola', action='store_true',
+                        help=f'uma execução por escola com ao menos {MINIMO_ALUNOS_ESCOLA} alunos')
+    parser.add_argument('--periodo', help='período letivo (padrão: semestre atual, ex. 2025.2)')
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--aplicar', action='store_true', help='regrava o tipo_perfil dos alunos agrupados')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if args.executar:
+            inicio = time.perf_counter()
+            dados = carregar_medias()
+            print(f"📥 {len(dados[0])} alunos carregados em {time.perf_counter() - inicio:.2f}s")
+            escolas = listar_escolas(dados[2]) if args.por_escola else [args.escola]
+            for escola in escolas:
+                resultado = executar_agrupamento(escola, args.k, args.periodo, args.semente, args.aplicar, dados)
+                print(f"✅ {escola or 'todos os alunos'}: {resultado['total_alunos']} alunos, k={resultado['k']}, "
+                      f"{resultado['iteracoes']} iterações, {resultado['segundos']}s"
+                      + (f", {resultado['alterados']} perfis alterados" if args.aplicar else ''))
+                for grupo in resultado['grupos']:
+                    print(f"   {grupo['tipo_perfil']:<24} {grupo['tamanho']:7d}")
+        if args.relatorio:
+            for execucao in relatorio_agrupamento(args.escola):
+                print(f"📅 {execucao['periodo']} (execução {execucao['execucao_id']}, k={execucao['k']}, "
+                      f"{execucao['total_alunos']} alunos){' ← ativa' if execucao['ativa'] else ''}")
+                for grupo in execucao['grupos']:
+                    deriva = (f"  ← {grupo['grupo_anterior']} (deslocamento {grupo['deslocamento']:.2f})"
+                              if 'deslocamento' in grupo else '')
+                    print(f"   {grupo['tipo_perfil']:<24} {grupo['tamanho']:7d} {grupo['participacao']:5.1f}%{deriva}")
+                for tipo, variacao in execucao.get('variacao_tipos', {}).items():
+                    if variacao:
+                        print(f"   Δ {tipo}: {variacao:+.1f} p.p.")
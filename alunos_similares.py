@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Alunos semelhantes pelo questionário NeuroLearn
+Cada aluno tem um vetor com as 67 respostas e as 7 médias de bloco
+(VetorPerfilAluno), atualizado a cada envio do questionário. Um índice em
+memória por processo responde "quais alunos se parecem com este?" dentro
+da turma (série + professor responsável) ou da escola (domínio do
+email_escola), por similaridade de cosseno.
+
+O índice é plugável (SIMILARES_BACKEND): o padrão 'numpy' faz busca exata
+por força bruta, que responde em poucos milissegundos para dezenas de
+milhares de alunos; um backend ANN só precisa implementar adicionar() e
+buscar() com os mesmos argumentos.
+
+Uso:
+    python alunos_similares.py --reconstruir
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from modelos import db, Aluno, QuestionarioNeuroLearn, VetorPerfilAluno
+
+NUM_QUESTOES = 67
+NUM_BLOCOS = 7
+DIMENSAO = NUM_QUESTOES + NUM_BLOCOS
+# As 7 médias pesam, juntas, o mesmo que as 67 respostas
+PESO_MEDIAS = float(np.sqrt(NUM_QUESTOES / NUM_BLOCOS))
+BACKEND = os.environ.get('SIMILARES_BACKEND', 'numpy')
+# Intervalo mínimo (s) entre as leituras de vetores gravados por outros workers
+INTERVALO_SINCRONIZACAO = float(os.environ.get('SIMILARES_SINCRONIZACAO', 2))
+K_MAXIMO = 50
+
+
+# ===== VETORES =====
+
+def montar_vetor(respostas):
+    """{questao: resposta 1-5} -> float32[74] em [0, 1]; faltas recebem a média do bloco"""
+    vetor = np.full(DIMENSAO, np.nan, dtype=np.float32)
+    for questao, resposta in respostas.items():
+        questao = int(questao)
+        if 1 <= questao <= NUM_QUESTOES:
+            vetor[questao - 1] = (min(max(int(resposta), 1), 5) - 1) / 4
+    for bloco in range(1, NUM_BLOCOS + 1):
+        # Mesma regra de salvar_questionario: 10 questões por bloco, o 7º com as 7 restantes
+        valores = vetor[(bloco - 1) * 10:bloco * 10 if bloco < NUM_BLOCOS else NUM_QUESTOES]
+        media = float(np.nanmean(valores)) if not np.isnan(valores).all() else 0.5
+        valores[np.isnan(valores)] = media
+        vetor[NUM_QUESTOES + bloco - 1] = media
+    return vetor
+
+def preparar(vetores):
+    """Centraliza em 0, pondera as médias e normaliza (produto escalar = cosseno)"""
+    vetores = np.atleast_2d(vetores).astype(np.float32) - 0.5
+    vetores[:, NUM_QUESTOES:] *= PESO_MEDIAS
+    normas = np.linalg.norm(vetores, axis=1, keepdims=True)
+    return np.divide(vetores, normas, out=np.zeros_like(vetores), where=normas > 0)
+
+def escola_do_aluno(email_escola):
+    """Domínio do email escolar (ou o próprio valor, quando é um código de escola)"""
+    valor = (email_escola or '').strip().lower()
+    return valor.split('@', 1)[1] if '@' in valor else valor
+
+def turma_do_aluno(serie_ano, professor_responsavel):
+    return f'{(serie_ano or "").strip().lower()}|{(professor_responsavel or "").strip().lower()}'
+
+
+# ===== BACKENDS =====
+
+class IndiceForcaBruta:
+    """Busca exata com NumPy: produto escalar com todos os vetores do escopo"""
+
+    def __init__(self, dimensao=DIMENSAO):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vetores = np.empty((0, dimensao), dtype=np.float32)
+        self.turmas = np.empty(0, dtype=np.int32)
+        self.escolas = np.empty(0, dtype=np.int32)
+        self.posicao = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def adicionar(self, ids, vetores, turmas, escolas):
+        """Insere ou substitui vetores (já preparados) e seus grupos"""
+        novos = []
+        for i, aluno_id in enumerate(ids):
+            linha = self.posicao.get(aluno_id)
+            if linha is None:
+                novos.append(i)
+            else:
+                self.vetores[linha] = vetores[i]
+                self.turmas[linha] = turmas[i]
+                self.escolas[linha] = escolas[i]
+        if novos:
+            inicio = len(self.ids)
+            self.ids = np.concatenate([self.ids, np.asarray(ids, dtype=np.int64)[novos]])
+            self.vetores = np.vstack([self.vetores, vetores[novos]])
+            self.turmas = np.concatenate([self.turmas, np.asarray(turmas, dtype=np.int32)[novos]])
+            self.escolas = np.concatenate([self.escolas, np.asarray(escolas, dtype=np.int32)[novos]])
+            self.posicao.update((int(self.ids[linha]), linha) for linha in range(inicio, len(self.ids)))
+
+    def buscar(self, vetor, k, turma=None, escola=None, excluir=None):
+        """[(aluno_id, similaridade)] dos k mais próximos dentro do grupo"""
+        mascara = np.ones(len(self.ids), dtype=bool)
+        if turma is not None:
+            mascara &= self.turmas == turma
+        if escola is not None:
+            mascara &= self.escolas == escola
+        if excluir is not None and excluir in self.posicao:
+            mascara[self.posicao[excluir]] = False
+        linhas = np.flatnonzero(mascara)
+        if not len(linhas) or k <= 0:
+            return []
+        similaridades = self.vetores[linhas] @ vetor
+        k = min(k, len(linhas))
+        melhores = np.argpartition(-similaridades, k - 1)[:k]
+        melhores = melhores[np.argsort(-similaridades[melhores], kind='stable')]
+        return [(int(self.ids[linhas[i]]), float(similaridades[i])) for i in melhores]
+
+BACKENDS = {'numpy': IndiceForcaBruta}
+
+
+# ===== ÍNDICE =====
+
+class IndiceSimilares:
+    """Índice do processo, sincronizado com VetorPerfilAluno sob demanda"""
+
+    def __init__(self, backend=BACKEND):
+        self._classe_backend = BACKENDS[backend]
+        self._lock = threading.RLock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self._reiniciar()
+
+    def _reiniciar(self):
+        self.backend = self._classe_backend()
+        self.codigos_turma = {}
+        self.codigos_escola = {}
+        self.grupos = {}
+        self.ultima_atualizacao = None
+        self.proxima_sincronizacao = 0.0
+
+    def _codigo(self, codigos, chave):
+        return codigos.setdefault(chave, len(codigos))
+
+    def adicionar(self, linhas):
+        """linhas: [(aluno_id, vetor float32 bruto, serie_ano, professor, email_escola)]"""
+        if not linhas:
+            return
+        with self._lock:
+            ids, vetores, turmas, escolas = [], [], [], []
+            for aluno_id, vetor, serie_ano, professor, email_escola in linhas:
+                turma = self._codigo(self.codigos_turma, turma_do_aluno(serie_ano, professor))
+                escola = self._codigo(self.codigos_escola, escola_do_aluno(email_escola))
+                ids.append(aluno_id)
+                vetores.append(vetor)
+                turmas.append(turma)
+                escolas.append(escola)
+                self.grupos[aluno_id] = (turma, escola)
+            self.backend.adicionar(ids, preparar(np.stack(vetores)), turmas, escolas)
+
+    def sincronizar(self, forcar=False):
+        """Carrega os vetores gravados desde a última leitura (todos, na primeira)"""
+        with self._lock:
+            if not forcar and time.monotonic() < self.proxima_sincronizacao:
+                return
+            consulta = db.session.query(
+                VetorPerfilAluno.aluno_id, VetorPerfilAluno.vetor, VetorPerfilAluno.data_atualizacao,
+                Aluno.serie_ano, Aluno.professor_responsavel, Aluno.email_escola
+            ).join(Aluno, Aluno.id == VetorPerfilAluno.aluno_id)
+            if self.ultima_atualizacao is not None:
+                consulta = consulta.filter(VetorPerfilAluno.data_atualizacao >= self.ultima_atualizacao)
+            linhas = []
+            for aluno_id, bruto, atualizacao, serie_ano, professor, email_escola in consulta:
+                linhas.append((aluno_id, np.frombuffer(bruto, dtype=np.float32), serie_ano, professor, email_escola))
+                if self.ultima_atualizacao is None or atualizacao > self.ultima_atualizacao:
+                    self.ultima_atualizacao = atualizacao
+            self.adicionar(linhas)
+            self.proxima_sincronizacao = time.monotonic() + INTERVALO_SINCRONIZACAO
+
+    def buscar(self, aluno_id, k=5, escopo='turma'):
+        """k alunos mais parecidos com aluno_id na turma ou na escola dele"""
+        self.sincronizar()
+        with self._lock:
+            linha = self.backend.posicao.get(aluno_id)
+            if linha is None:
+                return None
+            turma, escola = self.grupos[aluno_id]
+            filtros = {'turma': turma} if escopo == 'turma' else {'escola': escola}
+            return self.backend.buscar(self.backend.vetores[linha], min(k, K_MAXIMO), excluir=aluno_id, **filtros)
+
+indice_similares = IndiceSimilares()
+
+
+# ===== GRAVAÇÃO =====
+
+def atualizar_vetor_aluno(aluno, respostas):
+    """Grava o vetor do aluno (após salvar o questionário) e atualiza o índice local"""
+    vetor = montar_vetor(respostas)
+    registro = VetorPerfilAluno.query.get(aluno.id)
+    if registro is None:
+        registro = VetorPerfilAluno(aluno_id=aluno.id)
+        db.session.add(registro)
+    registro.vetor = vetor.tobytes()
+    registro.data_atualizacao = datetime.utcnow()
+    db.session.commit()
+    indice_similares.adicionar([(aluno.id, vetor, aluno.serie_ano, aluno.professor_responsavel,
+                                 aluno.email_escola)])
+
+def reconstruir_vetores(tamanho_lote=1000):
+    """Recalcula VetorPerfilAluno de todos os alunos com questionário respondido"""
+    respostas = {}
+    for aluno_id, questao, resposta in db.session.query(
+        QuestionarioNeuroLearn.aluno_id, QuestionarioNeuroLearn.questao, QuestionarioNeuroLearn.resposta
+    ):
+        respostas.setdefault(aluno_id, {})[questao] = resposta
+
+    agora = datetime.utcnow()
+    VetorPerfilAluno.query.delete(synchronize_session=False)
+    registros = [{'aluno_id': aluno_id, 'vetor': montar_vetor(valores).tobytes(), 'data_atualizacao': agora}
+                 for aluno_id, valores in respostas.items()]
+    for inicio in range(0, len(registros), tamanho_lote):
+        db.session.bulk_insert_mappings(VetorPerfilAluno, registros[inicio:inicio + tamanho_lote])
+    db.session.commit()
+    indice_similares.reiniciar()
+    return len(registros)
+
+
+if __name__ == '__main__':
+    import argparse
+    from fabrica import create_app
+
+    parser = argparse.ArgumentParser(description='Vetores do questionário para busca de alunos semelhantes')
+    parser.add_argument('--reconstruir', action='store_true', help='recalcula os vetores de todos os alunos')
+    parser.add_argument('--aluno', type=int, help='mostra os alunos mais parecidos com este id')
+    parser.add_argument('--escopo', choices=['turma', 'escola'], default='turma')
+    parser.add_argument('-k', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if args.reconstruir:
+            print(f"✅ {reconstruir_vetores()} vetores gravados")
+        if args.aluno:
+            inicio = time.perf_counter()
+            indice_similares.sincronizar(forcar=True)
+            carga_ms = (time.perf_counter() - inicio) * 1000
+            inicio = time.perf_counter()
+            resultado = indice_similares.buscar(args.aluno, args.k, args.escopo)
+            busca_ms = (time.perf_counter() - inicio) * 1000
+            print(f"🔍 {len(indice_similares.backend)} vetores (carga {carga_ms:.1f} ms, busca {busca_ms:.2f} ms)")
+            for aluno_id, similaridade in resultado or []:
+                print(f"   {aluno_id:6d}  {similaridade:.3f}")
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analytics da turma com distribuições pré-calculadas
+AgregadoTurma guarda, por turma (serie_ano + professor_responsavel),
+contadores que bastam para o painel da turma sem reler as respostas:
+
+- questionario/respondido: alunos com questionário
+- bloco/<n>:               média de bloco por aluno (contagem, soma, soma²)
+- resposta/<q>:<r>:        histograma Likert de cada questão
+- tipo_perfil/<tipo>:      distribuição dos tipos de perfil
+- consistencia/<sinal>:    alunos com cada sinal de inconsistência
+- trilhas/iniciadas, trilhas/concluidas (soma = progresso acumulado)
+
+Cada gravação (questionário, perfil, progresso de trilha) aplica só a
+diferença entre a contribuição antiga e a nova do aluno, com
+INSERT ... ON CONFLICT DO UPDATE (soma atômica, sem ler antes), na mesma
+transação da gravação. A leitura soma as linhas das turmas filtradas.
+
+Uso:
+    python analytics_turma.py --reconstruir
+    python analytics_turma.py --serie "7º Ano" --professor "Prof. Ana"
+"""
+
+import math
+from itertools import groupby
+
+from sqlalchemy import func, text
+
+from modelos import db, Aluno, QuestionarioNeuroLearn, PerfilAprendizagem, ProgressoTrilha, AgregadoTurma
+
+NUM_BLOCOS = 7
+NOMES_BLOCOS = ('Percepção Sensorial', 'Atenção e Foco', 'Comunicação', 'Organização',
+                'Aprendizagem', 'Interação Social', 'Criatividade')
+MINIMO_RESPOSTAS = 60
+TAMANHO_LOTE = 900
+
+_UPSERT = text("""
+    INSERT INTO agregado_turma (serie_ano, professor_responsavel, metrica, item, contagem, soma, soma_quadrados)
+    VALUES (:serie_ano, :professor_responsavel, :metrica, :item, :contagem, :soma, :soma_quadrados)
+    ON CONFLICT (serie_ano, professor_responsavel, metrica, item) DO UPDATE SET
+        contagem = contagem + excluded.contagem,
+        soma = soma + excluded.soma,
+        soma_quadrados = soma_quadrados + excluded.soma_quadrados
+""")
+
+
+# ===== CONSISTÊNCIA =====
+
+def bloco_da_questao(questao):
+    """Mesma regra de salvar_questionario: 10 questões por bloco"""
+    return (int(questao) - 1) // 10 + 1
+
+def sinais_consistencia(respostas):
+    """{sinal: mensagem} das inconsistências de um questionário ({questao: resposta})"""
+    if len(respostas) < MINIMO_RESPOSTAS:
+        return {'incompleto': 'Questionário incompleto'}
+
+    por_bloco = {}
+    for questao, resposta in respostas.items():
+        por_bloco.setdefault(bloco_da_questao(questao), []).append(resposta)
+    medias = {bloco: sum(valores) / len(valores) for bloco, valores in por_bloco.items()}
+    variancias = {bloco: sum((x - medias[bloco]) ** 2 for x in valores) / len(valores)
+                  for bloco, valores in por_bloco.items()}
+
+    sinais = {}
+    # Respostas muito dispersas dentro do bloco
+    alta_variancia = sorted(bloco for bloco, variancia in variancias.items() if variancia > 2.5)
+    if alta_variancia:
+        sinais['alta_variabilidade'] = f"Alta variabilidade nos blocos: {', '.join(map(str, alta_variancia))}"
+    # Blocos que deveriam andar juntos
+    if abs(medias.get(2, 3) - medias.get(4, 3)) > 2.0:
+        sinais['atencao_organizacao'] = "Contradição entre Atenção e Organização"
+    if abs(medias.get(3, 3) - medias.get(6, 3)) > 2.0:
+        sinais['comunicacao_social'] = "Contradição entre Comunicação e Interação Social"
+
+    todas = [respostas[questao] for questao in sorted(respostas)]
+    if sum(1 for r in todas if r in (1, 5)) / len(todas) > 0.7:
+        sinais['respostas_extremas'] = "Excesso de respostas extremas (muito polarizadas)"
+    # 5 respostas iguais em sequência, mais de 3 vezes
+    sequencias_iguais = sum(1 for i in range(len(todas) - 4) if len(set(todas[i:i + 5])) == 1)
+    if sequencias_iguais > 3:
+        sinais['padrao_repetitivo'] = "Padrões repetitivos detectados (possível falta de atenção)"
+    return sinais
+
+
+# ===== CONTRIBUIÇÕES =====
+
+def _normalizar(respostas):
+    return {int(questao): int(resposta) for questao, resposta in (respostas or {}).items()}
+
+def contribuicao_questionario(respostas):
+    """{(metrica, item): (contagem, soma, soma²)} de um aluno; vazio sem respostas"""
+    respostas = _normalizar(respostas)
+    if not respostas:
+        return {}
+    contribuicao = {('questionario', 'respondido'): (1, 0.0, 0.0)}
+    por_bloco = {}
+    for questao, resposta in respostas.items():
+        contribuicao[('resposta', f'{questao}:{resposta}')] = (1, 0.0, 0.0)
+        por_bloco.setdefault(bloco_da_questao(questao), []).append(resposta)
+    for bloco, valores in por_bloco.items():
+        media = sum(valores) / len(valores)
+        contribuicao[('bloco', str(bloco))] = (1, media, media * media)
+    sinais = sinais_consistencia(respostas)
+    for sinal in sinais:
+        contribuicao[('consistencia', sinal)] = (1, 0.0, 0.0)
+    if sinais:
+        contribuicao[('consistencia', 'alguma')] = (1, 0.0, 0.0)
+    return contribuicao
+
+def _diferenca(antiga, nova):
+    """nova - antiga, sem as chaves que não mudaram"""
+    diferenca = {}
+    for chave in set(antiga) | set(nova):
+        valores = tuple(n - a for a, n in zip(antiga.get(chave, (0, 0.0, 0.0)), nova.get(chave, (0, 0.0, 0.0))))
+        if any(valores):
+            diferenca[chave] = valores
+    return diferenca
+
+def aplicar_deltas(deltas):
+    """deltas: {(serie_ano, professor, metrica, item): (contagem, soma, soma²)} (sem commit)"""
+    if not deltas:
+        return
+    db.session.execute(_UPSERT, [
+        {'serie_ano': serie_ano, 'professor_responsavel': professor, 'metrica': metrica, 'item': item,
+         'contagem': contagem, 'soma': soma, 'soma_quadrados': soma_quadrados}
+        for (serie_ano, professor, metrica, item), (contagem, soma, soma_quadrados) in deltas.items()
+    ])
+
+def _da_turma(aluno, diferenca):
+    return {(aluno.serie_ano, aluno.professor_responsavel) + chave: valores for chave, valores in diferenca.items()}
+
+
+# ===== GRAVAÇÕES (chamadas antes do commit de quem grava) =====
+
+def registrar_questionario(aluno, anteriores, novas):
+    """Questionário (re)enviado: troca a contribuição das respostas anteriores pelas novas"""
+    aplicar_deltas(_da_turma(aluno, _diferenca(contribuicao_questionario(anteriores),
+                                               contribuicao_questionario(novas))))
+
+def registrar_tipo_perfil(aluno, anterior, novo):
+    if anterior == novo:
+        return
+    diferenca = {}
+    if anterior:
+        diferenca[('tipo_perfil', anterior)] = (-1, 0.0, 0.0)
+    if novo:
+        diferenca[('tipo_perfil', novo)] = (1, 0.0, 0.0)
+    aplicar_deltas(_da_turma(aluno, diferenca))
+
+def registrar_mudancas_tipo(mudancas):
+    """Várias trocas de tipo_perfil de uma vez: [(aluno_id, anterior, novo)]"""
+    turmas = {}
+    ids = [aluno_id for aluno_id, _, _ in mudancas]
+    for inicio in range(0, len(ids), TAMANHO_LOTE):
+        turmas.update((aluno_id, (serie_ano, professor)) for aluno_id, serie_ano, professor in db.session.query(
+            Aluno.id, Aluno.serie_ano, Aluno.professor_responsavel
+        ).filter(Aluno.id.in_(ids[inicio:inicio + TAMANHO_LOTE])))
+    deltas = {}
+    for aluno_id, anterior, novo in mudancas:
+        if aluno_id not in turmas or anterior == novo:
+            continue
+        for tipo, sinal in ((anterior, -1), (novo, 1)):
+            if tipo:
+                chave = turmas[aluno_id] + ('tipo_perfil', tipo)
+                deltas[chave] = (deltas.get(chave, (0, 0.0, 0.0))[0] + sinal, 0.0, 0.0)
+    aplicar_deltas({chave: valores for chave, valores in deltas.items() if valores[0]})
+
+def registrar_progresso_trilha(aluno, anterior, novo):
+    """anterior=None: trilha iniciada agora; conclusão ao cruzar 100%"""
+    novo = float(novo or 0)
+    diferenca = {}
+    if anterior is None:
+        diferenca[('trilhas', 'iniciadas')] = (1, novo, novo * novo)
+        anterior = 0.0
+    elif novo != anterior:
+        diferenca[('trilhas', 'iniciadas')] = (0, novo - anterior, novo * novo - anterior * anterior)
+    concluida_antes, concluida_agora = anterior >= 100.0, novo >= 100.0
+    if concluida_antes != concluida_agora:
+        diferenca[('trilhas', 'concluidas')] = (1 if concluida_agora else -1, 0.0, 0.0)
+    aplicar_deltas(_da_turma(aluno, diferenca))
+
+
+# ===== RECONSTRUÇÃO =====
+
+def reconstruir_agregados():
+    """Recalcula todos os contadores a partir das tabelas de origem"""
+    turmas = {aluno_id: (serie_ano, professor) for aluno_id, serie_ano, professor in
+              db.session.query(Aluno.id, Aluno.serie_ano, Aluno.professor_responsavel)}
+    deltas = {}
+
+    def somar(turma, contribuicao):
+        for chave, valores in contribuicao.items():
+            chave = turma + chave
+            atual = deltas.get(chave, (0, 0.0, 0.0))
+            deltas[chave] = tuple(a + v for a, v in zip(atual, valores))
+
+    respostas = db.session.query(
+        QuestionarioNeuroLearn.aluno_id, QuestionarioNeuroLearn.questao, QuestionarioNeuroLearn.resposta
+    ).order_by(QuestionarioNeuroLearn.aluno_id).yield_per(10000)
+    for aluno_id, linhas in groupby(respostas, key=lambda linha: linha[0]):
+        if aluno_id in turmas:
+            somar(turmas[aluno_id], contribuicao_questionario({questao: resposta for _, questao, resposta in linhas}))
+
+    for serie_ano, professor, tipo, quantidade in db.session.query(
+        Aluno.serie_ano, Aluno.professor_responsavel, PerfilAprendizagem.tipo_perfil, func.count()
+    ).join(PerfilAprendizagem, PerfilAprendizagem.aluno_id == Aluno.id).filter(
+        PerfilAprendizagem.tipo_perfil != None, PerfilAprendizagem.tipo_perfil != ''
+    ).group_by(Aluno.serie_ano, Aluno.professor_responsavel, PerfilAprendizagem.tipo_perfil):
+        somar((serie_ano, professor), {('tipo_perfil', tipo): (quantidade, 0.0, 0.0)})
+
+    progresso = func.coalesce(ProgressoTrilha.progresso, 0.0)
+    for serie_ano, professor, iniciadas, concluidas, soma, soma_quadrados in db.session.query(
+        Aluno.serie_ano, Aluno.professor_responsavel, func.count(ProgressoTrilha.id),
+        func.sum(db.case([(ProgressoTrilha.progresso >= 100.0, 1)], else_=0)),
+        func.sum(progresso), func.sum(progresso * progresso)
+    ).join(ProgressoTrilha, ProgressoTrilha.aluno_id == Aluno.id).group_by(
+        Aluno.serie_ano, Aluno.professor_responsavel
+    ):
+        somar((serie_ano, professor), {('trilhas', 'iniciadas'): (iniciadas, soma or 0.0, soma_quadrados or 0.0),
+                                       ('trilhas', 'concluidas'): (concluidas or 0, 0.0, 0.0)})
+
+    AgregadoTurma.query.delete(synchronize_session=False)
+    itens = list(deltas.items())
+    for inicio in range(0, len(itens), 5000):
+        aplicar_deltas(dict(itens[inicio:inicio + 5000]))
+    db.session.commit()
+    return len(itens)
+
+
+# ===== LEITURA =====
+
+def analytics_turma(serie_ano='', professor_responsavel=''):
+    """Painel de uma turma (ou de todas as turmas que casam com os filtros)"""
+    filtros = []
+    if serie_ano:
+        filtros.append(AgregadoTurma.serie_ano == serie_ano)
+    if professor_responsavel:
+        filtros.append(AgregadoTurma.professor_responsavel == professor_responsavel)
+    linhas = db.session.query(
+        AgregadoTurma.metrica, AgregadoTurma.item, func.sum(AgregadoTurma.contagem),
+        func.sum(AgregadoTurma.soma), func.sum(AgregadoTurma.soma_quadrados)
+    ).filter(*filtros).group_by(AgregadoTurma.metrica, AgregadoTurma.item).all()
+    valores = {(metrica, item): (contagem or 0, soma or 0.0, soma_quadrados or 0.0)
+               for metrica, item, contagem, soma, soma_quadrados in linhas}
+
+    consulta_alunos = db.session.query(func.count(Aluno.id))
+    if serie_ano:
+        consulta_alunos = consulta_alunos.filter(Aluno.serie_ano == serie_ano)
+    if professor_responsavel:
+        consulta_alunos = consulta_alunos.filter(Aluno.professor_responsavel == professor_responsavel)
+    total_alunos = consulta_alunos.scalar()
+    respondidos = valores.get(('questionario', 'respondido'), (0,))[0]
+
+    def percentual(parte, todo):
+        return round(100 * parte / todo, 1) if todo else 0.0
+
+    blocos = []
+    for bloco in range(1, NUM_BLOCOS + 1):
+        contagem, soma, soma_quadrados = valores.get(('bloco', str(bloco)), (0, 0.0, 0.0))
+        media = soma / contagem if contagem else None
+        variancia = max(soma_quadrados / contagem - media * media, 0.0) if contagem else None
+        blocos.append({
+            'bloco': bloco,
+            'nome': NOMES_BLOCOS[bloco - 1],
+            'alunos': contagem,
+            'media': round(media, 2) if media is not None else None,
+            'desvio_padrao': round(math.sqrt(variancia), 2) if variancia is not None else None,
+        })
+
+    histograma = {}
+    for (metrica, item), (contagem, _, _) in valores.items():
+        if metrica == 'resposta' and contagem:
+            questao, resposta = map(int, item.split(':'))
+            if 1 <= resposta <= 5:
+                histograma.setdefault(questao, [0] * 5)[resposta - 1] = contagem
+
+    tipos = sorted(((item, contagem) for (metrica, item), (contagem, _, _) in valores.items()
+                    if metrica == 'tipo_perfil' and contagem > 0), key=lambda tipo: (-tipo[1], tipo[0]))
+    com_perfil = sum(contagem for _, contagem in tipos)
+
+    consistencia = {item: {'alunos': contagem, 'percentual': percentual(contagem, respondidos)}
+                    for (metrica, item), (contagem, _, _) in sorted(valores.items())
+                    if metrica == 'consistencia' and item != 'alguma' and contagem > 0}
+    com_sinais = valores.get(('consistencia', 'alguma'), (0,))[0]
+
+    iniciadas, soma_progresso, _ = valores.get(('trilhas', 'iniciadas'), (0, 0.0, 0.0))
+    concluidas = valores.get(('trilhas', 'concluidas'), (0,))[0]
+
+    return {
+        'filtros': {'serie_ano': serie_ano, 'professor_responsavel': professor_responsavel},
+        'total_alunos': total_alunos,
+        'questionarios_respondidos': respondidos,
+        'blocos': blocos,
+        'histograma': {str(questao): histograma[questao] for questao in sorted(histograma)},
+        'tipos_perfil': [{'tipo_perfil': tipo, 'alunos': contagem, 'percentual': percentual(contagem, com_perfil)}
+                         for tipo, contagem in tipos],
+        'consistencia': {
+            'sinais': consistencia,
+            'alunos_com_sinais': com_sinais,
+            'percentual_confiaveis': percentual(respondidos - com_sinais, respondidos),
+        },
+        'trilhas': {
+            'iniciadas': iniciadas,
+            'concluidas': concluidas,
+            'taxa_conclusao': percentual(concluidas, iniciadas),
+            'progresso_medio': round(soma_progresso / iniciadas, 1) if iniciadas else 0.0,
+        },
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    import time
+    from fabrica import create_app
+
+    parser = argparse.ArgumentParser(description='Agregados por turma do painel de analytics')
+    parser.add_argument('--reconstruir', action='store_true', help='recalcula todos os contadores')
+    parser.add_argument('--serie', default='', help='serie_ano da turma')
+    parser.add_argument('--professor', default='', help='professor_responsavel da turma')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if args.reconstruir:
+            inicio = time.perf_counter()
+            total = reconstruir_agregados()
+            print(f"✅ {total} contadores gravados em {time.perf_counter() - inicio:.2f}s")
+        else:
+            inicio = time.perf_counter()
+            resultado = analytics_turma(args.serie, args.professor)
+            print(json.dumps({chave: valor for chave, valor in resultado.items() if chave != 'histograma'},
+                             ensure_ascii=False, indent=2))
+            print(f"⏱️ {(time.perf_counter() - inicio) * 1000:.1f} ms")
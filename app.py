@@ -1,24 +1,49 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, abort
-from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import (
+    render_template, request, jsonify, session, redirect, url_for, abort, make_response,
+    Response, stream_with_context
+)
 from werkzeug.utils import secure_filename
-from datetime import datetime, timedelta
-import requests
+from datetime import datetime, timedelta, timezone
 import json
 import os
 import re
-import secrets
 import hashlib
+import logging
 from functools import wraps
 from markupsafe import escape
+from sqlalchemy.orm import joinedload, selectinload, contains_eager
 from urllib.parse import urlparse
-from dotenv import load_dotenv
 
-# Carregar variáveis do arquivo .env
-load_dotenv()
-
-# Importar o filtro de relatório
-from filtro_relatorio_neurodivergencia import FiltroRelatorioNeurodivergencia, filtrar_relatorio_json
+from fabrica import create_app
+from modelos import (
+    db, Usuario, Aluno, Professor, Atividade, RespostaAluno, AnaliseIA,
+    QuestionarioNeuroLearn, PerfilAprendizagem, TestePerfiliCognitivo,
+    TrilhaAprendizado, ProgressoTrilha, CronogramaEstudo, SessaoEstudo,
+    BibliotecaConteudo, MonitoramentoComportamento, ConfiguracaoAcessibilidade,
+    InteracaoAssistente
+)
+from cliente_gemini import consultar_gemini, consultar_gemini_stream, ErroGemini
+from cache_faq import cache_faq
+from conversas_assistente import obter_conversa, montar_historico, registrar_turno, agendar_compactacao
+from autenticacao import (
+    autenticar, gerar_hash_senha,
+    CronometroEtapas, estatisticas_login
+)
+from telemetria import telemetria
+from metricas import registrar_cache
+from busca_biblioteca import buscar_conteudos
+from facetas_biblioteca import contar_facetas, invalidar_facetas
+from tags import sincronizar_tags_conteudo, sincronizar_perfis_trilha, filtrar_por_tags
+from recomendacoes_trilhas import (
+    recomendacoes_do_aluno, atualizar_recomendacoes_aluno, agendar_atualizacao_trilha
+)
+from alunos_similares import indice_similares, atualizar_vetor_aluno, K_MAXIMO
+from agrupamento_perfis import tipo_por_centroide, relatorio_agrupamento
+from analytics_turma import (
+    analytics_turma, sinais_consistencia, registrar_questionario, registrar_tipo_perfil,
+    registrar_progresso_trilha
+)
+from cache_templates import precompilar_templates, imprimir_relatorio
 
 # Funções de segurança e validação
 def login_required(f):
@@ -48,10 +73,83 @@ def aluno_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-def validar_email(email):
-    """Valida formato de email"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+def cache_condicional_aluno(f):
+    """Decorator para responder 304 quando a página do aluno não mudou.
+
+    Os validadores (ETag/Last-Modified) vêm de uma consulta leve sobre
+    PerfilAprendizagem.data_geracao e a última resposta do questionário,
+    executada antes de qualquer carregamento pesado da view, e das
+    configurações de acessibilidade da sessão (renderizadas pelo base.html).
+    """
+    @wraps(f)
+    def decorated_function(aluno_id, *args, **kwargs):
+        # Sem sessão de professor a própria view cuida do redirecionamento
+        if 'usuario_id' not in session or session.get('tipo') != 'professor':
+            return f(aluno_id, *args, **kwargs)
+
+        validadores = obter_validadores_aluno(aluno_id, request.endpoint)
+        if validadores is None:
+            return f(aluno_id, *args, **kwargs)
+
+        etag, ultima_modificacao = validadores
+        atual = cliente_tem_versao_atual(etag, ultima_modificacao)
+        registrar_cache('paginas_aluno', atual)
+        if atual:
+            resposta = app.response_class(status=304)
+        else:
+            resposta = make_response(f(aluno_id, *args, **kwargs))
+            if resposta.status_code != 200:
+                return resposta
+
+        resposta.set_etag(etag)
+        if ultima_modificacao:
+            resposta.last_modified = ultima_modificacao
+        # Sempre revalidar: o conteúdo é sensível e depende da sessão
+        resposta.headers['Cache-Control'] = 'private, no-cache'
+        resposta.vary.add('Cookie')
+        return resposta
+    return decorated_function
+
+def obter_validadores_aluno(aluno_id, pagina):
+    """Retorna (etag, ultima_modificacao) do aluno ou None se ele não existir"""
+    data_perfil = db.session.query(PerfilAprendizagem.data_geracao).filter(
+        PerfilAprendizagem.aluno_id == aluno_id
+    ).as_scalar()
+    ultima_resposta = db.session.query(
+        db.func.max(QuestionarioNeuroLearn.data_resposta)
+    ).filter(QuestionarioNeuroLearn.aluno_id == aluno_id).as_scalar()
+
+    linha = db.session.query(Aluno.id, data_perfil, ultima_resposta).filter(
+        Aluno.id == aluno_id
+    ).first()
+    if linha is None:
+        return None
+
+    _, data_geracao, data_resposta = linha
+    datas = [d.replace(microsecond=0, tzinfo=timezone.utc) for d in (data_geracao, data_resposta) if d is not None]
+    # O base.html embute tema/fonte/contraste: mudar as configurações muda a página
+    config = json.dumps(obter_config_acessibilidade_sessao() or {}, sort_keys=True)
+    alteracao_config = session.get('config_acessibilidade_alterada')
+    if alteracao_config:
+        datas.append(datetime.fromtimestamp(alteracao_config, timezone.utc))
+    ultima_modificacao = max(datas) if datas else None
+
+    assinatura = f"{VERSAO_CACHE_PAGINAS}:{pagina}:{aluno_id}:{data_geracao}:{data_resposta}:{config}"
+    etag = hashlib.sha1(assinatura.encode('utf-8')).hexdigest()
+    return etag, ultima_modificacao
+
+def cliente_tem_versao_atual(etag, ultima_modificacao):
+    """Verifica If-None-Match / If-Modified-Since da requisição atual"""
+    if request.if_none_match:
+        # contains_weak: o middleware de compressão enfraquece o ETag (W/)
+        return request.if_none_match.contains_weak(etag)
+
+    desde = request.if_modified_since
+    if desde and ultima_modificacao:
+        if desde.tzinfo is None:
+            desde = desde.replace(tzinfo=timezone.utc)
+        return ultima_modificacao <= desde
+    return False
 
 def sanitizar_entrada(texto):
     """Sanitiza entrada de texto"""
@@ -120,289 +218,15 @@ def check_rate_limit(key, limit=10, window=60):
     entry['count'] += 1
     return True
 
-def validar_senha(senha):
-    """Valida força da senha"""
-    if len(senha) < 8:
-        return False, "Senha deve ter pelo menos 8 caracteres"
-    if len(senha) > 128:
-        return False, "Senha muito longa (máximo 128 caracteres)"
-    if not re.search(r'[A-Za-z]', senha):
-        return False, "Senha deve conter pelo menos uma letra"
-    if not re.search(r'[0-9]', senha):
-        return False, "Senha deve conter pelo menos um número"
-    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', senha):
-        return False, "Senha deve conter pelo menos um caractere especial"
-    # Verificar se não é uma senha comum
-    senhas_comuns = ['12345678', 'password', 'password123', '123456789', 'qwerty123']
-    if senha.lower() in senhas_comuns:
-        return False, "Senha muito comum, escolha uma senha mais segura"
-    return True, "Senha válida"
-
-app = Flask(__name__)
-# Configurações de segurança - usar variáveis de ambiente em produção
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', secrets.token_hex(32))
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///sistema_educacional.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Configurações de segurança adicionais
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file upload
-app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'static', 'uploads')
-# Permitir HTTP em desenvolvimento - ALTERAR PARA True EM PRODUÇÃO
-app.config['SESSION_COOKIE_SECURE'] = False  # Permitir HTTP em desenvolvimento
-app.config['SESSION_COOKIE_HTTPONLY'] = True  # Prevent XSS
-app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'  # CSRF protection
-app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=2)  # Session timeout
+app = create_app()
+telemetria.iniciar(app)
+logger = logging.getLogger('neurolearn.app')
 
 # Extensões permitidas para upload
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx', 'ppt', 'pptx'}
 
-db = SQLAlchemy(app)
-
-# Configuração da API do Gemini - usar variável de ambiente em produção
-GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
-if not GEMINI_API_KEY:
-    print("AVISO: GEMINI_API_KEY não configurada. Funcionalidades de IA serão limitadas.")
-GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
-
-# Modelos do Banco de Dados
-class Usuario(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    nome = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(100), unique=True, nullable=False)
-    senha_hash = db.Column(db.String(100), nullable=False)
-    tipo = db.Column(db.String(20), nullable=False)  # 'professor' ou 'aluno'
-    data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
-
-class Aluno(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
-    email_escola = db.Column(db.String(100))  # ID da escola ou email escolar
-    serie_ano = db.Column(db.String(20), nullable=False)
-    professor_responsavel = db.Column(db.String(100), nullable=False)
-    idade = db.Column(db.Integer, nullable=False)
-    questionario_completo = db.Column(db.Boolean, default=False)
-    perfil_gerado = db.Column(db.Boolean, default=False)
-    observacoes = db.Column(db.Text)
-    usuario = db.relationship('Usuario', backref=db.backref('aluno_perfil', uselist=False))
-
-class Professor(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
-    disciplina = db.Column(db.String(100))
-    formacao = db.Column(db.String(200))
-    usuario = db.relationship('Usuario', backref=db.backref('professor_perfil', uselist=False))
-
-class Atividade(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    titulo = db.Column(db.String(200), nullable=False)
-    descricao = db.Column(db.Text, nullable=False)
-    tipo = db.Column(db.String(50), nullable=False)  # 'logica', 'memoria', 'criatividade', etc.
-    professor_id = db.Column(db.Integer, db.ForeignKey('professor.id'), nullable=False)
-    data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
-    data_limite = db.Column(db.DateTime)  # Data limite para entrega
-    arquivo_anexo = db.Column(db.String(200))  # Nome do arquivo anexado
-    arquivo_original = db.Column(db.String(200))  # Nome original do arquivo
-    pontuacao_maxima = db.Column(db.Integer, default=100)
-    instrucoes_especiais = db.Column(db.Text)  # Instruções adicionais
-    professor = db.relationship('Professor', backref='atividades')
-
-class RespostaAluno(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False)
-    atividade_id = db.Column(db.Integer, db.ForeignKey('atividade.id'), nullable=False)
-    resposta = db.Column(db.Text, nullable=False)
-    tempo_resposta = db.Column(db.Integer)  # em segundos
-    data_envio = db.Column(db.DateTime, default=datetime.utcnow)
-    aluno = db.relationship('Aluno', backref='respostas')
-    atividade = db.relationship('Atividade', backref='respostas')
-
-class AnaliseIA(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False)
-    tipo_analise = db.Column(db.String(100), nullable=False)
-    resultado = db.Column(db.Text, nullable=False)
-    confianca = db.Column(db.Float)  # 0-1
-    data_analise = db.Column(db.DateTime, default=datetime.utcnow)
-    aluno = db.relationship('Aluno', backref='analises')
-
-# Novos modelos para NeuroLearn
-class QuestionarioNeuroLearn(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False)
-    bloco = db.Column(db.Integer, nullable=False)  # 1-7 (blocos temáticos)
-    questao = db.Column(db.Integer, nullable=False)  # 1-67
-    resposta = db.Column(db.Integer, nullable=False)  # 1-5 (escala)
-    data_resposta = db.Column(db.DateTime, default=datetime.utcnow)
-    aluno = db.relationship('Aluno', backref='questionario_respostas')
-
-class PerfilAprendizagem(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False, unique=True)
-    perfil_geral = db.Column(db.Text)
-    potenciais_expressivos = db.Column(db.Text)
-    potenciais_cognitivos = db.Column(db.Text)
-    indicios_neurodivergencias = db.Column(db.Text)
-    recomendacoes_professores = db.Column(db.Text)
-    reforco_motivacional = db.Column(db.Text)
-    tipo_perfil = db.Column(db.String(100))  # para filtros do professor
-    data_geracao = db.Column(db.DateTime, default=datetime.utcnow)
-    aluno = db.relationship('Aluno', backref=db.backref('perfil_aprendizagem', uselist=False))
-
-# Novos modelos para as funcionalidades adicionais
-
-class TestePerfiliCognitivo(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False)
-    tipo_teste = db.Column(db.String(50), nullable=False)  # visual, auditivo, sinestesico, logico
-    pontuacao = db.Column(db.Integer, nullable=False)
-    tempo_resposta = db.Column(db.Integer)  # em segundos
-    data_teste = db.Column(db.DateTime, default=datetime.utcnow)
-    resultados_detalhados = db.Column(db.Text)  # JSON com detalhes
-    aluno = db.relationship('Aluno', backref='testes_cognitivos')
-
-class TrilhaAprendizado(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    nome = db.Column(db.String(200), nullable=False)
-    descricao = db.Column(db.Text)
-    tipo_conteudo = db.Column(db.String(50), nullable=False)  # audio, texto, jogo, video
-    nivel_dificuldade = db.Column(db.String(20), nullable=False)  # facil, medio, dificil
-    area_conhecimento = db.Column(db.String(100), nullable=False)  # matematica, portugues, ciencias, etc
-    perfil_alvo = db.Column(db.String(100))  # tipo de perfil mais adequado
-    duracao_estimada = db.Column(db.Integer)  # em minutos
-    url_conteudo = db.Column(db.String(500))
-    arquivo_conteudo = db.Column(db.String(200))
-    ativo = db.Column(db.Boolean, default=True)
-    data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
-
-class ProgressoTrilha(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False)
-    trilha_id = db.Column(db.Integer, db.ForeignKey('trilha_aprendizado.id'), nullable=False)
-    progresso = db.Column(db.Float, default=0.0)  # 0.0 a 100.0
-    tempo_gasto = db.Column(db.Integer, default=0)  # em minutos
-    data_inicio = db.Column(db.DateTime, default=datetime.utcnow)
-    data_conclusao = db.Column(db.DateTime)
-    feedback_aluno = db.Column(db.Text)
-    dificuldade_percebida = db.Column(db.Integer)  # 1-5
-    aluno = db.relationship('Aluno', backref='progressos_trilha')
-    trilha = db.relationship('TrilhaAprendizado', backref='progressos')
-
-class CronogramaEstudo(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False)
-    data_inicio = db.Column(db.Date, nullable=False)
-    data_fim = db.Column(db.Date, nullable=False)
-    objetivo = db.Column(db.String(200), nullable=False)
-    horas_por_dia = db.Column(db.Float, nullable=False)
-    dias_semana = db.Column(db.String(20), nullable=False)  # "1,2,3,4,5" para seg-sex
-    horario_preferido = db.Column(db.String(20))  # "manha", "tarde", "noite"
-    tempo_pausa = db.Column(db.Integer, default=10)  # minutos de pausa
-    tempo_sessao = db.Column(db.Integer, default=25)  # minutos por sessão (pomodoro)
-    lembretes_ativos = db.Column(db.Boolean, default=True)
-    ativo = db.Column(db.Boolean, default=True)
-    aluno = db.relationship('Aluno', backref='cronogramas')
-
-class SessaoEstudo(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    cronograma_id = db.Column(db.Integer, db.ForeignKey('cronograma_estudo.id'), nullable=False)
-    data_sessao = db.Column(db.DateTime, nullable=False)
-    duracao_planejada = db.Column(db.Integer, nullable=False)  # minutos
-    duracao_real = db.Column(db.Integer)  # minutos
-    realizada = db.Column(db.Boolean, default=False)
-    feedback = db.Column(db.Text)
-    nivel_concentracao = db.Column(db.Integer)  # 1-5
-    trilha_estudada = db.Column(db.Integer, db.ForeignKey('trilha_aprendizado.id'))
-    cronograma = db.relationship('CronogramaEstudo', backref='sessoes')
-    trilha = db.relationship('TrilhaAprendizado', backref='sessoes_estudo')
-
-class BibliotecaConteudo(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    titulo = db.Column(db.String(200), nullable=False)
-    descricao = db.Column(db.Text)
-    tipo = db.Column(db.String(50), nullable=False)  # podcast, video, jogo
-    categoria = db.Column(db.String(100), nullable=False)  # matematica, portugues, ciencias, historia, etc
-    nivel_ensino = db.Column(db.String(20))  # fundamental1, fundamental2, medio
-    url_conteudo = db.Column(db.String(500))
-    arquivo_conteudo = db.Column(db.String(200))
-    tem_legenda = db.Column(db.Boolean, default=False)
-    tem_libras = db.Column(db.Boolean, default=False)
-    tem_transcricao = db.Column(db.String(500))  # arquivo de transcrição
-    duracao = db.Column(db.Integer)  # em minutos
-    classificacao_etaria = db.Column(db.String(10))  # livre, 10, 12, 14, 16, 18
-    tags = db.Column(db.String(500))  # tags separadas por vírgula
-    ativo = db.Column(db.Boolean, default=True)
-    data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
-
-class MonitoramentoComportamento(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False)
-    data_acao = db.Column(db.DateTime, default=datetime.utcnow)
-    tipo_acao = db.Column(db.String(50), nullable=False)  # login, logout, inicio_atividade, fim_atividade, pausa, erro, acerto
-    contexto = db.Column(db.String(100))  # qual atividade, trilha, etc
-    tempo_gasto = db.Column(db.Integer)  # em segundos
-    dispositivo = db.Column(db.String(50))  # mobile, desktop, tablet
-    resultado = db.Column(db.String(20))  # sucesso, erro, incompleto
-    detalhes = db.Column(db.Text)  # informações adicionais em JSON
-    aluno = db.relationship('Aluno', backref='monitoramentos')
-
-class ConfiguracaoAcessibilidade(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False, unique=True)
-    modo_escuro = db.Column(db.Boolean, default=False)
-    alto_contraste = db.Column(db.Boolean, default=False)
-    tamanho_fonte = db.Column(db.String(20), default='normal')  # pequeno, normal, grande, muito-grande
-    audio_leitura = db.Column(db.Boolean, default=False)
-    velocidade_audio = db.Column(db.Float, default=1.0)  # 0.5 a 2.0
-    navegacao_simplificada = db.Column(db.Boolean, default=False)
-    reducao_animacoes = db.Column(db.Boolean, default=False)
-    notificacoes_visuais = db.Column(db.Boolean, default=True)
-    notificacoes_sonoras = db.Column(db.Boolean, default=True)
-    cores_personalizadas = db.Column(db.String(500))  # JSON com cores customizadas
-    usuario = db.relationship('Usuario', backref=db.backref('config_acessibilidade', uselist=False))
-
-class InteracaoAssistente(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
-    mensagem_usuario = db.Column(db.Text, nullable=False)
-    resposta_assistente = db.Column(db.Text, nullable=False)
-    contexto = db.Column(db.String(100))  # dashboard, atividade, cronograma, etc
-    satisfacao_resposta = db.Column(db.Integer)  # 1-5, avaliação do usuário
-    data_interacao = db.Column(db.DateTime, default=datetime.utcnow)
-    resolveu_duvida = db.Column(db.Boolean)
-    usuario = db.relationship('Usuario', backref='interacoes_assistente')
-
-# Função para consultar a IA do Gemini
-def consultar_gemini(prompt):
-    headers = {
-        'Content-Type': 'application/json'
-    }
-    
-    data = {
-        "contents": [
-            {
-                "parts": [
-                    {
-                        "text": prompt
-                    }
-                ]
-            }
-        ]
-    }
-    
-    try:
-        response = requests.post(
-            f"{GEMINI_URL}?key={GEMINI_API_KEY}",
-            headers=headers,
-            json=data
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result['candidates'][0]['content']['parts'][0]['text']
-        else:
-            return f"Erro na API: {response.status_code}"
-    except Exception as e:
-        return f"Erro: {str(e)}"
+# Incrementar quando o HTML das páginas de perfil/relatório mudar (invalida os ETags)
+VERSAO_CACHE_PAGINAS = '1'
 
 # Rotas principais
 @app.route('/')
@@ -425,7 +249,7 @@ def registro():
         novo_usuario = Usuario(
             nome=nome,
             email=email,
-            senha_hash=generate_password_hash(senha),
+            senha_hash=gerar_hash_senha(senha),
             tipo=tipo
         )
         
@@ -455,6 +279,7 @@ def registro():
         # Auto-login: set session for the newly registered user
         session['usuario_id'] = novo_usuario.id
         session['tipo'] = novo_usuario.tipo
+        session.pop('config_acessibilidade', None)
         
         return jsonify({'sucesso': 'Usuário registrado com sucesso'})
     
@@ -465,19 +290,32 @@ def login():
     if request.method == 'POST':
         email = request.form['email']
         senha = request.form['senha']
+        cronometro = CronometroEtapas()
         
-        usuario = Usuario.query.filter_by(email=email).first()
+        usuario, aluno_id = autenticar(email, senha, cronometro)
         
-        if usuario and check_password_hash(usuario.senha_hash, senha):
-            session['usuario_id'] = usuario.id
-            session['tipo'] = usuario.tipo
+        if usuario:
+            with cronometro.etapa('sessao'):
+                session['usuario_id'] = usuario.id
+                session['tipo'] = usuario.tipo
+                session.pop('config_acessibilidade', None)
+            
+            # Registrar login (gravado em segundo plano)
+            if aluno_id:
+                with cronometro.etapa('telemetria'):
+                    telemetria.registrar(aluno_id, 'login', 'sistema',
+                                         user_agent=request.headers.get('User-Agent', ''))
             
             if usuario.tipo == 'professor':
-                return redirect(url_for('dashboard_professor'))
+                resposta = redirect(url_for('dashboard_professor'))
             else:
-                return redirect(url_for('dashboard_aluno'))
+                resposta = redirect(url_for('dashboard_aluno'))
         else:
-            return jsonify({'erro': 'Credenciais inválidas'}), 401
+            resposta = make_response(jsonify({'erro': 'Credenciais inválidas'}), 401)
+        
+        estatisticas_login.registrar(cronometro)
+        resposta.headers['Server-Timing'] = cronometro.server_timing()
+        return resposta
     
     return render_template('login.html')
 
@@ -569,6 +407,41 @@ def criar_atividade():
     
     return render_template('criar_atividade.html')
 
+@app.route('/importar-alunos', methods=['GET', 'POST'])
+@professor_required
+def importar_alunos_turma():
+    """Cadastro em massa de alunos a partir da lista da turma (CSV/XLSX)"""
+    if request.method == 'POST':
+        from importacao_alunos import importar_alunos, relatorio_erros_csv, ErroImportacao, LIMITE_WEB
+        
+        arquivo = request.files.get('arquivo')
+        if not arquivo or arquivo.filename == '':
+            return jsonify({'erro': 'Envie o arquivo da turma'}), 400
+        
+        professor = Usuario.query.get(session['usuario_id'])
+        try:
+            resultado = importar_alunos(
+                arquivo.filename,
+                arquivo.read(),
+                professor_padrao=request.form.get('professor_responsavel') or professor.nome,
+                ignorar_invalidos=request.form.get('ignorar_invalidos') == 'true',
+                limite_linhas=LIMITE_WEB
+            )
+        except ErroImportacao as e:
+            return jsonify({'erro': str(e)}), 400
+        
+        # Relatório de erros para download
+        if request.form.get('formato') == 'csv' and resultado['erros']:
+            resposta = make_response(relatorio_erros_csv(resultado['erros']))
+            resposta.headers['Content-Type'] = 'text/csv; charset=utf-8'
+            resposta.headers['Content-Disposition'] = 'attachment; filename=relatorio_importacao.csv'
+            return resposta
+        
+        status = 200 if resultado['importados'] or not resultado['erros'] else 422
+        return jsonify(resultado), status
+    
+    return render_template('importar_alunos.html')
+
 @app.route('/responder-atividade/<int:atividade_id>', methods=['GET', 'POST'])
 def responder_atividade(atividade_id):
     if 'usuario_id' not in session or session['tipo'] != 'aluno':
@@ -597,11 +470,12 @@ def responder_atividade(atividade_id):
 
 def analisar_resposta_ia(aluno_id, resposta_id):
     """Análise da resposta do aluno usando IA para identificar padrões de neurodivergência"""
-    aluno = Aluno.query.get(aluno_id)
-    resposta = RespostaAluno.query.get(resposta_id)
+    aluno = Aluno.query.options(joinedload(Aluno.usuario)).get(aluno_id)
+    resposta = RespostaAluno.query.options(joinedload(RespostaAluno.atividade)).get(resposta_id)
     
-    # Coletar todas as respostas do aluno
-    todas_respostas = RespostaAluno.query.filter_by(aluno_id=aluno_id).all()
+    # Coletar todas as respostas do aluno (com a atividade, usada no histórico do prompt)
+    todas_respostas = RespostaAluno.query.options(joinedload(RespostaAluno.atividade)) \
+        .filter_by(aluno_id=aluno_id).all()
     
     # Construir prompt para análise baseado em Ontopsicologia
     prompt = f"""
@@ -641,7 +515,7 @@ def analisar_resposta_ia(aluno_id, resposta_id):
     """
     
     try:
-        resultado_ia = consultar_gemini(prompt)
+        resultado_ia = consultar_gemini(prompt, operacao='analise_resposta')
         
         # Salvar análise no banco
         analise = AnaliseIA(
@@ -654,8 +528,8 @@ def analisar_resposta_ia(aluno_id, resposta_id):
         db.session.add(analise)
         db.session.commit()
         
-    except Exception as e:
-        print(f"Erro na análise IA: {e}")
+    except Exception:
+        logger.exception('Erro na análise IA', extra={'aluno_id': aluno_id, 'resposta_id': resposta_id})
 
 @app.route('/relatorio-aluno/<int:aluno_id>')
 def relatorio_aluno(aluno_id):
@@ -676,7 +550,12 @@ def listar_alunos():
     if 'usuario_id' not in session or session['tipo'] != 'professor':
         return redirect(url_for('login'))
     
-    alunos = Aluno.query.all()
+    # O template usa usuario, respostas e analises de cada aluno
+    alunos = Aluno.query.options(
+        joinedload(Aluno.usuario),
+        selectinload(Aluno.respostas),
+        selectinload(Aluno.analises)
+    ).all()
     return render_template('listar_alunos.html', alunos=alunos)
 
 # Rotas específicas do NeuroLearn
@@ -804,12 +683,8 @@ def questionario_neurolearn():
 
 @app.route('/salvar-questionario', methods=['POST'])
 def salvar_questionario():
-    # Debug: verificar sessão
-    print(f"DEBUG - Session data: {dict(session)}")
-    print(f"DEBUG - Session keys: {list(session.keys())}")
-    
     if 'usuario_id' not in session or session['tipo'] != 'aluno':
-        print(f"DEBUG - Falha na autenticação: usuario_id={'usuario_id' in session}, tipo={session.get('tipo')}")
+        logger.debug('Questionário sem sessão de aluno', extra={'tipo': session.get('tipo')})
         return jsonify({'erro': 'Usuário não autenticado'}), 401
     
     aluno = Aluno.query.filter_by(usuario_id=session['usuario_id']).first()
@@ -817,6 +692,8 @@ def salvar_questionario():
     
     try:
         # Limpar respostas anteriores se existirem
+        anteriores = dict(db.session.query(QuestionarioNeuroLearn.questao, QuestionarioNeuroLearn.resposta)
+                          .filter_by(aluno_id=aluno.id))
         QuestionarioNeuroLearn.query.filter_by(aluno_id=aluno.id).delete()
         
         # Salvar novas respostas
@@ -834,8 +711,12 @@ def salvar_questionario():
         
         # Marcar questionário como completo
         aluno.questionario_completo = True
+        registrar_questionario(aluno, anteriores, data['respostas'])
         db.session.commit()
         
+        # Vetor do questionário para a busca de alunos semelhantes
+        atualizar_vetor_aluno(aluno, data['respostas'])
+        
         # Gerar perfil de aprendizagem com IA
         gerar_perfil_aprendizagem(aluno.id)
         
@@ -860,6 +741,11 @@ def gerar_perfil_aprendizagem(aluno_id):
     
     # Criar um perfil básico primeiro (sem dependência da IA)
     perfil_data = gerar_perfil_basico(aluno, respostas_por_bloco)
+    # Com agrupamento ativo o tipo vem do centroide mais próximo, não da IA
+    chaves_ia = ['perfil_geral', 'potenciais_expressivos', 'potenciais_cognitivos', 'indicios_neurodivergencias',
+                 'recomendacoes_professores', 'reforco_motivacional']
+    if not perfil_data['tipo_agrupado']:
+        chaves_ia.append('tipo_perfil')
     
     try:
         # Tentar usar a IA para enriquecer o perfil
@@ -880,10 +766,10 @@ def gerar_perfil_aprendizagem(aluno_id):
         Bloco 6 - Interação Social: {respostas_por_bloco[6]}
         Bloco 7 - Criatividade: {respostas_por_bloco[7]}
         
-        Responda em formato JSON válido com as chaves: perfil_geral, potenciais_expressivos, potenciais_cognitivos, indicios_neurodivergencias, recomendacoes_professores, reforco_motivacional, tipo_perfil
+        Responda em formato JSON válido com as chaves: {', '.join(chaves_ia)}
         """
         
-        resultado_ia = consultar_gemini(prompt)
+        resultado_ia = consultar_gemini(prompt, operacao='perfil')
         
         # Tentar parsear como JSON
         import json
@@ -899,13 +785,13 @@ def gerar_perfil_aprendizagem(aluno_id):
             perfil_ia = json.loads(resultado_limpo)
             # Atualizar com dados da IA se válidos
             for key, value in perfil_ia.items():
-                if value and len(str(value).strip()) > 0:
+                if key in chaves_ia and value and len(str(value).strip()) > 0:
                     perfil_data[key] = value
         except Exception as e:
-            print(f"Erro ao processar resposta da IA: {e}, usando perfil básico")
+            logger.warning('Resposta da IA inválida, usando perfil básico: %s', e, extra={'aluno_id': aluno_id})
         
-    except Exception as e:
-        print(f"Erro ao consultar IA: {e}, usando perfil básico")
+    except Exception:
+        logger.exception('Erro ao consultar IA, usando perfil básico', extra={'aluno_id': aluno_id})
     
     # Garantir que todos os dados são strings válidas antes de salvar
     def garantir_string(valor):
@@ -924,6 +810,8 @@ def gerar_perfil_aprendizagem(aluno_id):
     # Salvar ou atualizar perfil (sempre)
     try:
         perfil_existente = PerfilAprendizagem.query.filter_by(aluno_id=aluno_id).first()
+        registrar_tipo_perfil(aluno, perfil_existente.tipo_perfil if perfil_existente else None,
+                              garantir_string(perfil_data.get('tipo_perfil', '')))
         if perfil_existente:
             perfil_existente.perfil_geral = garantir_string(perfil_data.get('perfil_geral', ''))
             perfil_existente.potenciais_expressivos = garantir_string(perfil_data.get('potenciais_expressivos', ''))
@@ -949,72 +837,26 @@ def gerar_perfil_aprendizagem(aluno_id):
         # Marcar perfil como gerado
         aluno.perfil_gerado = True
         db.session.commit()
+        atualizar_recomendacoes_aluno(aluno_id)
         
-    except Exception as e:
-        print(f"Erro ao salvar perfil: {e}")
+    except Exception:
+        logger.exception('Erro ao salvar perfil', extra={'aluno_id': aluno_id})
         db.session.rollback()
 
 def analisar_consistencia_respostas(aluno_id):
     """Analisa a consistência das respostas para detectar possíveis mentiras"""
-    respostas = QuestionarioNeuroLearn.query.filter_by(aluno_id=aluno_id).all()
+    respostas = dict(db.session.query(QuestionarioNeuroLearn.questao, QuestionarioNeuroLearn.resposta)
+                     .filter_by(aluno_id=aluno_id))
     
-    if len(respostas) < 60:  # Questionário incompleto
+    # Mesmos sinais contados no painel da turma (analytics_turma)
+    sinais = sinais_consistencia(respostas)
+    if 'incompleto' in sinais:
         return {
             'nivel_confianca': 0.5,
-            'inconsistencias': ['Questionário incompleto'],
+            'inconsistencias': [sinais['incompleto']],
             'recomendacao': 'Completar questionário'
         }
-    
-    # Organizar respostas por bloco
-    respostas_por_bloco = {}
-    for i in range(1, 8):
-        respostas_por_bloco[i] = []
-    
-    for resposta in respostas:
-        respostas_por_bloco[resposta.bloco].append(resposta.resposta)
-    
-    # Calcular médias e variâncias
-    medias = {}
-    variancias = {}
-    inconsistencias = []
-    
-    for bloco, valores in respostas_por_bloco.items():
-        if valores:
-            medias[bloco] = sum(valores) / len(valores)
-            variancia = sum((x - medias[bloco]) ** 2 for x in valores) / len(valores)
-            variancias[bloco] = variancia
-    
-    # Detectar inconsistências
-    # 1. Variância muito alta (respostas muito dispersas)
-    alta_variancia = [bloco for bloco, var in variancias.items() if var > 2.5]
-    if alta_variancia:
-        inconsistencias.append(f"Alta variabilidade nos blocos: {', '.join(map(str, alta_variancia))}")
-    
-    # 2. Padrões contraditórios entre blocos relacionados
-    # Atenção vs Organização (devem ser correlacionados)
-    if abs(medias.get(2, 3) - medias.get(4, 3)) > 2.0:
-        inconsistencias.append("Contradição entre Atenção e Organização")
-    
-    # Comunicação vs Social (devem ser correlacionados)
-    if abs(medias.get(3, 3) - medias.get(6, 3)) > 2.0:
-        inconsistencias.append("Contradição entre Comunicação e Interação Social")
-    
-    # 3. Respostas extremas demais (muitos 1s ou 5s)
-    todas_respostas = [r.resposta for r in respostas]
-    extremas = sum(1 for r in todas_respostas if r in [1, 5])
-    porcentagem_extremas = extremas / len(todas_respostas)
-    
-    if porcentagem_extremas > 0.7:
-        inconsistencias.append("Excesso de respostas extremas (muito polarizadas)")
-    
-    # 4. Padrões de resposta repetitivos
-    sequencias_iguais = 0
-    for i in range(len(todas_respostas) - 4):
-        if len(set(todas_respostas[i:i+5])) == 1:  # 5 respostas iguais em sequência
-            sequencias_iguais += 1
-    
-    if sequencias_iguais > 3:
-        inconsistencias.append("Padrões repetitivos detectados (possível falta de atenção)")
+    inconsistencias = list(sinais.values())
     
     # Calcular nível de confiança
     num_inconsistencias = len(inconsistencias)
@@ -1120,6 +962,11 @@ def gerar_perfil_basico(aluno, respostas_por_bloco):
     else:
         tipo_perfil = 'Perfil Equilibrado'
     
+    # Grupo mais próximo do agrupamento k-means da escola, quando já existir
+    tipo_agrupado = tipo_por_centroide([medias[bloco] for bloco in range(1, 8)], aluno.email_escola)
+    if tipo_agrupado:
+        tipo_perfil = tipo_agrupado
+    
     return {
         'perfil_geral': f"O aluno {aluno.usuario.nome} apresenta um perfil de aprendizagem com características marcantes em {', '.join(pontos_fortes) if pontos_fortes else 'múltiplas áreas'}. Seus pontos fortes incluem {', '.join(pontos_fortes) if pontos_fortes else 'habilidades diversificadas'}, o que indica um potencial significativo para o desenvolvimento acadêmico.",
         'potenciais_expressivos': f"O aluno demonstra facilidade para se expressar através de {', '.join(pontos_fortes[:2]) if len(pontos_fortes) >= 2 else 'diferentes modalidades'}. Recomenda-se oferecer oportunidades variadas de expressão para maximizar seu potencial comunicativo.",
@@ -1127,7 +974,8 @@ def gerar_perfil_basico(aluno, respostas_por_bloco):
         'indicios_neurodivergencias': "As respostas indicam um perfil neurotípico com características individuais de aprendizagem que devem ser consideradas no planejamento pedagógico.",
         'recomendacoes_professores': f"1. Valorizar os pontos fortes em {', '.join(pontos_fortes[:3]) if pontos_fortes else 'múltiplas áreas'}. 2. Oferecer atividades diversificadas. 3. Respeitar o ritmo individual de aprendizagem. 4. Promover autoconfiança através de feedbacks positivos.",
         'reforco_motivacional': f"Você tem talentos únicos e especiais! Continue explorando suas habilidades em {', '.join(pontos_fortes[:2]) if len(pontos_fortes) >= 2 else 'diferentes áreas'} e sempre acredite no seu potencial!",
-        'tipo_perfil': tipo_perfil
+        'tipo_perfil': tipo_perfil,
+        'tipo_agrupado': tipo_agrupado is not None
     }
 
 @app.route('/perfil-aprendizagem')
@@ -1154,7 +1002,7 @@ def painel_professor():
     # Buscar alunos com seus perfis
     query = db.session.query(Aluno, PerfilAprendizagem).join(
         PerfilAprendizagem, Aluno.id == PerfilAprendizagem.aluno_id, isouter=True
-    ).join(Usuario, Aluno.usuario_id == Usuario.id)
+    ).join(Usuario, Aluno.usuario_id == Usuario.id).options(contains_eager(Aluno.usuario))
     
     if tipo_filtro:
         query = query.filter(PerfilAprendizagem.tipo_perfil.like(f'%{tipo_filtro}%'))
@@ -1171,6 +1019,7 @@ def painel_professor():
                          tipo_filtro=tipo_filtro)
 
 @app.route('/visualizar-perfil/<int:aluno_id>')
+@cache_condicional_aluno
 def visualizar_perfil(aluno_id):
     if 'usuario_id' not in session or session['tipo'] != 'professor':
         return redirect(url_for('login'))
@@ -1181,6 +1030,7 @@ def visualizar_perfil(aluno_id):
     # Aplicar filtro de formatação para melhorar a apresentação
     perfil_formatado = None
     if perfil:
+        from filtro_relatorio_neurodivergencia import FiltroRelatorioNeurodivergencia
         filtro = FiltroRelatorioNeurodivergencia()
         
         # Criar estrutura de dados para o filtro
@@ -1208,6 +1058,7 @@ def visualizar_perfil(aluno_id):
     return render_template('visualizar_perfil.html', aluno=aluno, perfil=perfil, perfil_formatado=perfil_formatado)
 
 @app.route('/perfil-aluno/<int:aluno_id>')
+@cache_condicional_aluno
 def perfil_aluno_simples(aluno_id):
     """Perfil simplificado do aluno para o professor"""
     if 'usuario_id' not in session or session['tipo'] != 'professor':
@@ -1219,6 +1070,7 @@ def perfil_aluno_simples(aluno_id):
     return render_template('perfil_aluno_simples.html', aluno=aluno, perfil=perfil)
 
 @app.route('/ver-respostas-questionario/<int:aluno_id>')
+@cache_condicional_aluno
 def ver_respostas_questionario(aluno_id):
     """Visualizar todas as respostas do questionário do aluno"""
     if 'usuario_id' not in session or session['tipo'] != 'professor':
@@ -1377,6 +1229,7 @@ def analisar_consistencia(aluno_id):
     return jsonify(analise)
 
 @app.route('/relatorio-detalhado/<int:aluno_id>')
+@cache_condicional_aluno
 def relatorio_detalhado(aluno_id):
     """Relatório detalhado e formatado de neurodivergência - SOMENTE PROFESSOR"""
     if 'usuario_id' not in session or session['tipo'] != 'professor':
@@ -1400,6 +1253,7 @@ def relatorio_detalhado(aluno_id):
     }
     
     # Aplicar filtro para melhorar a apresentação
+    from filtro_relatorio_neurodivergencia import FiltroRelatorioNeurodivergencia
     filtro = FiltroRelatorioNeurodivergencia()
     relatorio_formatado = filtro.formatar_relatorio_detalhado(
         perfil_json, 
@@ -1442,6 +1296,7 @@ def executar_teste_cognitivo():
     
     db.session.add(teste)
     db.session.commit()
+    atualizar_recomendacoes_aluno(aluno.id)
     
     return jsonify({'sucesso': 'Teste salvo com sucesso', 'teste_id': teste.id})
 
@@ -1453,24 +1308,12 @@ def trilhas_aprendizado():
     
     if session['tipo'] == 'aluno':
         aluno = Aluno.query.filter_by(usuario_id=session['usuario_id']).first()
-        perfil = PerfilAprendizagem.query.filter_by(aluno_id=aluno.id).first()
         
-        # Buscar trilhas adequadas ao perfil do aluno
-        trilhas = TrilhaAprendizado.query.filter(
-            TrilhaAprendizado.ativo == True
-        ).all()
-        
-        # Se tem perfil, filtrar por adequação
-        if perfil and perfil.tipo_perfil:
-            trilhas_recomendadas = TrilhaAprendizado.query.filter(
-                TrilhaAprendizado.perfil_alvo.like(f'%{perfil.tipo_perfil}%'),
-                TrilhaAprendizado.ativo == True
-            ).all()
-        else:
-            trilhas_recomendadas = []
+        # Só o top-N pré-calculado (perfil, blocos do questionário, testes e progresso):
+        # o catálogo inteiro não é lido a cada visita
+        trilhas_recomendadas = [r.trilha for r in recomendacoes_do_aluno(aluno.id)]
         
         return render_template('trilhas_aluno.html', 
-                             trilhas=trilhas, 
                              trilhas_recomendadas=trilhas_recomendadas,
                              aluno=aluno)
     else:
@@ -1497,7 +1340,9 @@ def criar_trilha():
         )
         
         db.session.add(trilha)
+        sincronizar_perfis_trilha(trilha)
         db.session.commit()
+        agendar_atualizacao_trilha(app, trilha.id)
         
         return redirect(url_for('trilhas_aprendizado'))
     
@@ -1523,6 +1368,7 @@ def iniciar_trilha(trilha_id):
             progresso=0.0
         )
         db.session.add(progresso)
+        registrar_progresso_trilha(aluno, None, 0.0)
         db.session.commit()
     
     # Registrar monitoramento
@@ -1543,6 +1389,7 @@ def atualizar_progresso_trilha():
     ).first()
     
     if progresso:
+        registrar_progresso_trilha(aluno, progresso.progresso or 0.0, data['progresso'])
         progresso.progresso = data['progresso']
         progresso.tempo_gasto += data.get('tempo_adicional', 0)
         
@@ -1551,6 +1398,10 @@ def atualizar_progresso_trilha():
         
         db.session.commit()
         
+        # Trilha concluída sai da lista de recomendações
+        if data['progresso'] >= 100.0:
+            atualizar_recomendacoes_aluno(aluno.id)
+        
         # Registrar monitoramento
         registrar_monitoramento(aluno.id, 'progresso_trilha', 
                                f"trilha_{data['trilha_id']}", 
@@ -1655,7 +1506,9 @@ def sessoes_hoje():
     aluno = Aluno.query.filter_by(usuario_id=session['usuario_id']).first()
     hoje = datetime.now().date()
     
-    sessoes = db.session.query(SessaoEstudo).join(CronogramaEstudo).filter(
+    sessoes = db.session.query(SessaoEstudo).join(CronogramaEstudo).options(
+        contains_eager(SessaoEstudo.cronograma)
+    ).filter(
         CronogramaEstudo.aluno_id == aluno.id,
         db.func.date(SessaoEstudo.data_sessao) == hoje
     ).all()
@@ -1776,16 +1629,9 @@ def assistente_virtual():
     
     return render_template('assistente_virtual.html')
 
-@app.route('/conversar-assistente', methods=['POST'])
-def conversar_assistente():
-    if 'usuario_id' not in session:
-        return jsonify({'erro': 'Usuário não autenticado'}), 401
-    
-    data = request.get_json()
-    mensagem = data['mensagem']
-    contexto = data.get('contexto', 'geral')
-    
-    # Construir prompt contextualizado
+def montar_prompt_assistente(mensagem, contexto, historico=''):
+    """Prompt do assistente virtual conforme o tipo de usuário da sessão"""
+    historico = f"Histórico da conversa:\n{historico}\n" if historico else ''
     if session['tipo'] == 'aluno':
         aluno = Aluno.query.filter_by(usuario_id=session['usuario_id']).first()
         perfil = PerfilAprendizagem.query.filter_by(aluno_id=aluno.id).first()
@@ -1799,7 +1645,7 @@ def conversar_assistente():
         - Tipo de perfil: {perfil.tipo_perfil if perfil else 'Não definido'}
         
         Contexto da conversa: {contexto}
-        
+        {historico}
         Pergunta do estudante: {mensagem}
         
         Responda de forma acolhedora, educativa e adequada à idade. Use linguagem simples e seja motivacional.
@@ -1809,13 +1655,42 @@ def conversar_assistente():
         Você é um assistente virtual educacional especializado em auxiliar professores.
         
         Contexto da conversa: {contexto}
+        {historico}
         Pergunta do professor: {mensagem}
         
         Responda com informações pedagógicas úteis, estratégias de ensino e sugestões práticas.
         """
+    return prompt
+
+def buscar_resposta_faq(mensagem, contexto):
+    """Resposta bem avaliada para uma pergunta quase igual (None = consultar o Gemini)"""
+    usuario = Usuario.query.get(session['usuario_id'])
+    return cache_faq.buscar(mensagem, contexto, session['tipo'], usuario.nome if usuario else None)
+
+def evento_sse(evento, dados):
+    """Formata um evento Server-Sent Events com dados em JSON"""
+    return f"event: {evento}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+@app.route('/conversar-assistente', methods=['POST'])
+def conversar_assistente():
+    if 'usuario_id' not in session:
+        return jsonify({'erro': 'Usuário não autenticado'}), 401
+    
+    data = request.get_json()
+    mensagem = data['mensagem']
+    contexto = data.get('contexto', 'geral')
     
     try:
-        resposta = consultar_gemini(prompt)
+        conversa = obter_conversa(session['usuario_id'], contexto, data.get('conversa_id'),
+                                  data.get('nova_conversa', False))
+        # Pergunta frequente já bem avaliada: responde sem chamar a IA (só na abertura
+        # da conversa; depois a resposta depende do histórico)
+        faq = buscar_resposta_faq(mensagem, contexto) if not conversa.turnos else None
+        if faq:
+            resposta = faq['resposta']
+        else:
+            prompt = montar_prompt_assistente(mensagem, contexto, montar_historico(conversa))
+            resposta = consultar_gemini(prompt, operacao='assistente')
         
         # Salvar interação
         interacao = InteracaoAssistente(
@@ -1824,14 +1699,78 @@ def conversar_assistente():
             resposta_assistente=resposta,
             contexto=contexto
         )
+        # Falha da IA fica registrada, mas fora da conversa (não entra no histórico nem no resumo)
+        resposta_valida = not resposta.startswith('Erro')
+        if resposta_valida:
+            registrar_turno(conversa, interacao)
         
         db.session.add(interacao)
         db.session.commit()
+        if resposta_valida:
+            agendar_compactacao(app, conversa)
         
-        return jsonify({'resposta': resposta, 'interacao_id': interacao.id})
+        return jsonify({'resposta': resposta, 'interacao_id': interacao.id, 'conversa_id': conversa.id,
+                        'cache': faq is not None})
     
-    except Exception as e:
-        return jsonify({'erro': f'Erro no assistente: {str(e)}'}), 500
+    except Exception:
+        db.session.rollback()
+        logger.exception('Erro no assistente')
+        return jsonify({'erro': 'Assistente indisponível'}), 500
+
+@app.route('/conversar-assistente/stream', methods=['POST'])
+def conversar_assistente_stream():
+    """Mesma conversa de /conversar-assistente, com a resposta em Server-Sent Events
+    
+    Eventos: 'trecho' {texto} a cada pedaço gerado, 'fim' {interacao_id, conversa_id} depois
+    de gravar a resposta completa, 'erro' {erro} se a IA falhar. Como é POST,
+    o navegador lê com fetch() + ReadableStream (EventSource só faz GET).
+    """
+    if 'usuario_id' not in session:
+        return jsonify({'erro': 'Usuário não autenticado'}), 401
+    
+    data = request.get_json()
+    mensagem = data['mensagem']
+    contexto = data.get('contexto', 'geral')
+    usuario_id = session['usuario_id']
+    conversa = obter_conversa(usuario_id, contexto, data.get('conversa_id'), data.get('nova_conversa', False))
+    faq = buscar_resposta_faq(mensagem, contexto) if not conversa.turnos else None
+    prompt = None if faq else montar_prompt_assistente(mensagem, contexto, montar_historico(conversa))
+    
+    def eventos():
+        # Comentário SSE: envia os cabeçalhos antes da primeira resposta da IA
+        yield ': conectado\n\n'
+        trechos = []
+        if faq:
+            trechos.append(faq['resposta'])
+            yield evento_sse('trecho', {'texto': faq['resposta']})
+        else:
+            try:
+                for trecho in consultar_gemini_stream(prompt, operacao='assistente'):
+                    trechos.append(trecho)
+                    yield evento_sse('trecho', {'texto': trecho})
+            except ErroGemini:
+                # Detalhe já registrado por cliente_gemini; nada da exceção vai para o navegador
+                yield evento_sse('erro', {'erro': 'Assistente indisponível'})
+                return
+        
+        # Só o texto final é gravado
+        interacao = InteracaoAssistente(
+            usuario_id=usuario_id,
+            mensagem_usuario=mensagem,
+            resposta_assistente=''.join(trechos),
+            contexto=contexto
+        )
+        registrar_turno(conversa, interacao)
+        db.session.add(interacao)
+        db.session.commit()
+        agendar_compactacao(app, conversa)
+        yield evento_sse('fim', {'interacao_id': interacao.id, 'conversa_id': conversa.id,
+                                 'cache': faq is not None})
+    
+    resposta = Response(stream_with_context(eventos()), mimetype='text/event-stream')
+    resposta.headers['Cache-Control'] = 'no-cache'
+    resposta.headers['X-Accel-Buffering'] = 'no'  # nginx não deve acumular o stream
+    return resposta
 
 @app.route('/avaliar-resposta-assistente', methods=['POST'])
 def avaliar_resposta_assistente():
@@ -1848,10 +1787,66 @@ def avaliar_resposta_assistente():
     interacao.resolveu_duvida = resolveu
     
     db.session.commit()
+    # A avaliação pode tornar a resposta elegível (ou não) para o cache de perguntas frequentes
+    cache_faq.invalidar(interacao.contexto, interacao.usuario.tipo)
     
     return jsonify({'sucesso': 'Avaliação salva'})
 
 # 6. CONFIGURAÇÕES DE ACESSIBILIDADE
+
+# Valores de tamanho_fonte -> classes font-* usadas pelo base.html
+TAMANHOS_FONTE_INTERFACE = {
+    'pequeno': 'small',
+    'normal': 'normal',
+    'grande': 'large',
+    'muito-grande': 'extra-large'
+}
+
+def serializar_config_acessibilidade(config):
+    """Converte ConfiguracaoAcessibilidade em dict (formato do endpoint JSON)"""
+    if not config:
+        return {}
+    return {
+        'modo_escuro': config.modo_escuro,
+        'alto_contraste': config.alto_contraste,
+        'tamanho_fonte': config.tamanho_fonte,
+        'audio_leitura': config.audio_leitura,
+        'velocidade_audio': config.velocidade_audio,
+        'navegacao_simplificada': config.navegacao_simplificada,
+        'reducao_animacoes': config.reducao_animacoes,
+        'notificacoes_visuais': config.notificacoes_visuais,
+        'notificacoes_sonoras': config.notificacoes_sonoras,
+        'cores_personalizadas': json.loads(config.cores_personalizadas or '{}')
+    }
+
+def obter_config_acessibilidade_sessao():
+    """Configurações do usuário logado, consultadas no banco uma vez por sessão"""
+    if 'usuario_id' not in session:
+        return None
+
+    config = session.get('config_acessibilidade')
+    registrar_cache('acessibilidade_sessao', config is not None)
+    if config is None:
+        config = serializar_config_acessibilidade(
+            ConfiguracaoAcessibilidade.query.filter_by(usuario_id=session['usuario_id']).first()
+        )
+        session['config_acessibilidade'] = config
+    return config
+
+@app.context_processor
+def injetar_config_acessibilidade():
+    """Disponibiliza as configurações no formato do AccessibilityManager (base.html)"""
+    config = obter_config_acessibilidade_sessao()
+    if not config:
+        return {'acessibilidade': None}
+    return {'acessibilidade': {
+        'darkMode': bool(config.get('modo_escuro')),
+        'highContrast': bool(config.get('alto_contraste')),
+        'fontSize': TAMANHOS_FONTE_INTERFACE.get(config.get('tamanho_fonte'), 'normal'),
+        'reduceAnimations': bool(config.get('reducao_animacoes')),
+        'simpleNavigation': bool(config.get('navegacao_simplificada'))
+    }}
+
 @app.route('/configuracoes-acessibilidade')
 def configuracoes_acessibilidade():
     if 'usuario_id' not in session:
@@ -1883,19 +1878,24 @@ def salvar_configuracoes_acessibilidade():
     
     data = request.get_json()
     
-    config.modo_escuro = data.get('modo_escuro', False)
-    config.alto_contraste = data.get('alto_contraste', False)
-    config.tamanho_fonte = data.get('tamanho_fonte', 'normal')
-    config.audio_leitura = data.get('audio_leitura', False)
-    config.velocidade_audio = data.get('velocidade_audio', 1.0)
-    config.navegacao_simplificada = data.get('navegacao_simplificada', False)
-    config.reducao_animacoes = data.get('reducao_animacoes', False)
-    config.notificacoes_visuais = data.get('notificacoes_visuais', True)
-    config.notificacoes_sonoras = data.get('notificacoes_sonoras', True)
-    config.cores_personalizadas = json.dumps(data.get('cores_personalizadas', {}))
+    # Atualizar apenas os campos enviados: o atalho de modo escuro do base.html
+    # envia só as opções visuais e não deve zerar as demais
+    campos = ['modo_escuro', 'alto_contraste', 'tamanho_fonte', 'audio_leitura',
+              'velocidade_audio', 'navegacao_simplificada', 'reducao_animacoes',
+              'notificacoes_visuais', 'notificacoes_sonoras']
+    for campo in campos:
+        if campo in data:
+            setattr(config, campo, data[campo])
+    if 'cores_personalizadas' in data:
+        config.cores_personalizadas = json.dumps(data['cores_personalizadas'])
     
     db.session.commit()
     
+    # Atualizar o cache da sessão (usado por base.html e pelo endpoint JSON)
+    session['config_acessibilidade'] = serializar_config_acessibilidade(config)
+    # Invalida o Last-Modified das páginas em cache (cache_condicional_aluno)
+    session['config_acessibilidade_alterada'] = int(datetime.now(timezone.utc).timestamp())
+    
     return jsonify({'sucesso': 'Configurações salvas'})
 
 @app.route('/obter-configuracoes-acessibilidade')
@@ -1903,25 +1903,12 @@ def obter_configuracoes_acessibilidade():
     if 'usuario_id' not in session:
         return jsonify({'erro': 'Usuário não autenticado'}), 401
     
-    config = ConfiguracaoAcessibilidade.query.filter_by(
-        usuario_id=session['usuario_id']
-    ).first()
-    
-    if not config:
-        return jsonify({})
+    config = obter_config_acessibilidade_sessao()
     
-    return jsonify({
-        'modo_escuro': config.modo_escuro,
-        'alto_contraste': config.alto_contraste,
-        'tamanho_fonte': config.tamanho_fonte,
-        'audio_leitura': config.audio_leitura,
-        'velocidade_audio': config.velocidade_audio,
-        'navegacao_simplificada': config.navegacao_simplificada,
-        'reducao_animacoes': config.reducao_animacoes,
-        'notificacoes_visuais': config.notificacoes_visuais,
-        'notificacoes_sonoras': config.notificacoes_sonoras,
-        'cores_personalizadas': json.loads(config.cores_personalizadas or '{}')
-    })
+    resposta = jsonify(config)
+    resposta.set_etag(hashlib.sha1(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest())
+    resposta.headers['Cache-Control'] = 'private, no-cache'
+    return resposta.make_conditional(request)
 
 # 7. BIBLIOTECA DE CONTEÚDO
 @app.route('/biblioteca')
@@ -1942,21 +1929,57 @@ def biblioteca():
         query = query.filter(BibliotecaConteudo.categoria == categoria)
     if nivel:
         query = query.filter(BibliotecaConteudo.nivel_ensino == nivel)
+    # tags=a,b com qualquer uma delas; todas_tags=1 exige todas
+    tags = [tag for tag in request.args.get('tags', '').split(',') if tag.strip()]
+    if tags:
+        query = filtrar_por_tags(query, tags, todas=request.args.get('todas_tags') == '1')
     
     conteudos = query.all()
     
-    # Buscar categorias e tipos únicos para filtros
-    categorias = db.session.query(BibliotecaConteudo.categoria).distinct().all()
-    tipos = db.session.query(BibliotecaConteudo.tipo).distinct().all()
-    niveis = db.session.query(BibliotecaConteudo.nivel_ensino).distinct().all()
+    # Opções dos filtros com contagens, a partir do cubo de facetas em cache
+    facetas = contar_facetas({'tipo': tipo, 'categoria': categoria, 'nivel_ensino': nivel})
     
     return render_template('biblioteca.html', 
                          conteudos=conteudos,
-                         categorias=[c[0] for c in categorias if c[0]],
-                         tipos=[t[0] for t in tipos if t[0]],
-                         niveis=[n[0] for n in niveis if n[0]],
+                         facetas=facetas['facetas'],
+                         categorias=[f['valor'] for f in facetas['facetas']['categoria']],
+                         tipos=[f['valor'] for f in facetas['facetas']['tipo']],
+                         niveis=[f['valor'] for f in facetas['facetas']['nivel_ensino']],
                          filtros={'tipo': tipo, 'categoria': categoria, 'nivel': nivel})
 
+@app.route('/biblioteca/facetas')
+def facetas_biblioteca():
+    """Contagem de conteúdos por categoria, tipo e nível sob os filtros aplicados"""
+    if 'usuario_id' not in session:
+        return jsonify({'erro': 'Usuário não autenticado'}), 401
+    
+    return jsonify(contar_facetas({
+        'tipo': request.args.get('tipo', ''),
+        'categoria': request.args.get('categoria', ''),
+        'nivel_ensino': request.args.get('nivel_ensino', '')
+    }))
+
+@app.route('/biblioteca/buscar')
+def buscar_biblioteca():
+    """Busca textual (FTS5/BM25) combinada com os filtros da biblioteca"""
+    if 'usuario_id' not in session:
+        return jsonify({'erro': 'Usuário não autenticado'}), 401
+
+    termos = request.args.get('q', '').strip()
+    if not termos:
+        return jsonify({'erro': 'Informe o texto da busca (parâmetro q)'}), 400
+
+    resultado = buscar_conteudos(
+        termos,
+        tipo=request.args.get('tipo', ''),
+        categoria=request.args.get('categoria', ''),
+        nivel=request.args.get('nivel_ensino', ''),
+        limite=request.args.get('limite', 20, type=int),
+        pagina=request.args.get('pagina', 1, type=int),
+        prefixo_ultimo=request.args.get('prefixo', 'true').lower() != 'false'
+    )
+    return jsonify(resultado)
+
 @app.route('/adicionar-conteudo-biblioteca', methods=['GET', 'POST'])
 def adicionar_conteudo_biblioteca():
     if 'usuario_id' not in session or session['tipo'] != 'professor':
@@ -1980,7 +2003,9 @@ def adicionar_conteudo_biblioteca():
         )
         
         db.session.add(conteudo)
+        sincronizar_tags_conteudo(conteudo)
         db.session.commit()
+        invalidar_facetas()
         
         return redirect(url_for('biblioteca'))
     
@@ -2011,8 +2036,8 @@ def registrar_monitoramento(aluno_id, tipo_acao, contexto, tempo_gasto=None, res
         
         db.session.add(monitoramento)
         db.session.commit()
-    except Exception as e:
-        print(f"Erro ao registrar monitoramento: {e}")
+    except Exception:
+        logger.exception('Erro ao registrar monitoramento', extra={'aluno_id': aluno_id, 'tipo_acao': tipo_acao})
 
 @app.route('/relatorio-comportamento/<int:aluno_id>')
 def relatorio_comportamento(aluno_id):
@@ -2084,44 +2109,87 @@ def relatorio_comportamento(aluno_id):
                          analise=analise,
                          monitoramentos=monitoramentos[:20])  # Últimas 20 ações
 
-# Atualizar rotas existentes para incluir monitoramento
-@app.route('/login', methods=['GET', 'POST'])
-def login_com_monitoramento():
-    if request.method == 'POST':
-        email = request.form['email']
-        senha = request.form['senha']
-        
-        usuario = Usuario.query.filter_by(email=email).first()
-        
-        if usuario and check_password_hash(usuario.senha_hash, senha):
-            session['usuario_id'] = usuario.id
-            session['tipo'] = usuario.tipo
-            
-            # Registrar login
-            if usuario.tipo == 'aluno':
-                aluno = Aluno.query.filter_by(usuario_id=usuario.id).first()
-                if aluno:
-                    registrar_monitoramento(aluno.id, 'login', 'sistema')
-            
-            if usuario.tipo == 'professor':
-                return redirect(url_for('dashboard_professor'))
-            else:
-                return redirect(url_for('dashboard_aluno'))
-        else:
-            return jsonify({'erro': 'Credenciais inválidas'}), 401
-    
-    return render_template('login.html')
-
 @app.route('/logout')
 def logout():
     if 'usuario_id' in session and session['tipo'] == 'aluno':
         aluno = Aluno.query.filter_by(usuario_id=session['usuario_id']).first()
         if aluno:
-            registrar_monitoramento(aluno.id, 'logout', 'sistema')
+            telemetria.registrar(aluno.id, 'logout', 'sistema',
+                                 user_agent=request.headers.get('User-Agent', ''))
     
     session.clear()
     return redirect(url_for('index'))
 
+@app.route('/estatisticas-login')
+@professor_required
+def estatisticas_login_json():
+    """Tempo médio/máximo de cada etapa do login neste processo"""
+    return jsonify({
+        'etapas': estatisticas_login.resumo(),
+        'telemetria': {
+            'fila': telemetria.tamanho(),
+            'gravados': telemetria.gravados,
+            'descartados': telemetria.descartados
+        }
+    })
+
+@app.route('/alunos-similares/<int:aluno_id>')
+@professor_required
+def alunos_similares(aluno_id):
+    """Alunos com respostas do questionário mais parecidas, na turma ou na escola"""
+    aluno = Aluno.query.get_or_404(aluno_id)
+    k = max(1, min(request.args.get('k', 5, type=int), K_MAXIMO))
+    escopo = 'escola' if request.args.get('escopo') == 'escola' else 'turma'
+    
+    resultado = indice_similares.buscar(aluno.id, k, escopo)
+    if resultado is None:
+        # Vetor ainda não gravado (questionário anterior a este recurso)
+        respostas = dict(db.session.query(QuestionarioNeuroLearn.questao, QuestionarioNeuroLearn.resposta)
+                         .filter_by(aluno_id=aluno.id))
+        if not respostas:
+            return jsonify({'erro': 'Aluno ainda não respondeu o questionário'}), 404
+        atualizar_vetor_aluno(aluno, respostas)
+        resultado = indice_similares.buscar(aluno.id, k, escopo) or []
+    
+    similaridades = dict(resultado)
+    detalhes = {}
+    if similaridades:
+        for aluno_similar_id, nome, serie_ano, tipo_perfil in db.session.query(
+            Aluno.id, Usuario.nome, Aluno.serie_ano, PerfilAprendizagem.tipo_perfil
+        ).join(Usuario, Usuario.id == Aluno.usuario_id).outerjoin(
+            PerfilAprendizagem, PerfilAprendizagem.aluno_id == Aluno.id
+        ).filter(Aluno.id.in_(list(similaridades))):
+            detalhes[aluno_similar_id] = {'nome': nome, 'serie_ano': serie_ano, 'tipo_perfil': tipo_perfil}
+    
+    return jsonify({
+        'aluno_id': aluno.id,
+        'escopo': escopo,
+        'similares': [
+            dict(detalhes[aluno_similar_id], aluno_id=aluno_similar_id, similaridade=round(similaridade, 4))
+            for aluno_similar_id, similaridade in resultado if aluno_similar_id in detalhes
+        ]
+    })
+
+@app.route('/agrupamento-perfis')
+@professor_required
+def agrupamento_perfis():
+    """Tamanho dos grupos de perfil e deriva entre as execuções do agrupamento"""
+    escola = request.args.get('escola', '').strip().lower()
+    return jsonify({'escola': escola, 'execucoes': relatorio_agrupamento(escola)})
+
+@app.route('/analytics-turma')
+@professor_required
+def analytics_turma_json():
+    """Médias por bloco, histogramas, perfis, consistência e trilhas de uma turma"""
+    return jsonify(analytics_turma(
+        request.args.get('serie_ano', '').strip(),
+        request.args.get('professor_responsavel', '').strip()
+    ))
+
+# Pré-compilar todos os templates ao iniciar o worker (opcional)
+if os.environ.get('PRECOMPILAR_TEMPLATES', 'False').lower() == 'true':
+    imprimir_relatorio(*precompilar_templates(app))
+
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
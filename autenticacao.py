@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Autenticação do NeuroLearn
+- Uma única consulta traz o usuário e o id do perfil de aluno (outer join)
+- O custo do hash de senha é configurável por HASH_SENHA_METODO; hashes
+  antigos são regravados com o método atual no primeiro login bem-sucedido
+- Cada etapa do login é cronometrada (header Server-Timing e estatísticas
+  agregadas por processo)
+"""
+
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from modelos import db, Usuario, Aluno
+from metricas import login_etapa_segundos
+
+# Método no formato do werkzeug, ex.: 'pbkdf2:sha256:260000' (padrão do werkzeug 2.0)
+METODO_HASH_SENHA = os.environ.get('HASH_SENHA_METODO', 'pbkdf2:sha256:260000')
+
+_cache_hash = {}
+
+def gerar_hash_senha(senha):
+    """Gera o hash da senha com o método configurado"""
+    return generate_password_hash(senha, method=METODO_HASH_SENHA)
+
+def _prefixo_metodo_atual():
+    """Prefixo 'método:parâmetros' que os hashes atuais devem ter"""
+    if 'prefixo' not in _cache_hash:
+        _cache_hash['prefixo'] = gerar_hash_senha('referencia').split('$', 1)[0]
+    return _cache_hash['prefixo']
+
+def _hash_ficticio():
+    """Hash usado quando o email não existe, para que a resposta leve o mesmo tempo"""
+    if 'ficticio' not in _cache_hash:
+        _cache_hash['ficticio'] = gerar_hash_senha(os.urandom(16).hex())
+    return _cache_hash['ficticio']
+
+def precisa_rehash(senha_hash):
+    """True se o hash foi gerado com um método/custo diferente do configurado"""
+    return senha_hash.split('$', 1)[0] != _prefixo_metodo_atual()
+
+
+# ===== VALIDAÇÃO =====
+
+def validar_email(email):
+    """Valida formato de email"""
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return re.match(pattern, email) is not None
+
+def validar_senha(senha):
+    """Valida força da senha"""
+    if len(senha) < 8:
+        return False, "Senha deve ter pelo menos 8 caracteres"
+    if len(senha) > 128:
+        return False, "Senha muito longa (máximo 128 caracteres)"
+    if not re.search(r'[A-Za-z]', senha):
+        return False, "Senha deve conter pelo menos uma letra"
+    if not re.search(r'[0-9]', senha):
+        return False, "Senha deve conter pelo menos um número"
+    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', senha):
+        return False, "Senha deve conter pelo menos um caractere especial"
+    # Verificar se não é uma senha comum
+    senhas_comuns = ['12345678', 'password', 'password123', '123456789', 'qwerty123']
+    if senha.lower() in senhas_comuns:
+        return False, "Senha muito comum, escolha uma senha mais segura"
+    return True, "Senha válida"
+
+
+# ===== CRONOMETRAGEM DAS ETAPAS =====
+
+class CronometroEtapas:
+    """Mede a duração de cada etapa de uma requisição"""
+
+    def __init__(self):
+        self.etapas = []
+
+    @contextmanager
+    def etapa(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas.append((nome, (time.perf_counter() - inicio) * 1000))
+
+    def server_timing(self):
+        """Valor do header Server-Timing (ex.: 'consulta;dur=1.2, senha;dur=85.0')"""
+        return ', '.join(f'{nome};dur={duracao:.1f}' for nome, duracao in self.etapas)
+
+
+class EstatisticasEtapas:
+    """Contagem, soma e máximo (ms) de cada etapa, acumulados no processo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dados = {}
+
+    def registrar(self, cronometro):
+        with self._lock:
+            for nome, duracao in cronometro.etapas:
+                dados = self._dados.setdefault(nome, {'contagem': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+                dados['contagem'] += 1
+                dados['total_ms'] += duracao
+                dados['max_ms'] = max(dados['max_ms'], duracao)
+        for nome, duracao in cronometro.etapas:
+            login_etapa_segundos.observar(duracao / 1000, etapa=nome)
+
+    def resumo(self):
+        with self._lock:
+            return {
+                nome: {
+                    'contagem': dados['contagem'],
+                    'media_ms': round(dados['total_ms'] / dados['contagem'], 2),
+                    'max_ms': round(dados['max_ms'], 2),
+                }
+                for nome, dados in self._dados.items()
+            }
+
+estatisticas_login = EstatisticasEtapas()
+
+
+# ===== AUTENTICAÇÃO =====
+
+def autenticar(email, senha, cronometro):
+    """Valida as credenciais e retorna (usuario, aluno_id) ou (None, None)"""
+    with cronometro.etapa('consulta'):
+        linha = db.session.query(Usuario, Aluno.id) \
+            .outerjoin(Aluno, Aluno.usuario_id == Usuario.id) \
+            .filter(Usuario.email == email) \
+            .first()
+
+    with cronometro.etapa('senha'):
+        if linha is None:
+            check_password_hash(_hash_ficticio(), senha)
+            return None, None
+        usuario, aluno_id = linha
+        if not check_password_hash(usuario.senha_hash, senha):
+            return None, None
+
+    if precisa_rehash(usuario.senha_hash):
+        with cronometro.etapa('rehash'):
+            usuario.senha_hash = gerar_hash_senha(senha)
+            db.session.commit()
+
+    return usuario, aluno_id
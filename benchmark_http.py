@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark HTTP de ponta a ponta das rotas mais usadas do NeuroLearn
+Faz login de alunos e professores simulados (dados de gerar_dados_carga.py)
+e dispara uma mistura de requisições com concorrência configurável.
+
+Por rota, relata vazão, latência p50/p95/p99 e a quantidade de consultas SQL
+(headers X-Consultas-SQL / X-Tempo-SQL-ms, enviados pela aplicação em modo
+debug ou com INSTRUMENTACAO_SQL_HEADERS=true; sem eles a coluna SQL fica
+vazia e o relatório avisa). O resultado pode ser salvo em JSON e comparado com execuções
+anteriores para detectar regressões.
+
+Pré-requisitos:
+    python gerar_dados_carga.py --alunos 1000
+    python servidor_gemini_stub.py --silencioso      # evita chamar o Gemini real
+    GEMINI_URL=http://127.0.0.1:8089/v1beta/models/gemini-2.0-flash:generateContent python app.py
+
+Uso:
+    python benchmark_http.py --concorrencia 20 --duracao 60 --json antes.json
+    python benchmark_http.py --concorrencia 20 --duracao 60 --comparar antes.json
+    python benchmark_http.py --rotas painel_professor,alunos --duracao 30
+
+Atenção: /salvar-questionario regrava as respostas dos alunos de carga.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sqlite3
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.abspath(__file__))
+SENHA_CARGA = '123456'
+
+PERGUNTAS = [
+    'Como organizo meu tempo de estudo?',
+    'Pode me explicar frações de um jeito simples?',
+    'Como faço para me concentrar melhor?',
+]
+
+# nome: (tipo de usuário, peso na mistura)
+ROTAS = {
+    'salvar_questionario': ('aluno', 1),
+    'painel_professor': ('professor', 3),
+    'alunos': ('professor', 2),
+    'visualizar_perfil': ('professor', 4),
+    'dados_progresso_aluno': ('professor', 4),
+    'biblioteca': ('aluno', 4),
+    'conversar_assistente': ('aluno', 2),
+}
+
+
+# ===== DADOS DE CARGA =====
+
+def carregar_contas(banco, max_alunos, max_professores):
+    """Lê do SQLite os emails dos usuários de carga e os ids de alunos com perfil"""
+    conexao = sqlite3.connect(banco)
+    try:
+        alunos = [email for (email,) in conexao.execute(
+            "SELECT email FROM usuario WHERE email LIKE 'carga.aluno%' ORDER BY id LIMIT ?", (max_alunos,))]
+        professores = [email for (email,) in conexao.execute(
+            "SELECT email FROM usuario WHERE email LIKE 'carga.professor%' ORDER BY id LIMIT ?", (max_professores,))]
+        aluno_ids = [i for (i,) in conexao.execute(
+            "SELECT aluno.id FROM aluno JOIN usuario ON usuario.id = aluno.usuario_id "
+            "WHERE usuario.email LIKE 'carga.%' AND aluno.perfil_gerado = 1 ORDER BY aluno.id")]
+    finally:
+        conexao.close()
+    return alunos, professores, aluno_ids
+
+
+# ===== CLIENTE =====
+
+class UsuarioVirtual:
+    """Sessão HTTP autenticada de um aluno ou professor"""
+
+    def __init__(self, base_url, email, tipo):
+        self.base_url = base_url
+        self.email = email
+        self.tipo = tipo
+        self.sessao = requests.Session()
+
+    def entrar(self):
+        resposta = self.sessao.post(f'{self.base_url}/login',
+                                    data={'email': self.email, 'senha': SENHA_CARGA},
+                                    allow_redirects=False)
+        if resposta.status_code != 302:
+            raise RuntimeError(f'login de {self.email} falhou ({resposta.status_code})')
+        return self
+
+
+def montar_requisicao(rota, rng, aluno_ids):
+    """(método, caminho, json) de cada rota do benchmark"""
+    if rota == 'salvar_questionario':
+        respostas = {str(q): rng.randint(1, 5) for q in range(1, 68)}
+        return 'POST', '/salvar-questionario', {'respostas': respostas}
+    if rota == 'painel_professor':
+        return 'GET', '/painel-professor', None
+    if rota == 'alunos':
+        return 'GET', '/alunos', None
+    if rota == 'visualizar_perfil':
+        return 'GET', f'/visualizar-perfil/{rng.choice(aluno_ids)}', None
+    if rota == 'dados_progresso_aluno':
+        return 'GET', f'/dados-progresso-aluno/{rng.choice(aluno_ids)}', None
+    if rota == 'biblioteca':
+        return 'GET', '/biblioteca', None
+    if rota == 'conversar_assistente':
+        return 'POST', '/conversar-assistente', {'mensagem': rng.choice(PERGUNTAS), 'contexto': 'dashboard'}
+    raise ValueError(rota)
+
+
+class Benchmark:
+    def __init__(self, args):
+        self.args = args
+        self.rotas = args.rotas.split(',') if args.rotas else list(ROTAS)
+        self.amostras = {rota: [] for rota in self.rotas}
+        self.lock = threading.Lock()
+
+    def preparar_usuarios(self):
+        alunos, professores, self.aluno_ids = carregar_contas(
+            self.args.banco, self.args.alunos, self.args.professores)
+        tipos_necessarios = {ROTAS[r][0] for r in self.rotas}
+        if 'aluno' in tipos_necessarios and not alunos:
+            raise SystemExit('❌ Nenhum aluno de carga encontrado. Rode gerar_dados_carga.py antes.')
+        if 'professor' in tipos_necessarios and not professores:
+            raise SystemExit('❌ Nenhum professor de carga encontrado. Rode gerar_dados_carga.py antes.')
+        if {'visualizar_perfil', 'dados_progresso_aluno'} & set(self.rotas) and not self.aluno_ids:
+            raise SystemExit('❌ Nenhum aluno de carga com perfil gerado.')
+
+        contas = [(e, 'aluno') for e in alunos if 'aluno' in tipos_necessarios] + \
+                 [(e, 'professor') for e in professores if 'professor' in tipos_necessarios]
+        print(f"🔐 Fazendo login de {len(contas)} usuários virtuais...")
+        with ThreadPoolExecutor(max_workers=self.args.concorrencia) as executor:
+            usuarios = list(executor.map(lambda c: UsuarioVirtual(self.args.url, *c).entrar(), contas))
+        self.usuarios = {
+            'aluno': [u for u in usuarios if u.tipo == 'aluno'],
+            'professor': [u for u in usuarios if u.tipo == 'professor'],
+        }
+
+    def executar_trabalhador(self, indice, fim, registrar):
+        rng = random.Random(self.args.semente + indice)
+        pesos = [ROTAS[r][1] for r in self.rotas]
+        while time.monotonic() < fim:
+            rota = rng.choices(self.rotas, weights=pesos)[0]
+            usuario = rng.choice(self.usuarios[ROTAS[rota][0]])
+            metodo, caminho, corpo = montar_requisicao(rota, rng, self.aluno_ids)
+
+            inicio = time.perf_counter()
+            try:
+                resposta = usuario.sessao.request(metodo, f'{self.args.url}{caminho}', json=corpo,
+                                                  allow_redirects=False, timeout=self.args.timeout)
+                status = resposta.status_code
+                consultas = resposta.headers.get('X-Consultas-SQL')
+                tempo_sql = resposta.headers.get('X-Tempo-SQL-ms')
+            except requests.RequestException:
+                status, consultas, tempo_sql = 0, None, None
+            latencia_ms = (time.perf_counter() - inicio) * 1000
+
+            if registrar:
+                with self.lock:
+                    self.amostras[rota].append({
+                        'latencia_ms': latencia_ms,
+                        'ok': 200 <= status < 300,
+                        'status': status,
+                        'consultas': int(consultas) if consultas else None,
+                        'tempo_sql_ms': float(tempo_sql) if tempo_sql else None,
+                    })
+
+    def rodar_fase(self, duracao, registrar):
+        fim = time.monotonic() + duracao
+        with ThreadPoolExecutor(max_workers=self.args.concorrencia) as executor:
+            trabalhadores = [executor.submit(self.executar_trabalhador, indice, fim, registrar)
+                             for indice in range(self.args.concorrencia)]
+            for trabalhador in trabalhadores:
+                trabalhador.result()
+
+    def executar(self):
+        self.preparar_usuarios()
+        if self.args.aquecimento:
+            print(f"🔥 Aquecimento de {self.args.aquecimento}s...")
+            self.rodar_fase(self.args.aquecimento, registrar=False)
+        print(f"🏃 Medindo por {self.args.duracao}s com {self.args.concorrencia} usuários simultâneos...")
+        self.rodar_fase(self.args.duracao, registrar=True)
+        return self.resumir()
+
+    def resumir(self):
+        rotas = {}
+        for rota, amostras in self.amostras.items():
+            if not amostras:
+                continue
+            latencias = sorted(a['latencia_ms'] for a in amostras)
+            consultas = [a['consultas'] for a in amostras if a['consultas'] is not None]
+            tempos_sql = [a['tempo_sql_ms'] for a in amostras if a['tempo_sql_ms'] is not None]
+            status = {}
+            for a in amostras:
+                status[str(a['status'])] = status.get(str(a['status']), 0) + 1
+            rotas[rota] = {
+                'requisicoes': len(amostras),
+                'erros': sum(1 for a in amostras if not a['ok']),
+                'status': status,
+                'vazao_rps': round(len(amostras) / self.args.duracao, 2),
+                'p50_ms': round(percentil(latencias, 50), 1),
+                'p95_ms': round(percentil(latencias, 95), 1),
+                'p99_ms': round(percentil(latencias, 99), 1),
+                'media_ms': round(statistics.mean(latencias), 1),
+                'consultas_sql_media': round(statistics.mean(consultas), 1) if consultas else None,
+                'consultas_sql_max': max(consultas) if consultas else None,
+                'tempo_sql_media_ms': round(statistics.mean(tempos_sql), 1) if tempos_sql else None,
+            }
+        total = sum(r['requisicoes'] for r in rotas.values())
+        return {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'configuracao': {
+                'url': self.args.url,
+                'concorrencia': self.args.concorrencia,
+                'duracao_s': self.args.duracao,
+                'semente': self.args.semente,
+                'usuarios': {tipo: len(lista) for tipo, lista in self.usuarios.items()},
+            },
+            'total': {'requisicoes': total, 'vazao_rps': round(total / self.args.duracao, 2)},
+            'headers_sql': any(r['consultas_sql_media'] is not None for r in rotas.values()),
+            'rotas': rotas,
+        }
+
+
+def percentil(valores_ordenados, p):
+    """Percentil pelo método do posto mais próximo"""
+    if not valores_ordenados:
+        return 0.0
+    posicao = max(0, min(len(valores_ordenados), math.ceil(p / 100 * len(valores_ordenados))) - 1)
+    return valores_ordenados[posicao]
+
+def variacao(atual, anterior):
+    if atual is None or not anterior:
+        return ''
+    return f' ({(atual - anterior) / anterior * 100:+.0f}%)'
+
+def imprimir_resultado(resultado, anterior=None):
+    anteriores = (anterior or {}).get('rotas', {})
+    print(f"\n📊 RESULTADO ({resultado['total']['requisicoes']} requisições, "
+          f"{resultado['total']['vazao_rps']} req/s)")
+    print(f"   {'rota':<24}{'req/s':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'erros':>8}{'SQL':>7}")
+    for rota, dados in resultado['rotas'].items():
+        sql = dados['consultas_sql_media']
+        print(f"   {rota:<24}{dados['vazao_rps']:>8}{dados['p50_ms']:>10}{dados['p95_ms']:>10}"
+              f"{dados['p99_ms']:>10}{dados['erros']:>8}{sql if sql is not None else '-':>7}")
+        if rota in anteriores:
+            antes = anteriores[rota]
+            print(f"   {'  vs. anterior':<24}{variacao(dados['vazao_rps'], antes['vazao_rps']):>8}"
+                  f"{variacao(dados['p50_ms'], antes['p50_ms']):>10}"
+                  f"{variacao(dados['p95_ms'], antes['p95_ms']):>10}"
+                  f"{variacao(dados['p99_ms'], antes['p99_ms']):>10}"
+                  f"{'':>8}{variacao(sql, antes.get('consultas_sql_media')):>7}")
+    if not resultado.get('headers_sql'):
+        print("\n⚠️ A aplicação não enviou os headers X-Consultas-SQL / X-Tempo-SQL-ms: coluna SQL vazia.")
+        print("   Rode-a em modo debug ou com INSTRUMENTACAO_SQL_HEADERS=true para medir as consultas.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark HTTP das rotas principais do NeuroLearn')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='endereço da aplicação')
+    parser.add_argument('--banco', default=os.path.join(DIRETORIO_PROJETO, 'sistema_educacional.db'),
+                        help='banco SQLite com os dados de carga')
+    parser.add_argument('--concorrencia', type=int, default=10, help='usuários simultâneos (padrão: 10)')
+    parser.add_argument('--duracao', type=float, default=30, help='segundos de medição (padrão: 30)')
+    parser.add_argument('--aquecimento', type=float, default=5, help='segundos de aquecimento não medidos (padrão: 5)')
+    parser.add_argument('--alunos', type=int, default=50, help='alunos virtuais (padrão: 50)')
+    parser.add_argument('--professores', type=int, default=10, help='professores virtuais (padrão: 10)')
+    parser.add_argument('--rotas', help=f"subconjunto separado por vírgula: {','.join(ROTAS)}")
+    parser.add_argument('--timeout', type=float, default=60, help='timeout por requisição em segundos')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--json', help='salva o resultado neste arquivo')
+    parser.add_argument('--comparar', help='resultado anterior (JSON) para comparação')
+    args = parser.parse_args()
+
+    if args.rotas:
+        desconhecidas = set(args.rotas.split(',')) - set(ROTAS)
+        if desconhecidas:
+            parser.error(f"rotas desconhecidas: {', '.join(sorted(desconhecidas))}")
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            anterior = json.load(f)
+
+    resultado = Benchmark(args).executar()
+    imprimir_resultado(resultado, anterior)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultado salvo em {args.json}")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do tempo de inicialização do NeuroLearn
+Mede, em processos Python novos, quanto custa importar cada camada:
+- modelos  (só o banco, usado pelos scripts de dados)
+- fabrica  (create_app sem as rotas)
+- app      (aplicação completa)
+
+Uso:
+    python benchmark_inicializacao.py
+    python benchmark_inicializacao.py --execucoes 10 --json resultado.json
+    python benchmark_inicializacao.py --comparar resultado_anterior.json
+    python benchmark_inicializacao.py --detalhar app   # imports mais pesados
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+# Nome -> código executado no processo filho
+ALVOS = {
+    'modelos': 'import modelos',
+    'fabrica': 'import fabrica; fabrica.create_app()',
+    'app': 'import app',
+}
+
+def medir_importacao(codigo):
+    """Tempo (ms) para executar o código em um interpretador novo"""
+    script = (
+        "import time\n"
+        "inicio = time.perf_counter()\n"
+        f"{codigo}\n"
+        "print(f'@@{(time.perf_counter() - inicio) * 1000:.3f}')\n"
+    )
+    resultado = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=DIRETORIO_PROJETO, capture_output=True, text=True
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(resultado.stderr.strip().splitlines()[-1] if resultado.stderr else 'falha')
+    for linha in resultado.stdout.splitlines():
+        if linha.startswith('@@'):
+            return float(linha[2:])
+    raise RuntimeError('tempo não encontrado na saída')
+
+def imports_mais_pesados(codigo, limite=15):
+    """Usa -X importtime para listar os módulos com maior tempo acumulado"""
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=DIRETORIO_PROJETO, capture_output=True, text=True
+    )
+    modulos = []
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        # Formato: "import time:   <próprio> | <acumulado> | <módulo>"
+        proprio, acumulado, nome = linha[len('import time:'):].split('|')
+        modulos.append((int(acumulado), int(proprio), nome.strip()))
+    return sorted(modulos, reverse=True)[:limite]
+
+def executar(execucoes):
+    """Mediana, mínimo e máximo de cada alvo"""
+    resultados = {}
+    for nome, codigo in ALVOS.items():
+        tempos = []
+        try:
+            for _ in range(execucoes):
+                tempos.append(medir_importacao(codigo))
+        except RuntimeError as e:
+            print(f"❌ {nome}: {e}")
+            continue
+        resultados[nome] = {
+            'mediana_ms': statistics.median(tempos),
+            'min_ms': min(tempos),
+            'max_ms': max(tempos),
+            'execucoes': execucoes,
+        }
+    return resultados
+
+def imprimir(resultados, anteriores=None):
+    print(f"\n⏱️  TEMPO DE INICIALIZAÇÃO (Python {sys.version.split()[0]})")
+    for nome, dados in resultados.items():
+        linha = f"   {nome:<8} mediana {dados['mediana_ms']:8.1f} ms  (min {dados['min_ms']:.1f} / max {dados['max_ms']:.1f})"
+        if anteriores and nome in anteriores:
+            antes = anteriores[nome]['mediana_ms']
+            variacao = (dados['mediana_ms'] - antes) / antes * 100 if antes else 0
+            linha += f"  antes {antes:.1f} ms ({variacao:+.1f}%)"
+        print(linha)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mede o tempo de importação do NeuroLearn')
+    parser.add_argument('--execucoes', type=int, default=5, help='processos por alvo (padrão: 5)')
+    parser.add_argument('--json', help='salva o resultado neste arquivo')
+    parser.add_argument('--comparar', help='compara com um resultado salvo anteriormente')
+    parser.add_argument('--detalhar', choices=sorted(ALVOS), help='mostra os imports mais pesados do alvo')
+    args = parser.parse_args()
+
+    if args.detalhar:
+        print(f"\n📦 IMPORTS MAIS PESADOS: {args.detalhar}")
+        for acumulado, proprio, nome in imports_mais_pesados(ALVOS[args.detalhar]):
+            print(f"   {acumulado / 1000:8.1f} ms  (próprio {proprio / 1000:6.1f} ms)  {nome}")
+        sys.exit(0)
+
+    anteriores = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            anteriores = json.load(f)
+
+    resultados = executar(args.execucoes)
+    imprimir(resultados, anteriores)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2)
+        print(f"\n💾 Resultado salvo em {args.json}")
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Busca textual na biblioteca de conteúdo (SQLite FTS5)
+A tabela virtual biblioteca_fts indexa titulo, descricao e tags de
+biblioteca_conteudo (external content: o texto não é duplicado) e é mantida
+por triggers de INSERT/UPDATE/DELETE, então qualquer gravação, pelo ORM ou
+por scripts, já aparece na busca.
+
+- Tokenização unicode61 sem acentos: "matematica" encontra "Matemática"
+- Ranking BM25 com pesos por coluna (título > tags > descrição)
+- Prefixo: "frac*" ou o último termo digitado ("fraç" encontra "frações")
+- Título destacado e trecho da descrição com <mark>
+- Combinável com os filtros de tipo, categoria e nível de ensino
+
+Uso:
+    python busca_biblioteca.py --reconstruir        # cria/reconstrói o índice
+    python busca_biblioteca.py "fracoes video"      # testa uma busca
+"""
+
+import html
+import re
+
+from sqlalchemy import text
+
+from modelos import db
+
+TOKENIZADOR = 'unicode61 remove_diacritics 2'
+# Pesos BM25 na ordem das colunas: titulo, descricao, tags
+PESOS_BM25 = (10.0, 2.0, 5.0)
+LIMITE_RESULTADOS = 50
+TAMANHO_TRECHO = 24  # tokens
+
+# Marcadores que não aparecem em texto digitado: o HTML é escapado depois
+# e só então eles viram <mark>
+_INICIO_DESTAQUE = '\x02'
+_FIM_DESTAQUE = '\x03'
+
+_TERMO = re.compile(r'(\w+)(\*?)', re.UNICODE)
+
+DDL_BUSCA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS biblioteca_fts USING fts5(
+        titulo, descricao, tags,
+        content='biblioteca_conteudo', content_rowid='id',
+        tokenize="{TOKENIZADOR}", prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS biblioteca_fts_ai AFTER INSERT ON biblioteca_conteudo BEGIN
+        INSERT INTO biblioteca_fts(rowid, titulo, descricao, tags)
+        VALUES (new.id, new.titulo, new.descricao, new.tags);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS biblioteca_fts_ad AFTER DELETE ON biblioteca_conteudo BEGIN
+        INSERT INTO biblioteca_fts(biblioteca_fts, rowid, titulo, descricao, tags)
+        VALUES ('delete', old.id, old.titulo, old.descricao, old.tags);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS biblioteca_fts_au AFTER UPDATE OF titulo, descricao, tags ON biblioteca_conteudo BEGIN
+        INSERT INTO biblioteca_fts(biblioteca_fts, rowid, titulo, descricao, tags)
+        VALUES ('delete', old.id, old.titulo, old.descricao, old.tags);
+        INSERT INTO biblioteca_fts(rowid, titulo, descricao, tags)
+        VALUES (new.id, new.titulo, new.descricao, new.tags);
+    END""",
+]
+
+_estado = {'indice_verificado': False}
+
+
+# ===== ÍNDICE =====
+
+def criar_indice_busca(reconstruir=False):
+    """Cria tabela e triggers (se faltarem) e repovoa o índice quando necessário
+
+    Sem os triggers (banco antigo ou tabela recriada por db.drop_all/create_all)
+    o índice pode estar desatualizado, então é reconstruído a partir da tabela.
+    """
+    existia = db.session.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'biblioteca_fts_ai'"
+    )).first() is not None
+    for comando in DDL_BUSCA:
+        db.session.execute(text(comando))
+    if reconstruir or not existia:
+        db.session.execute(text("INSERT INTO biblioteca_fts(biblioteca_fts) VALUES ('rebuild')"))
+    db.session.commit()
+    _estado['indice_verificado'] = True
+    return not existia or reconstruir
+
+def garantir_indice_busca():
+    """Verifica o índice uma vez por processo"""
+    if not _estado['indice_verificado']:
+        criar_indice_busca()
+
+
+# ===== CONSULTA =====
+
+def montar_consulta_fts(termos, prefixo_ultimo=True):
+    """Converte o texto digitado numa expressão MATCH segura
+
+    Cada palavra vira uma string entre aspas (operadores e aspas do usuário
+    não chegam ao FTS5); 'termo*' e, opcionalmente, o último termo viram
+    busca por prefixo. Os termos são combinados com AND.
+    """
+    encontrados = _TERMO.findall(termos or '')
+    partes = []
+    for posicao, (palavra, asterisco) in enumerate(encontrados):
+        prefixo = asterisco or (prefixo_ultimo and posicao == len(encontrados) - 1)
+        partes.append(f'"{palavra}"' + ('*' if prefixo else ''))
+    return ' '.join(partes)
+
+def _destacar(texto):
+    """Escapa o HTML e converte os marcadores do FTS5 em <mark>"""
+    if not texto:
+        return ''
+    return html.escape(texto).replace(_INICIO_DESTAQUE, '<mark>').replace(_FIM_DESTAQUE, '</mark>')
+
+def buscar_conteudos(termos, tipo='', categoria='', nivel='', limite=20, pagina=1, prefixo_ultimo=True):
+    """Busca ordenada por BM25, com os filtros de faceta aplicados no mesmo SQL
+
+    Retorna {'consulta', 'total', 'pagina', 'resultados'}; consulta vazia
+    quando o texto não tem nenhuma palavra pesquisável.
+    """
+    garantir_indice_busca()
+    consulta = montar_consulta_fts(termos, prefixo_ultimo)
+    if not consulta:
+        return {'consulta': '', 'total': 0, 'pagina': pagina, 'resultados': []}
+
+    limite = max(1, min(int(limite), LIMITE_RESULTADOS))
+    pagina = max(1, int(pagina))
+    filtros = ['biblioteca_fts MATCH :consulta', 'c.ativo = 1']
+    parametros = {'consulta': consulta}
+    for coluna, valor in (('tipo', tipo), ('categoria', categoria), ('nivel_ensino', nivel)):
+        if valor:
+            filtros.append(f'c.{coluna} = :{coluna}')
+            parametros[coluna] = valor
+    where = ' AND '.join(filtros)
+    origem = 'FROM biblioteca_fts JOIN biblioteca_conteudo c ON c.id = biblioteca_fts.rowid'
+
+    total = db.session.execute(text(f'SELECT COUNT(*) {origem} WHERE {where}'), parametros).scalar()
+    linhas = db.session.execute(text(f"""
+        SELECT c.id, c.titulo, c.tipo, c.categoria, c.nivel_ensino, c.url_conteudo, c.duracao,
+               c.tem_legenda, c.tem_libras, c.classificacao_etaria, c.tags,
+               highlight(biblioteca_fts, 0, :inicio, :fim) AS titulo_destacado,
+               snippet(biblioteca_fts, 1, :inicio, :fim, '…', {TAMANHO_TRECHO}) AS trecho,
+               bm25(biblioteca_fts, {', '.join(str(p) for p in PESOS_BM25)}) AS pontuacao
+        {origem}
+        WHERE {where}
+        ORDER BY pontuacao
+        LIMIT :limite OFFSET :deslocamento
+    """), dict(parametros, inicio=_INICIO_DESTAQUE, fim=_FIM_DESTAQUE,
+               limite=limite, deslocamento=(pagina - 1) * limite)).fetchall()
+
+    resultados = [{
+        'id': linha.id,
+        'titulo': linha.titulo,
+        'titulo_destacado': _destacar(linha.titulo_destacado),
+        'trecho': _destacar(linha.trecho),
+        'tipo': linha.tipo,
+        'categoria': linha.categoria,
+        'nivel_ensino': linha.nivel_ensino,
+        'url_conteudo': linha.url_conteudo,
+        'duracao': linha.duracao,
+        'tem_legenda': bool(linha.tem_legenda),
+        'tem_libras': bool(linha.tem_libras),
+        'classificacao_etaria': linha.classificacao_etaria,
+        'tags': [tag.strip() for tag in (linha.tags or '').split(',') if tag.strip()],
+        # BM25 do SQLite é negativo (menor = melhor); invertido para leitura
+        'relevancia': round(-linha.pontuacao, 4),
+    } for linha in linhas]
+
+    return {'consulta': consulta, 'total': total, 'pagina': pagina, 'resultados': resultados}
+
+
+if __name__ == '__main__':
+    import argparse
+    from fabrica import create_app
+
+    parser = argparse.ArgumentParser(description='Índice de busca textual da biblioteca (FTS5)')
+    parser.add_argument('termos', nargs='?', help='texto a buscar')
+    parser.add_argument('--reconstruir', action='store_true', help='recria o índice a partir da tabela')
+    parser.add_argument('--tipo', default='')
+    parser.add_argument('--categoria', default='')
+    parser.add_argument('--nivel', default='')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.reconstruir:
+            criar_indice_busca(reconstruir=True)
+            total = db.session.execute(text('SELECT COUNT(*) FROM biblioteca_conteudo')).scalar()
+            print(f"✅ Índice biblioteca_fts reconstruído ({total} conteúdos)")
+        if args.termos:
+            resultado = buscar_conteudos(args.termos, args.tipo, args.categoria, args.nivel)
+            print(f"🔍 {resultado['consulta']}  →  {resultado['total']} resultados")
+            for item in resultado['resultados']:
+                print(f"   {item['relevancia']:8.3f}  [{item['tipo']}/{item['categoria']}] {item['titulo']}")
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de perguntas frequentes do assistente virtual
+Reaproveita respostas já bem avaliadas em InteracaoAssistente quando chega
+uma pergunta quase igual, no mesmo contexto e do mesmo tipo de usuário;
+só as perguntas sem equivalente vão para o Gemini.
+
+- Perguntas normalizadas (minúsculas, sem acentos, sem pontuação nem
+  palavras vazias) e vetorizadas com TF-IDF de palavras e de n-gramas de
+  caracteres (3 a 5), sem serviço externo: erros de digitação e variações
+  ("fracao"/"frações") continuam próximos
+- Índice invertido por (contexto, tipo de usuário), montado sob demanda e
+  renovado a cada FAQ_TTL segundos ou quando chega uma avaliação
+- Elegíveis: respostas cuja média de satisfação é >= FAQ_SATISFACAO_MINIMA,
+  que quase sempre resolveram a dúvida e não são pessoais (não citam o nome
+  de quem perguntou nem um tipo de perfil). Só entram respostas avulsas ou
+  de abertura de conversa: as seguintes dependem do histórico
+- Entre as perguntas acima de FAQ_LIMIAR de similaridade vence a de maior
+  similaridade × satisfação média da resposta
+
+Uso:
+    python cache_faq.py "como organizo meu tempo de estudo" --contexto geral --tipo aluno
+"""
+
+import math
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.orm import aliased
+
+from modelos import db, Usuario, InteracaoAssistente
+from metricas import registrar_cache
+from tags import normalizar_tag
+from agrupamento_perfis import TIPOS_PERFIL, PERFIL_PADRAO
+
+LIMIAR = float(os.environ.get('FAQ_LIMIAR', 0.72))
+SATISFACAO_MINIMA = float(os.environ.get('FAQ_SATISFACAO_MINIMA', 4))
+TTL_INDICE = float(os.environ.get('FAQ_TTL', 300))
+JANELA_DIAS = int(os.environ.get('FAQ_JANELA_DIAS', 180))
+# Fração máxima de avaliações com "não resolveu a dúvida"
+TAXA_MAXIMA_NAO_RESOLVEU = 0.2
+TAMANHOS_NGRAMA = (3, 4, 5)
+
+PALAVRAS_VAZIAS = {
+    'a', 'o', 'as', 'os', 'e', 'de', 'da', 'do', 'das', 'dos', 'em', 'no', 'na', 'nos', 'nas', 'um', 'uma',
+    'uns', 'umas', 'por', 'para', 'pra', 'com', 'que', 'se', 'ao', 'aos', 'eu', 'me', 'mim', 'meu', 'minha',
+    'meus', 'minhas', 'voce', 'vc', 'pode', 'poderia', 'consegue', 'favor', 'ola', 'oi', 'bom',
+    'dia', 'boa', 'tarde', 'noite', 'ai', 'la', 'isso', 'isto', 'esse', 'essa', 'este', 'esta', 'ou',
+}
+_PALAVRA = re.compile(r'[a-z0-9]+')
+_TERMOS_PESSOAIS = [normalizar_tag(tipo) for tipo, _ in TIPOS_PERFIL] + [normalizar_tag(PERFIL_PADRAO)]
+
+
+# ===== TEXTO =====
+
+def normalizar_pergunta(texto):
+    """'Como faço p/ me CONCENTRAR?' -> ['como', 'faco', 'concentrar']"""
+    return [palavra for palavra in _PALAVRA.findall(normalizar_tag(texto)) if palavra not in PALAVRAS_VAZIAS]
+
+def caracteristicas(palavras):
+    """Contagem das palavras ('p:') e dos n-gramas de caracteres ('c:') de cada palavra"""
+    contagem = {}
+    for palavra in palavras:
+        contagem['p:' + palavra] = contagem.get('p:' + palavra, 0) + 1
+        marcada = f' {palavra} '
+        for tamanho in TAMANHOS_NGRAMA:
+            for inicio in range(max(len(marcada) - tamanho + 1, 1)):
+                chave = 'c:' + marcada[inicio:inicio + tamanho]
+                contagem[chave] = contagem.get(chave, 0) + 1
+    return contagem
+
+def resposta_pessoal(resposta, nome):
+    """Resposta que cita o nome de quem perguntou ou um tipo de perfil não serve para outros"""
+    texto = normalizar_tag(resposta)
+    primeiro_nome = normalizar_tag(nome).split(' ')[0] if nome else ''
+    if len(primeiro_nome) >= 3 and re.search(rf'\b{re.escape(primeiro_nome)}\b', texto):
+        return True
+    return any(termo in texto for termo in _TERMOS_PESSOAIS)
+
+
+# ===== ÍNDICE =====
+
+class IndiceFaq:
+    """TF-IDF (1 + log tf) com índice invertido; palavras e n-gramas pesam metade cada
+
+    documentos: [(palavras da pergunta, resposta)]
+    """
+
+    def __init__(self, documentos):
+        self.respostas = [resposta for _, resposta in documentos]
+        contagens = [caracteristicas(palavras) for palavras, _ in documentos]
+        frequencia = {}
+        for contagem in contagens:
+            for chave in contagem:
+                frequencia[chave] = frequencia.get(chave, 0) + 1
+        total = len(documentos)
+        self.idf = {chave: math.log((1 + total) / (1 + df)) + 1 for chave, df in frequencia.items()}
+        self.idf_ausente = math.log(1 + total) + 1
+        self.postagens = {}
+        for posicao, contagem in enumerate(contagens):
+            for chave, peso in self._vetor(contagem).items():
+                self.postagens.setdefault(chave, []).append((posicao, peso))
+
+    def __len__(self):
+        return len(self.respostas)
+
+    def _vetor(self, contagem):
+        """Pesos normalizados separadamente para palavras e n-gramas (cada bloco com norma² 0,5)"""
+        pesos = {chave: (1 + math.log(tf)) * self.idf.get(chave, self.idf_ausente) for chave, tf in contagem.items()}
+        for prefixo in ('p:', 'c:'):
+            norma = math.sqrt(sum(peso * peso for chave, peso in pesos.items() if chave.startswith(prefixo)))
+            if norma:
+                for chave in pesos:
+                    if chave.startswith(prefixo):
+                        pesos[chave] /= norma * math.sqrt(2)
+        return pesos
+
+    def buscar(self, palavras, limiar=LIMIAR):
+        """[(posição, similaridade cosseno)] dos documentos acima do limiar"""
+        pontuacao = {}
+        for chave, peso in self._vetor(caracteristicas(palavras)).items():
+            for posicao, peso_documento in self.postagens.get(chave, ()):
+                pontuacao[posicao] = pontuacao.get(posicao, 0.0) + peso * peso_documento
+        return [(posicao, similaridade) for posicao, similaridade in pontuacao.items() if similaridade >= limiar]
+
+
+def carregar_respostas(contexto, tipo_usuario):
+    """Documentos do índice de um (contexto, tipo de usuário): perguntas das respostas elegíveis"""
+    limite = datetime.utcnow() - timedelta(days=JANELA_DIAS)
+    # Turno anterior na mesma conversa (índice conversa_id, id)
+    anterior = aliased(InteracaoAssistente)
+    tem_turno_anterior = exists().where(and_(
+        anterior.conversa_id == InteracaoAssistente.conversa_id,
+        anterior.id < InteracaoAssistente.id
+    ))
+    avaliacoes = {}
+    for interacao_id, pergunta, resposta, satisfacao, resolveu, nome in db.session.query(
+        InteracaoAssistente.id, InteracaoAssistente.mensagem_usuario, InteracaoAssistente.resposta_assistente,
+        InteracaoAssistente.satisfacao_resposta, InteracaoAssistente.resolveu_duvida, Usuario.nome
+    ).join(Usuario, Usuario.id == InteracaoAssistente.usuario_id).filter(
+        InteracaoAssistente.contexto == contexto,
+        Usuario.tipo == tipo_usuario,
+        InteracaoAssistente.satisfacao_resposta != None,
+        InteracaoAssistente.data_interacao >= limite,
+        or_(InteracaoAssistente.conversa_id == None, ~tem_turno_anterior)
+    ):
+        resposta = (resposta or '').strip()
+        if not resposta or resposta.startswith('Erro'):
+            continue
+        # A mesma resposta reaproveitada acumula as avaliações de todas as vezes
+        item = avaliacoes.setdefault(resposta, {'soma': 0, 'avaliacoes': 0, 'nao_resolveu': 0,
+                                                'perguntas': set(), 'pessoal': False, 'interacao_id': interacao_id})
+        item['soma'] += satisfacao
+        item['avaliacoes'] += 1
+        item['nao_resolveu'] += resolveu is False
+        item['pessoal'] = item['pessoal'] or resposta_pessoal(resposta, nome)
+        item['perguntas'].add(tuple(normalizar_pergunta(pergunta)))
+
+    documentos, detalhes = [], []
+    for resposta, item in avaliacoes.items():
+        media = item['soma'] / item['avaliacoes']
+        if item['pessoal'] or media < SATISFACAO_MINIMA or \
+                item['nao_resolveu'] > TAXA_MAXIMA_NAO_RESOLVEU * item['avaliacoes']:
+            continue
+        for palavras in item['perguntas']:
+            if palavras:
+                documentos.append((list(palavras), resposta))
+                detalhes.append({'satisfacao': round(media, 2), 'avaliacoes': item['avaliacoes'],
+                                 'interacao_id': item['interacao_id']})
+    return documentos, detalhes
+
+
+# ===== CACHE =====
+
+class CacheFaq:
+    """Índices por (contexto, tipo de usuário), montados sob demanda"""
+
+    def __init__(self, ttl=TTL_INDICE):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._indices = {}
+
+    def indice(self, contexto, tipo_usuario):
+        chave = (contexto, tipo_usuario)
+        with self._lock:
+            atual = self._indices.get(chave)
+            if atual is None or time.monotonic() >= atual[2]:
+                documentos, detalhes = carregar_respostas(contexto, tipo_usuario)
+                atual = (IndiceFaq(documentos), detalhes, time.monotonic() + self.ttl)
+                self._indices[chave] = atual
+            return atual[0], atual[1]
+
+    def invalidar(self, contexto=None, tipo_usuario=None):
+        with self._lock:
+            if contexto is None:
+                self._indices.clear()
+            else:
+                self._indices.pop((contexto, tipo_usuario), None)
+
+    def buscar(self, pergunta, contexto, tipo_usuario, nome_usuario=None):
+        """Resposta reaproveitável para a pergunta ou None (a chamada vai para o Gemini)"""
+        palavras = normalizar_pergunta(pergunta)
+        encontrada = None
+        if palavras:
+            indice, detalhes = self.indice(contexto or 'geral', tipo_usuario)
+            candidatas = sorted(indice.buscar(palavras),
+                                key=lambda item: -item[1] * detalhes[item[0]]['satisfacao'])
+            for posicao, similaridade in candidatas:
+                resposta = indice.respostas[posicao]
+                if nome_usuario and resposta_pessoal(resposta, nome_usuario):
+                    continue
+                encontrada = dict(detalhes[posicao], resposta=resposta, similaridade=round(similaridade, 3))
+                break
+        registrar_cache('faq_assistente', encontrada is not None)
+        return encontrada
+
+cache_faq = CacheFaq()
+
+
+if __name__ == '__main__':
+    import argparse
+    from fabrica import create_app
+
+    parser = argparse.ArgumentParser(description='Testa o cache de perguntas frequentes do assistente')
+    parser.add_argument('pergunta')
+    parser.add_argument('--contexto', default='geral')
+    parser.add_argument('--tipo', default='aluno', choices=['aluno', 'professor'])
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        inicio = time.perf_counter()
+        indice, _ = cache_faq.indice(args.contexto, args.tipo)
+        carga_ms = (time.perf_counter() - inicio) * 1000
+        inicio = time.perf_counter()
+        resultado = cache_faq.buscar(args.pergunta, args.contexto, args.tipo)
+        busca_ms = (time.perf_counter() - inicio) * 1000
+        print(f"📚 {len(indice)} perguntas indexadas (carga {carga_ms:.1f} ms, busca {busca_ms:.2f} ms)")
+        print(f"   {normalizar_pergunta(args.pergunta)}")
+        if resultado:
+            print(f"✅ similaridade {resultado['similaridade']}, satisfação {resultado['satisfacao']} "
+                  f"({resultado['avaliacoes']} avaliações)")
+            print(f"   {resultado['resposta']}")
+        else:
+            print("❌ Sem resposta em cache: iria para o Gemini")
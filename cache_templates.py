@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de bytecode do Jinja e pré-compilação dos templates do NeuroLearn
+- O bytecode compilado fica em disco e é compartilhado por todos os workers
+- A pré-compilação carrega todos os templates de templates/ na inicialização,
+  para que o primeiro aluno depois de um deploy não pague a compilação
+
+Uso (por exemplo no script de deploy, antes de reiniciar os workers):
+    python cache_templates.py
+"""
+
+import os
+import time
+
+from jinja2 import FileSystemBytecodeCache
+
+def configurar_cache_bytecode(app, diretorio=None):
+    """Ativa o FileSystemBytecodeCache no ambiente Jinja da aplicação"""
+    diretorio = diretorio or os.environ.get('JINJA_CACHE_DIR') or os.path.join(app.root_path, '.jinja_cache')
+    os.makedirs(diretorio, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(diretorio, pattern='neurolearn_%s.cache')
+    return diretorio
+
+def precompilar_templates(app):
+    """Compila todos os templates HTML e retorna o relatório de tempos"""
+    relatorio = []
+    inicio_total = time.perf_counter()
+
+    for nome in sorted(app.jinja_env.list_templates(extensions=['html'])):
+        inicio = time.perf_counter()
+        erro = None
+        try:
+            app.jinja_env.get_template(nome)
+        except Exception as e:
+            erro = str(e)
+        relatorio.append({
+            'template': nome,
+            'tempo_ms': (time.perf_counter() - inicio) * 1000,
+            'erro': erro
+        })
+
+    tempo_total_ms = (time.perf_counter() - inicio_total) * 1000
+    return relatorio, tempo_total_ms
+
+def imprimir_relatorio(relatorio, tempo_total_ms):
+    """Exibe o relatório de pré-compilação, do template mais lento ao mais rápido"""
+    print(f"\n🧩 PRÉ-COMPILAÇÃO DE TEMPLATES ({len(relatorio)} arquivos, {tempo_total_ms:.1f} ms)")
+    for item in sorted(relatorio, key=lambda i: i['tempo_ms'], reverse=True):
+        status = f"❌ {item['erro']}" if item['erro'] else '✅'
+        print(f"   {item['tempo_ms']:8.2f} ms  {item['template']}  {status}")
+
+
+if __name__ == '__main__':
+    from app import app
+
+    relatorio, tempo_total_ms = precompilar_templates(app)
+    imprimir_relatorio(relatorio, tempo_total_ms)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cliente da API do Google Gemini
+O módulo requests e a leitura da chave só acontecem na primeira consulta,
+para que scripts que não usam IA não paguem esse custo na importação.
+
+- consultar_gemini: espera a resposta inteira (generateContent)
+- consultar_gemini_stream: gera os trechos à medida que chegam
+  (streamGenerateContent com alt=sse)
+"""
+
+import json
+import logging
+import os
+import time
+
+from metricas import gemini_segundos, gemini_primeiro_token_segundos, gemini_erros_total
+
+# GEMINI_URL pode apontar para o stub local (servidor_gemini_stub.py) em testes de carga
+GEMINI_URL = os.environ.get(
+    'GEMINI_URL',
+    "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+)
+GEMINI_STREAM_URL = os.environ.get(
+    'GEMINI_STREAM_URL',
+    GEMINI_URL.replace(':generateContent', ':streamGenerateContent')
+)
+# Segundos até desistir da resposta da IA (o perfil básico é usado no lugar)
+GEMINI_TIMEOUT = float(os.environ.get('GEMINI_TIMEOUT', 30))
+
+_estado = {'api_key': None, 'carregado': False}
+
+logger = logging.getLogger('neurolearn.gemini')
+
+class ErroGemini(Exception):
+    """Falha na chamada em streaming (mensagem no mesmo formato de consultar_gemini)"""
+
+def obter_api_key():
+    """Lê GEMINI_API_KEY uma única vez, avisando se não estiver configurada"""
+    if not _estado['carregado']:
+        _estado['api_key'] = os.environ.get('GEMINI_API_KEY')
+        _estado['carregado'] = True
+        if not _estado['api_key']:
+            logger.warning('GEMINI_API_KEY não configurada. Funcionalidades de IA serão limitadas.')
+    return _estado['api_key']
+
+def cabecalhos_gemini():
+    """Chave no header x-goog-api-key: fora da URL, não aparece em mensagens de erro nem em logs de acesso"""
+    cabecalhos = {'Content-Type': 'application/json'}
+    api_key = obter_api_key()
+    if api_key:
+        cabecalhos['x-goog-api-key'] = api_key
+    return cabecalhos
+
+# Função para consultar a IA do Gemini
+def consultar_gemini(prompt, operacao='geral'):
+    import requests
+
+    data = {
+        "contents": [
+            {
+                "parts": [
+                    {
+                        "text": prompt
+                    }
+                ]
+            }
+        ]
+    }
+    
+    inicio = time.perf_counter()
+    try:
+        response = requests.post(
+            GEMINI_URL,
+            headers=cabecalhos_gemini(),
+            json=data,
+            timeout=GEMINI_TIMEOUT
+        )
+        
+        gemini_segundos.observar(time.perf_counter() - inicio, operacao=operacao)
+        if response.status_code == 200:
+            result = response.json()
+            return result['candidates'][0]['content']['parts'][0]['text']
+        else:
+            gemini_erros_total.inc(operacao=operacao, tipo=f'http_{response.status_code}')
+            logger.warning('Gemini respondeu %s', response.status_code, extra={'operacao': operacao})
+            return f"Erro na API: {response.status_code}"
+    # O detalhe da exceção fica só no log: a mensagem pode chegar ao navegador
+    except requests.Timeout as e:
+        gemini_erros_total.inc(operacao=operacao, tipo='timeout')
+        logger.warning('Timeout na chamada ao Gemini: %s', e, extra={'operacao': operacao})
+        return "Erro: tempo esgotado na chamada à IA"
+    except Exception as e:
+        gemini_erros_total.inc(operacao=operacao, tipo='conexao')
+        logger.warning('Falha na chamada ao Gemini: %s', e, extra={'operacao': operacao})
+        return "Erro: falha de conexão com a IA"
+
+def consultar_gemini_stream(prompt, operacao='geral'):
+    """Gera os trechos de texto da resposta conforme o Gemini os produz
+
+    Levanta ErroGemini se a API falhar (antes ou no meio da resposta).
+    """
+    import requests
+
+    data = {"contents": [{"parts": [{"text": prompt}]}]}
+    inicio = time.perf_counter()
+    primeiro_trecho = True
+    try:
+        with requests.post(
+            f"{GEMINI_STREAM_URL}?alt=sse",
+            headers=cabecalhos_gemini(),
+            json=data,
+            stream=True,
+            timeout=GEMINI_TIMEOUT
+        ) as response:
+            if response.status_code != 200:
+                gemini_erros_total.inc(operacao=operacao, tipo=f'http_{response.status_code}')
+                logger.warning('Gemini respondeu %s', response.status_code, extra={'operacao': operacao})
+                raise ErroGemini(f"Erro na API: {response.status_code}")
+
+            response.encoding = 'utf-8'
+            # chunk_size=None: repassa cada chunk assim que chega, sem esperar encher um buffer
+            for linha in response.iter_lines(chunk_size=None, decode_unicode=True):
+                # Cada evento SSE traz um GenerateContentResponse parcial
+                if not linha or not linha.startswith('data:'):
+                    continue
+                evento = json.loads(linha[5:])
+                for candidato in evento.get('candidates', [])[:1]:
+                    for parte in candidato.get('content', {}).get('parts', []):
+                        if parte.get('text'):
+                            if primeiro_trecho:
+                                gemini_primeiro_token_segundos.observar(time.perf_counter() - inicio, operacao=operacao)
+                                primeiro_trecho = False
+                            yield parte['text']
+        gemini_segundos.observar(time.perf_counter() - inicio, operacao=operacao)
+    except ErroGemini:
+        raise
+    except requests.Timeout as e:
+        gemini_erros_total.inc(operacao=operacao, tipo='timeout')
+        logger.warning('Timeout na chamada ao Gemini: %s', e, extra={'operacao': operacao})
+        raise ErroGemini("Erro: tempo esgotado na chamada à IA") from e
+    except Exception as e:
+        gemini_erros_total.inc(operacao=operacao, tipo='conexao')
+        logger.warning('Falha na chamada ao Gemini: %s', e, extra={'operacao': operacao})
+        raise ErroGemini("Erro: falha de conexão com a IA") from e
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Middleware WSGI de compressão de respostas do NeuroLearn
+- Respostas dinâmicas (HTML, JSON) acima de um tamanho mínimo são comprimidas
+  com brotli ou gzip, conforme o Accept-Encoding do navegador
+- Arquivos de static/dist com variantes .br/.gz geradas pelo pipeline de
+  assets são servidos diretamente, sem comprimir a cada requisição
+"""
+
+import gzip
+import mimetypes
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele usamos apenas gzip
+    brotli = None
+
+from pipeline_assets import DIRETORIO_STATIC, MAX_AGE_DIST
+
+# Tipos que valem a pena comprimir (text/event-stream fica de fora: é streaming)
+TIPOS_COMPRIMIVEIS = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/xml',
+    'application/json', 'application/javascript', 'application/xml',
+    'image/svg+xml',
+}
+
+# Extensões para as quais o pipeline gera variantes pré-comprimidas
+EXTENSOES_PRECOMPRIMIVEIS = {'.css', '.js', '.json', '.svg', '.ttf', '.txt'}
+
+# Sufixo do arquivo pré-comprimido para cada codificação
+SUFIXOS = {'br': '.br', 'gzip': '.gz'}
+
+
+def codificacoes_suportadas():
+    """Codificações disponíveis neste servidor, em ordem de preferência"""
+    return ['br', 'gzip'] if brotli else ['gzip']
+
+def codificacoes_aceitas(accept_encoding):
+    """Retorna as codificações aceitas pelo cliente, da melhor para a pior"""
+    qualidades = {}
+    for parte in accept_encoding.split(','):
+        parte = parte.strip()
+        if not parte:
+            continue
+        nome, _, parametros = parte.partition(';')
+        q = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith('q='):
+            try:
+                q = float(parametros[2:])
+            except ValueError:
+                q = 0.0
+        qualidades[nome.strip().lower()] = q
+
+    aceitas = []
+    for preferencia, codificacao in enumerate(codificacoes_suportadas()):
+        q = qualidades.get(codificacao, qualidades.get('*', 0.0))
+        if q > 0:
+            aceitas.append((-q, preferencia, codificacao))
+    return [codificacao for _, _, codificacao in sorted(aceitas)]
+
+def comprimir(dados, codificacao, nivel_gzip=6, nivel_brotli=5):
+    """Comprime bytes com a codificação escolhida"""
+    if codificacao == 'br':
+        return brotli.compress(dados, quality=nivel_brotli)
+    return gzip.compress(dados, compresslevel=nivel_gzip)
+
+def gerar_variantes_precomprimidas(caminho):
+    """Cria caminho.gz (e caminho.br, se brotli estiver instalado) ao lado do arquivo"""
+    if os.path.splitext(caminho)[1] not in EXTENSOES_PRECOMPRIMIVEIS:
+        return
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    for codificacao in codificacoes_suportadas():
+        # Nível máximo: roda uma única vez, no build
+        comprimido = comprimir(dados, codificacao, nivel_gzip=9, nivel_brotli=11)
+        if len(comprimido) < len(dados):
+            with open(caminho + SUFIXOS[codificacao], 'wb') as f:
+                f.write(comprimido)
+
+
+class MiddlewareCompressao:
+    """Middleware WSGI que negocia gzip/brotli para as respostas da aplicação"""
+
+    def __init__(self, app, tamanho_minimo=1024, nivel_gzip=6, nivel_brotli=5,
+                 prefixo_precomprimido='/static/dist/'):
+        self.app = app
+        self.tamanho_minimo = tamanho_minimo
+        self.nivel_gzip = nivel_gzip
+        self.nivel_brotli = nivel_brotli
+        self.prefixo_precomprimido = prefixo_precomprimido
+
+    def __call__(self, environ, start_response):
+        codificacoes = codificacoes_aceitas(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        metodo = environ.get('REQUEST_METHOD', 'GET')
+
+        if codificacoes and metodo in ('GET', 'HEAD') and \
+                environ.get('PATH_INFO', '').startswith(self.prefixo_precomprimido):
+            resposta = self._servir_precomprimido(environ, start_response, codificacoes)
+            if resposta is not None:
+                return resposta
+
+        if not codificacoes or metodo == 'HEAD':
+            return self.app(environ, start_response)
+
+        capturado = {}
+        corpo = []
+
+        def start_response_capturado(status, headers, exc_info=None):
+            capturado['status'] = status
+            capturado['headers'] = headers
+            capturado['exc_info'] = exc_info
+            return corpo.append
+
+        resultado = self.app(environ, start_response_capturado)
+        status = capturado['status']
+        headers = capturado['headers']
+
+        if not self._deve_comprimir(status, headers):
+            start_response(status, headers, capturado['exc_info'])
+            return self._concatenar(corpo, resultado)
+
+        try:
+            corpo.extend(resultado)
+        finally:
+            if hasattr(resultado, 'close'):
+                resultado.close()
+        dados = b''.join(corpo)
+
+        if len(dados) < self.tamanho_minimo:
+            start_response(status, headers, capturado['exc_info'])
+            return [dados]
+
+        codificacao = codificacoes[0]
+        dados = comprimir(dados, codificacao, self.nivel_gzip, self.nivel_brotli)
+
+        novos_headers = []
+        for nome, valor in headers:
+            nome_minusculo = nome.lower()
+            if nome_minusculo in ('content-length', 'vary'):
+                continue
+            if nome_minusculo == 'etag' and not valor.startswith('W/'):
+                # A representação mudou: o ETag passa a ser fraco
+                valor = 'W/' + valor
+            novos_headers.append((nome, valor))
+        novos_headers.append(('Content-Encoding', codificacao))
+        novos_headers.append(('Content-Length', str(len(dados))))
+        novos_headers.append(('Vary', self._vary_com_accept_encoding(headers)))
+
+        start_response(status, novos_headers, capturado['exc_info'])
+        return [dados]
+
+    def _deve_comprimir(self, status, headers):
+        if not status.startswith('200'):
+            return False
+        tipo = ''
+        for nome, valor in headers:
+            nome_minusculo = nome.lower()
+            if nome_minusculo == 'content-encoding':
+                return False
+            if nome_minusculo == 'content-type':
+                tipo = valor.split(';')[0].strip().lower()
+            if nome_minusculo == 'content-length' and valor.isdigit() and int(valor) < self.tamanho_minimo:
+                return False
+        return tipo in TIPOS_COMPRIMIVEIS
+
+    @staticmethod
+    def _vary_com_accept_encoding(headers):
+        valores = [valor for nome, valor in headers if nome.lower() == 'vary']
+        itens = [v.strip() for valor in valores for v in valor.split(',') if v.strip()]
+        if not any(item.lower() == 'accept-encoding' for item in itens):
+            itens.append('Accept-Encoding')
+        return ', '.join(itens)
+
+    @staticmethod
+    def _concatenar(corpo, resultado):
+        """Repassa o que foi escrito via write() e depois o iterável original"""
+        try:
+            for pedaco in corpo:
+                yield pedaco
+            for pedaco in resultado:
+                yield pedaco
+        finally:
+            if hasattr(resultado, 'close'):
+                resultado.close()
+
+    def _servir_precomprimido(self, environ, start_response, codificacoes):
+        relativo = environ['PATH_INFO'][len('/static/'):]
+        caminho = os.path.normpath(os.path.join(DIRETORIO_STATIC, relativo))
+        if not caminho.startswith(DIRETORIO_STATIC + os.sep):
+            return None
+
+        for codificacao in codificacoes:
+            variante = caminho + SUFIXOS[codificacao]
+            if not os.path.isfile(variante):
+                continue
+
+            tipo, _ = mimetypes.guess_type(caminho)
+            tipo = tipo or 'application/octet-stream'
+            if tipo.startswith('text/') or tipo in ('application/javascript', 'application/json'):
+                tipo += '; charset=utf-8'
+
+            headers = [
+                ('Content-Type', tipo),
+                ('Content-Encoding', codificacao),
+                ('Content-Length', str(os.path.getsize(variante))),
+                ('Vary', 'Accept-Encoding'),
+                ('Cache-Control', f'public, max-age={MAX_AGE_DIST}, immutable'),
+            ]
+            start_response('200 OK', headers)
+            if environ['REQUEST_METHOD'] == 'HEAD':
+                return [b'']
+
+            arquivo = open(variante, 'rb')
+            file_wrapper = environ.get('wsgi.file_wrapper')
+            if file_wrapper:
+                return file_wrapper(arquivo, 64 * 1024)
+            return self._ler_arquivo(arquivo)
+        return None
+
+    @staticmethod
+    def _ler_arquivo(arquivo, tamanho_bloco=64 * 1024):
+        with arquivo:
+            for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+                yield bloco
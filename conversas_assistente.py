@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memória das conversas com o assistente virtual
+Cada usuário tem fios de conversa (ConversaAssistente) por contexto. O prompt
+leva só o resumo acumulado e os últimos turnos que cabem no orçamento de
+tokens, então o tamanho do prompt (e com ele a latência e o custo) não cresce
+com a conversa.
+
+- Histórico lido com consulta indexada (conversa_id, id) e LIMIT
+- Turnos que não cabem mais entre os recentes são condensados no resumo pelo
+  Gemini em segundo plano, fora da requisição
+- Conversa parada há mais de CONVERSA_INATIVIDADE_MIN minutos termina: a
+  próxima pergunta no mesmo contexto abre outra
+
+Uso:
+    python conversas_assistente.py --migrar
+    python conversas_assistente.py --conversa 12   # mostra o histórico que iria no prompt
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect, text
+
+from modelos import db, InteracaoAssistente, ConversaAssistente
+from cliente_gemini import consultar_gemini
+
+# Tokens para resumo + turnos recentes no prompt (estimativa: ~4 caracteres por token)
+ORCAMENTO_TOKENS = int(os.environ.get('CONVERSA_ORCAMENTO_TOKENS', 1200))
+TURNOS_RECENTES = int(os.environ.get('CONVERSA_TURNOS', 4))
+INATIVIDADE = timedelta(minutes=float(os.environ.get('CONVERSA_INATIVIDADE_MIN', 30)))
+CARACTERES_POR_TOKEN = 4
+# O resumo ocupa no máximo um terço do orçamento
+TOKENS_RESUMO = ORCAMENTO_TOKENS // 3
+# Turnos fora do resumo lidos por consulta; se a compactação ficar para trás,
+# os mais antigos que isso saem do histórico sem entrar no resumo
+LIMITE_PENDENTES = TURNOS_RECENTES * 4
+
+logger = logging.getLogger('neurolearn.conversas')
+
+
+# ===== HISTÓRICO =====
+
+def estimar_tokens(texto):
+    return (len(texto or '') + CARACTERES_POR_TOKEN - 1) // CARACTERES_POR_TOKEN
+
+def cortar(texto, tokens):
+    """Limita o texto a ~tokens, cortando no fim"""
+    limite = tokens * CARACTERES_POR_TOKEN
+    return texto if len(texto) <= limite else texto[:max(limite - 3, 0)].rstrip() + '...'
+
+def formatar_turno(pergunta, resposta):
+    return f"Usuário: {pergunta}\nAssistente: {resposta}"
+
+def obter_conversa(usuario_id, contexto, conversa_id=None, nova=False):
+    """Conversa indicada pelo cliente, a última ativa do usuário no contexto ou uma nova
+
+    A nova só é gravada junto com a primeira interação (nenhuma transação fica
+    aberta durante a chamada à IA).
+    """
+    conversa = None
+    if conversa_id:
+        conversa = ConversaAssistente.query.filter_by(id=conversa_id, usuario_id=usuario_id).first()
+    elif not nova:
+        conversa = ConversaAssistente.query.filter(
+            ConversaAssistente.usuario_id == usuario_id,
+            ConversaAssistente.contexto == contexto,
+            ConversaAssistente.data_atualizacao >= datetime.utcnow() - INATIVIDADE
+        ).order_by(ConversaAssistente.data_atualizacao.desc()).first()
+    if conversa is None:
+        conversa = ConversaAssistente(usuario_id=usuario_id, contexto=contexto, resumo='', resumo_ate_id=0, turnos=0)
+    return conversa
+
+def dividir_turnos(conversa):
+    """(antigos, recentes): turnos fora do resumo, do mais antigo ao mais novo
+
+    Recentes são os últimos TURNOS_RECENTES que cabem no orçamento junto com o
+    resumo; os antigos devem ir para o resumo.
+    """
+    if conversa.id is None:
+        return [], []
+    pendentes = db.session.query(
+        InteracaoAssistente.id, InteracaoAssistente.mensagem_usuario, InteracaoAssistente.resposta_assistente
+    ).filter(
+        InteracaoAssistente.conversa_id == conversa.id,
+        InteracaoAssistente.id > conversa.resumo_ate_id,
+        ~InteracaoAssistente.resposta_assistente.startswith('Erro')
+    ).order_by(InteracaoAssistente.id.desc()).limit(LIMITE_PENDENTES).all()[::-1]
+
+    orcamento = ORCAMENTO_TOKENS - estimar_tokens(conversa.resumo)
+    mantidos = 0
+    for _, pergunta, resposta in reversed(pendentes):
+        custo = estimar_tokens(formatar_turno(pergunta, resposta))
+        if mantidos >= TURNOS_RECENTES or custo > orcamento:
+            break
+        orcamento -= custo
+        mantidos += 1
+    corte = len(pendentes) - mantidos
+    return pendentes[:corte], pendentes[corte:]
+
+def montar_historico(conversa):
+    """Trecho do prompt com o resumo e os turnos recentes ('' no primeiro turno)"""
+    _, recentes = dividir_turnos(conversa)
+    partes = []
+    if conversa.resumo:
+        partes.append(f"Resumo da conversa até aqui: {conversa.resumo}")
+    if recentes:
+        partes.append("Últimas mensagens:\n" + "\n".join(
+            formatar_turno(pergunta, resposta) for _, pergunta, resposta in recentes
+        ))
+    return "\n\n".join(partes)
+
+def registrar_turno(conversa, interacao):
+    """Liga a interação à conversa (gravadas no mesmo commit)"""
+    interacao.conversa = conversa
+    conversa.turnos = (conversa.turnos or 0) + 1
+    conversa.data_atualizacao = datetime.utcnow()
+    db.session.add(conversa)
+
+
+# ===== COMPACTAÇÃO =====
+
+def compactar_conversa(conversa_id):
+    """Condensa os turnos antigos no resumo; False se não havia o que resumir ou a IA falhou"""
+    conversa = ConversaAssistente.query.get(conversa_id)
+    if conversa is None:
+        return False
+    antigos, _ = dividir_turnos(conversa)
+    if not antigos:
+        return False
+
+    mensagens = "\n".join(formatar_turno(pergunta, resposta) for _, pergunta, resposta in antigos)
+    prompt = f"""
+    Você mantém a memória de uma conversa entre um usuário e um assistente educacional.
+
+    Resumo anterior: {conversa.resumo or '(vazio)'}
+
+    Novas mensagens:
+    {mensagens}
+
+    Escreva um novo resumo com no máximo {TOKENS_RESUMO * CARACTERES_POR_TOKEN // 6} palavras, em texto corrido,
+    mantendo o que o usuário quer, as dificuldades citadas e o que já foi explicado.
+    """
+    resumo = consultar_gemini(prompt, operacao='resumo_conversa')
+    if resumo.startswith('Erro'):
+        logger.warning('Resumo da conversa não gerado', extra={'conversa_id': conversa_id})
+        return False
+
+    # Só grava se outro worker não compactou a mesma conversa nesse meio-tempo
+    alteradas = ConversaAssistente.query.filter(
+        ConversaAssistente.id == conversa_id,
+        ConversaAssistente.resumo_ate_id == conversa.resumo_ate_id
+    ).update({'resumo': cortar(resumo.strip(), TOKENS_RESUMO), 'resumo_ate_id': antigos[-1][0]},
+             synchronize_session=False)
+    db.session.commit()
+    logger.info('Conversa compactada', extra={'conversa_id': conversa_id, 'turnos': len(antigos)})
+    return bool(alteradas)
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='conversas')
+_agendadas = set()
+_lock_agendadas = threading.Lock()
+
+def agendar_compactacao(app, conversa):
+    """Depois de gravar um turno: compacta fora da requisição se o histórico passou do orçamento"""
+    antigos, _ = dividir_turnos(conversa)
+    if not antigos:
+        return None
+    conversa_id = conversa.id
+    with _lock_agendadas:
+        if conversa_id in _agendadas:
+            return None
+        _agendadas.add(conversa_id)
+
+    def tarefa():
+        with app.app_context():
+            try:
+                compactar_conversa(conversa_id)
+            except Exception:
+                db.session.rollback()
+                logger.exception('Erro ao compactar conversa', extra={'conversa_id': conversa_id})
+            finally:
+                with _lock_agendadas:
+                    _agendadas.discard(conversa_id)
+                db.session.remove()
+    return _executor.submit(tarefa)
+
+
+# ===== MIGRAÇÃO =====
+
+def migrar_conversas():
+    """Cria a tabela de conversas e a coluna/índice de InteracaoAssistente em bancos antigos"""
+    db.create_all()
+    colunas = [coluna['name'] for coluna in inspect(db.engine).get_columns('interacao_assistente')]
+    criada = 'conversa_id' not in colunas
+    if criada:
+        db.session.execute(text(
+            "ALTER TABLE interacao_assistente ADD COLUMN conversa_id INTEGER REFERENCES conversa_assistente (id)"
+        ))
+    db.session.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_interacao_assistente_conversa_id ON interacao_assistente (conversa_id, id)"
+    ))
+    db.session.commit()
+    return criada
+
+
+if __name__ == '__main__':
+    import argparse
+    from fabrica import create_app
+
+    parser = argparse.ArgumentParser(description='Memória das conversas do assistente')
+    parser.add_argument('--migrar', action='store_true', help='cria tabela, coluna e índice em bancos antigos')
+    parser.add_argument('--conversa', type=int, help='mostra o histórico que iria no prompt desta conversa')
+    parser.add_argument('--compactar', action='store_true', help='compacta a conversa antes de mostrar')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.migrar:
+            print("✅ Coluna conversa_id criada" if migrar_conversas() else "✅ Estrutura de conversas já existe")
+        if args.conversa:
+            if args.compactar:
+                print("🗜️ Compactada" if compactar_conversa(args.conversa) else "ℹ️ Nada para compactar")
+            conversa = ConversaAssistente.query.get(args.conversa)
+            if conversa is None:
+                print("❌ Conversa não encontrada")
+            else:
+                historico = montar_historico(conversa)
+                print(f"💬 {conversa.turnos} turnos, ~{estimar_tokens(historico)} tokens de histórico "
+                      f"(orçamento {ORCAMENTO_TOKENS})")
+                print(historico)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fábrica da aplicação Flask do NeuroLearn
+create_app() monta configuração, banco e infraestrutura web (logs, assets,
+compressão, cache de templates, instrumentação SQL, métricas,
+perfilador). As rotas ficam em app.py; scripts que só precisam dos modelos
+usam create_app() sem importar as rotas.
+"""
+
+import os
+import secrets
+from datetime import timedelta
+
+from dotenv import load_dotenv
+from flask import Flask
+
+from modelos import db
+
+def create_app(config=None):
+    """Cria e configura uma instância da aplicação"""
+    # Carregar variáveis do arquivo .env
+    load_dotenv()
+
+    app = Flask(__name__)
+    # Configurações de segurança - usar variáveis de ambiente em produção
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', secrets.token_hex(32))
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///sistema_educacional.db'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Configurações de segurança adicionais
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file upload
+    app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'static', 'uploads')
+    # Permitir HTTP em desenvolvimento - ALTERAR PARA True EM PRODUÇÃO
+    app.config['SESSION_COOKIE_SECURE'] = False  # Permitir HTTP em desenvolvimento
+    app.config['SESSION_COOKIE_HTTPONLY'] = True  # Prevent XSS
+    app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'  # CSRF protection
+    app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=2)  # Session timeout
+
+    if config:
+        app.config.update(config)
+
+    db.init_app(app)
+
+    # Infraestrutura web: importada aqui para manter `import fabrica` leve
+    from logs_estruturados import registrar_logs
+    from pipeline_assets import registrar_assets
+    from compressao import MiddlewareCompressao
+    from cache_templates import configurar_cache_bytecode
+    from instrumentacao_sql import registrar_instrumentacao_sql
+    from metricas import registrar_metricas
+    from perfilador import registrar_perfilador
+
+    registrar_logs(app)
+    registrar_assets(app)
+    app.wsgi_app = MiddlewareCompressao(
+        app.wsgi_app,
+        tamanho_minimo=int(os.environ.get('COMPRESSAO_TAMANHO_MINIMO', 1024))
+    )
+    configurar_cache_bytecode(app)
+    registrar_instrumentacao_sql(app)
+    registrar_metricas(app)
+    registrar_perfilador(app)
+
+    return app
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Facetas da biblioteca de conteúdo (categoria, tipo, nível de ensino)
+Uma única consulta agrupada conta os conteúdos ativos por combinação
+(categoria, tipo, nivel_ensino). Esse "cubo" é pequeno (uma linha por
+combinação existente) e fica em cache no processo; as contagens sob
+qualquer filtro são calculadas a partir dele, sem voltar ao banco.
+
+As contagens são disjuntivas: cada faceta é contada com os filtros das
+outras facetas, mas não com o seu próprio, para que a interface mostre
+quantos itens cada opção traria se fosse escolhida.
+
+O cache é invalidado ao adicionar conteúdo e expira em FACETAS_TTL
+segundos (os outros workers enxergam a mudança no máximo nesse prazo).
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy import func
+
+from modelos import db, BibliotecaConteudo
+from metricas import registrar_cache
+
+TTL_FACETAS = float(os.environ.get('FACETAS_TTL', 300))
+
+# Facetas na ordem das colunas do cubo (também são os nomes dos parâmetros da URL)
+FACETAS = ('categoria', 'tipo', 'nivel_ensino')
+
+
+class CacheFacetas:
+    """Cubo de contagens por (categoria, tipo, nivel_ensino) com expiração"""
+
+    def __init__(self, ttl=TTL_FACETAS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._cubo = None
+        self._validade = 0.0
+
+    def cubo(self):
+        agora = time.monotonic()
+        cubo = self._cubo
+        if cubo is not None and agora < self._validade:
+            registrar_cache('facetas_biblioteca', True)
+            return cubo
+        registrar_cache('facetas_biblioteca', False)
+        with self._lock:
+            if self._cubo is None or time.monotonic() >= self._validade:
+                self._cubo = carregar_cubo()
+                self._validade = time.monotonic() + self.ttl
+            return self._cubo
+
+    def invalidar(self):
+        with self._lock:
+            self._cubo = None
+
+cache_facetas = CacheFacetas()
+
+
+def carregar_cubo():
+    """[(categoria, tipo, nivel_ensino, quantidade)] dos conteúdos ativos"""
+    linhas = db.session.query(
+        BibliotecaConteudo.categoria,
+        BibliotecaConteudo.tipo,
+        BibliotecaConteudo.nivel_ensino,
+        func.count(BibliotecaConteudo.id)
+    ).filter(
+        BibliotecaConteudo.ativo == True
+    ).group_by(
+        BibliotecaConteudo.categoria, BibliotecaConteudo.tipo, BibliotecaConteudo.nivel_ensino
+    ).all()
+    return tuple((categoria, tipo, nivel, quantidade) for categoria, tipo, nivel, quantidade in linhas)
+
+def contar_facetas(filtros=None, cubo=None):
+    """Contagens de cada faceta sob os filtros aplicados
+
+    filtros: {'categoria': ..., 'tipo': ..., 'nivel_ensino': ...} (vazios ignorados)
+    Retorna {'total': n, 'facetas': {faceta: [{'valor', 'quantidade', 'selecionado'}]}}
+    com os valores em ordem decrescente de quantidade.
+    """
+    filtros = {faceta: valor for faceta, valor in (filtros or {}).items() if valor and faceta in FACETAS}
+    cubo = cache_facetas.cubo() if cubo is None else cubo
+
+    contagens = {faceta: {} for faceta in FACETAS}
+    total = 0
+    for linha in cubo:
+        quantidade = linha[-1]
+        falhas = [i for i, faceta in enumerate(FACETAS) if faceta in filtros and linha[i] != filtros[faceta]]
+        if not falhas:
+            total += quantidade
+        # Linha conta para a faceta i se só o filtro da própria faceta i (ou nenhum) falhou
+        for i, faceta in enumerate(FACETAS):
+            if linha[i] and (not falhas or falhas == [i]):
+                contagens[faceta][linha[i]] = contagens[faceta].get(linha[i], 0) + quantidade
+    # A opção escolhida continua visível mesmo sem itens sob os outros filtros
+    for faceta, valor in filtros.items():
+        contagens[faceta].setdefault(valor, 0)
+
+    return {
+        'total': total,
+        'facetas': {
+            faceta: [
+                {'valor': valor, 'quantidade': quantidade, 'selecionado': filtros.get(faceta) == valor}
+                for valor, quantidade in sorted(valores.items(), key=lambda item: (-item[1], item[0]))
+            ]
+            for faceta, valores in contagens.items()
+        },
+    }
+
+def invalidar_facetas():
+    cache_facetas.invalidar()
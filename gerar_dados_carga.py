@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gerador de dados sintéticos em escala para testes de carga do NeuroLearn
+Produz professores, alunos, respostas do questionário (67 questões),
+perfis, testes cognitivos, trilhas e progresso, cronogramas e sessões,
+conteúdos da biblioteca, configurações de acessibilidade, interações com o
+assistente e meses de eventos de monitoramento.
+
+- Inserções em massa (executemany do SQLAlchemy Core), um commit por lote
+- Determinístico: mesma --semente e mesma --data-referencia geram o mesmo banco
+- Os dados ficam identificados (emails carga.*, URLs carga.neurolearn.local)
+  e podem ser removidos com --limpar
+
+Uso:
+    python gerar_dados_carga.py --alunos 1000
+    python gerar_dados_carga.py --alunos 100000 --meses 3 --semente 42
+    python gerar_dados_carga.py --limpar
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+from datetime import datetime, date, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from fabrica import create_app
+from modelos import (
+    db, Usuario, Aluno, Professor, QuestionarioNeuroLearn, PerfilAprendizagem,
+    TestePerfiliCognitivo, TrilhaAprendizado, ProgressoTrilha, CronogramaEstudo,
+    SessaoEstudo, BibliotecaConteudo, MonitoramentoComportamento,
+    ConfiguracaoAcessibilidade, InteracaoAssistente, ConteudoTag, TrilhaPerfilAlvo,
+    VetorPerfilAluno, ConversaAssistente, RecomendacaoTrilha, CalculoRecomendacao
+)
+from tags import migrar_tags
+from alunos_similares import reconstruir_vetores
+from analytics_turma import reconstruir_agregados
+
+PREFIXO_EMAIL = 'carga.'
+URL_CARGA = 'https://carga.neurolearn.local'
+SENHA_CARGA = '123456'
+
+# Tendências por bloco (1-7) dos perfis latentes, como em gerar_dados_teste.py
+PERFIS_BASE = [
+    ('Criativo', {1: 2, 2: 3, 3: 4, 4: 2, 5: 4, 6: 3, 7: 5}, 0.18),
+    ('Organizado', {1: 3, 2: 4, 3: 3, 4: 5, 5: 4, 6: 3, 7: 3}, 0.20),
+    ('Social', {1: 3, 2: 3, 3: 4, 4: 3, 5: 3, 6: 5, 7: 4}, 0.20),
+    ('Sensorial', {1: 5, 2: 2, 3: 3, 4: 3, 5: 4, 6: 2, 7: 3}, 0.12),
+    ('Equilibrado', {1: 3, 2: 3, 3: 3, 4: 3, 5: 3, 6: 3, 7: 3}, 0.30),
+]
+
+BLOCOS_NOMES = {
+    1: 'Percepção Sensorial', 2: 'Atenção e Foco', 3: 'Comunicação', 4: 'Organização',
+    5: 'Aprendizagem', 6: 'Interação Social', 7: 'Criatividade'
+}
+
+SERIES = ['6º Ano', '7º Ano', '8º Ano', '9º Ano', '1º Ano EM', '2º Ano EM', '3º Ano EM']
+IDADE_POR_SERIE = {'6º Ano': 11, '7º Ano': 12, '8º Ano': 13, '9º Ano': 14,
+                   '1º Ano EM': 15, '2º Ano EM': 16, '3º Ano EM': 17}
+AREAS = ['matematica', 'portugues', 'ciencias', 'historia', 'geografia', 'ingles', 'artes']
+TIPOS_TRILHA = [('video', 0.4), ('texto', 0.25), ('jogo', 0.2), ('audio', 0.15)]
+TIPOS_BIBLIOTECA = [('video', 0.45), ('podcast', 0.3), ('jogo', 0.25)]
+NIVEIS = ['facil', 'medio', 'dificil']
+NIVEIS_ENSINO = ['fundamental1', 'fundamental2', 'medio']
+TIPOS_PERFIL = ['Pensador Criativo', 'Organizador Metódico', 'Comunicador Social',
+                'Observador Detalhista', 'Perfil Equilibrado']
+TAGS = ['visual', 'auditivo', 'pratico', 'leitura', 'colaborativo', 'individual', 'ludico',
+        'foco', 'memoria', 'logica', 'criatividade', 'tdah', 'tea', 'dislexia', 'revisao']
+TESTES_COGNITIVOS = ['visual', 'auditivo', 'sinestesico', 'logico']
+DISPOSITIVOS = [('mobile', 0.55), ('desktop', 0.35), ('tablet', 0.10)]
+ACOES = [('login', 0.22), ('logout', 0.15), ('inicio_atividade', 0.18), ('fim_atividade', 0.14),
+         ('pausa', 0.10), ('acerto', 0.13), ('erro', 0.08)]
+CONTEXTOS_ASSISTENTE = ['dashboard', 'atividade', 'cronograma', 'trilha', 'biblioteca']
+PERGUNTAS_ASSISTENTE = [
+    'Como organizo meu tempo de estudo?', 'Não entendi a atividade de frações',
+    'Pode me explicar o que é fotossíntese?', 'Como faço para me concentrar melhor?',
+    'Quais trilhas você recomenda para mim?', 'Estou com dificuldade em ler textos longos',
+    'Como funciona o cronograma?', 'O que significa meu perfil de aprendizagem?',
+]
+# Peso de cada hora do dia: pico às 7h (início das aulas) e à tarde
+PESO_HORAS = [0, 0, 0, 0, 0, 0, 2, 30, 12, 8, 6, 5, 4, 6, 10, 12, 10, 8, 6, 5, 4, 2, 1, 0]
+
+
+def escolher_ponderado(rng, opcoes):
+    """Escolhe de uma lista [(valor, peso), ...]"""
+    valores, pesos = zip(*opcoes)
+    return rng.choices(valores, weights=pesos)[0]
+
+def poisson(rng, media):
+    """Amostra de Poisson (Knuth para médias pequenas, normal para grandes)"""
+    if media <= 0:
+        return 0
+    if media > 30:
+        return max(0, int(round(rng.gauss(media, math.sqrt(media)))))
+    limite, k, p = math.exp(-media), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limite:
+            return k
+        k += 1
+
+def tipo_perfil_por_medias(medias):
+    """Mesmas regras de gerar_perfil_teste"""
+    if medias[7] >= 4.0 and medias[5] >= 4.0:
+        return 'Pensador Criativo'
+    elif medias[4] >= 4.0 and medias[2] >= 4.0:
+        return 'Organizador Metódico'
+    elif medias[3] >= 4.0 and medias[6] >= 4.0:
+        return 'Comunicador Social'
+    elif medias[1] >= 4.0:
+        return 'Observador Detalhista'
+    return 'Perfil Equilibrado'
+
+
+class GeradorCarga:
+    """Gera e insere os dados sintéticos em lotes"""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.semente)
+        self.referencia = datetime.combine(args.data_referencia, datetime.min.time())
+        self.inseridos = {}
+        self.senha_hash = generate_password_hash(SENHA_CARGA)  # uma vez para todos
+
+    # ----- infraestrutura -----
+
+    def inserir(self, modelo, linhas):
+        """Insere em blocos de --lote linhas, com commit por bloco"""
+        tabela = modelo.__table__
+        for i in range(0, len(linhas), self.args.lote):
+            db.session.execute(tabela.insert(), linhas[i:i + self.args.lote])
+            db.session.commit()
+        self.inseridos[tabela.name] = self.inseridos.get(tabela.name, 0) + len(linhas)
+
+    @staticmethod
+    def mapear(coluna_chave, coluna_valor, valores):
+        """Mapa chave -> valor para as chaves dadas, em blocos (limite de variáveis do SQLite)"""
+        mapa = {}
+        for i in range(0, len(valores), 900):
+            mapa.update(db.session.query(coluna_chave, coluna_valor)
+                        .filter(coluna_chave.in_(valores[i:i + 900])))
+        return mapa
+
+    def data_passada(self, dias_max):
+        """Instante aleatório nos últimos dias_max dias, respeitando o peso das horas"""
+        dia = self.referencia - timedelta(days=self.rng.randrange(max(1, dias_max)))
+        hora = self.rng.choices(range(24), weights=PESO_HORAS)[0]
+        return dia.replace(hour=hora, minute=self.rng.randrange(60), second=self.rng.randrange(60))
+
+    # ----- catálogo -----
+
+    def gerar_professores(self):
+        quantidade = self.args.professores or max(1, self.args.alunos // 30)
+        usuarios = [{
+            'nome': f'Prof. Carga {i}',
+            'email': f'{PREFIXO_EMAIL}professor{i}@teste.com',
+            'senha_hash': self.senha_hash,
+            'tipo': 'professor',
+            'data_criacao': self.referencia - timedelta(days=365),
+        } for i in range(1, quantidade + 1)]
+        self.inserir(Usuario, usuarios)
+
+        ids = self.mapear(Usuario.email, Usuario.id, [u['email'] for u in usuarios])
+        self.inserir(Professor, [{
+            'usuario_id': ids[u['email']],
+            'disciplina': self.rng.choice(AREAS),
+            'formacao': 'Licenciatura',
+        } for u in usuarios])
+
+        # Cada professor tem uma turma de uma série
+        self.turmas = [(u['nome'], self.rng.choice(SERIES)) for u in usuarios]
+
+    def gerar_trilhas(self):
+        self.inserir(TrilhaAprendizado, [{
+            'nome': f'Trilha {i}: {self.rng.choice(AREAS).capitalize()}',
+            'descricao': 'Trilha gerada para teste de carga',
+            'tipo_conteudo': escolher_ponderado(self.rng, TIPOS_TRILHA),
+            'nivel_dificuldade': self.rng.choice(NIVEIS),
+            'area_conhecimento': self.rng.choice(AREAS),
+            'perfil_alvo': ', '.join(self.rng.sample(TIPOS_PERFIL, self.rng.randint(1, 2))),
+            'duracao_estimada': int(self.rng.lognormvariate(3.3, 0.5)),
+            'url_conteudo': f'{URL_CARGA}/trilha/{i}',
+            'ativo': self.rng.random() < 0.95,
+            'data_criacao': self.data_passada(365),
+        } for i in range(1, self.args.trilhas + 1)])
+        self.trilha_ids = [i for (i,) in db.session.query(TrilhaAprendizado.id)
+                           .filter(TrilhaAprendizado.url_conteudo.like(f'{URL_CARGA}/%'))
+                           .order_by(TrilhaAprendizado.id)]
+        # Popularidade tipo Zipf: poucas trilhas concentram a maioria dos alunos
+        self.peso_trilhas = [1 / (posicao + 1) ** 1.1 for posicao in range(len(self.trilha_ids))]
+
+    def gerar_biblioteca(self):
+        self.inserir(BibliotecaConteudo, [{
+            'titulo': f'Conteúdo {i} de {self.rng.choice(AREAS)}',
+            'descricao': 'Conteúdo gerado para teste de carga',
+            'tipo': escolher_ponderado(self.rng, TIPOS_BIBLIOTECA),
+            'categoria': self.rng.choice(AREAS),
+            'nivel_ensino': self.rng.choice(NIVEIS_ENSINO),
+            'url_conteudo': f'{URL_CARGA}/biblioteca/{i}',
+            'tem_legenda': self.rng.random() < 0.6,
+            'tem_libras': self.rng.random() < 0.2,
+            'duracao': int(self.rng.lognormvariate(2.7, 0.6)),
+            'classificacao_etaria': self.rng.choice(['livre', '10', '12', '14']),
+            'tags': ','.join(self.rng.sample(TAGS, self.rng.randint(1, 4))),
+            'ativo': True,
+            'data_criacao': self.data_passada(365),
+        } for i in range(1, self.args.conteudos + 1)])
+
+    # ----- alunos -----
+
+    def gerar_alunos(self):
+        tamanho_bloco = self.args.bloco_alunos
+        for inicio in range(0, self.args.alunos, tamanho_bloco):
+            fim = min(inicio + tamanho_bloco, self.args.alunos)
+            self.gerar_bloco_alunos(inicio + 1, fim + 1)
+            print(f"   👥 {fim}/{self.args.alunos} alunos")
+
+    def gerar_bloco_alunos(self, primeiro, ultimo):
+        rng = self.rng
+        usuarios = [{
+            'nome': f'Aluno Carga {i}',
+            'email': f'{PREFIXO_EMAIL}aluno{i}@teste.com',
+            'senha_hash': self.senha_hash,
+            'tipo': 'aluno',
+            'data_criacao': self.data_passada(self.args.meses * 30 + 60),
+        } for i in range(primeiro, ultimo)]
+        self.inserir(Usuario, usuarios)
+        ids_usuario = self.mapear(Usuario.email, Usuario.id, [u['email'] for u in usuarios])
+
+        alunos = []
+        for u in usuarios:
+            professor, serie = rng.choice(self.turmas)
+            completo = rng.random() < 0.85
+            alunos.append({
+                'usuario_id': ids_usuario[u['email']],
+                'email_escola': u['email'].replace('@teste.com', '@escola.edu.br'),
+                'serie_ano': serie,
+                'professor_responsavel': professor,
+                'idade': IDADE_POR_SERIE[serie] + (1 if rng.random() < 0.15 else 0),
+                'questionario_completo': completo,
+                'perfil_gerado': completo and rng.random() < 0.9,
+            })
+        self.inserir(Aluno, alunos)
+
+        ids_aluno = self.mapear(Aluno.usuario_id, Aluno.id, list(ids_usuario.values()))
+        for aluno in alunos:
+            aluno['id'] = ids_aluno[aluno['usuario_id']]
+
+        self.gerar_questionarios_e_perfis(alunos)
+        self.gerar_testes_cognitivos(alunos)
+        self.gerar_progresso_trilhas(alunos)
+        self.gerar_cronogramas(alunos)
+        self.gerar_monitoramento(alunos)
+        self.gerar_acessibilidade_e_assistente(alunos)
+
+    def gerar_questionarios_e_perfis(self, alunos):
+        rng = self.rng
+        respostas, perfis = [], []
+        perfis_base = [(t, p) for _, t, p in PERFIS_BASE]
+        for aluno in alunos:
+            if not aluno['questionario_completo']:
+                continue
+            tendencias = escolher_ponderado(rng, perfis_base)
+            data_resposta = self.data_passada(self.args.meses * 30)
+            soma = {b: 0 for b in range(1, 8)}
+            contagem = {b: 0 for b in range(1, 8)}
+            for questao in range(1, 68):
+                bloco = ((questao - 1) // 10) + 1
+                resposta = max(1, min(5, int(round(rng.gauss(tendencias[bloco], 0.8)))))
+                soma[bloco] += resposta
+                contagem[bloco] += 1
+                respostas.append({'aluno_id': aluno['id'], 'bloco': bloco, 'questao': questao,
+                                  'resposta': resposta, 'data_resposta': data_resposta})
+
+            if aluno['perfil_gerado']:
+                medias = {b: soma[b] / contagem[b] for b in soma}
+                tipo = tipo_perfil_por_medias(medias)
+                fortes = [BLOCOS_NOMES[b] for b, m in medias.items() if m >= 4.0]
+                perfis.append({
+                    'aluno_id': aluno['id'],
+                    'perfil_geral': f"Perfil {tipo.lower()} com destaque em {', '.join(fortes) or 'múltiplas competências'}.",
+                    'potenciais_expressivos': 'Gerado para teste de carga.',
+                    'potenciais_cognitivos': 'Gerado para teste de carga.',
+                    'indicios_neurodivergencias': 'Perfil neurotípico com características individuais de aprendizagem.',
+                    'recomendacoes_professores': '\n• Oferecer atividades diversificadas',
+                    'reforco_motivacional': 'Continue explorando e aprendendo!',
+                    'tipo_perfil': tipo,
+                    'data_geracao': data_resposta + timedelta(minutes=rng.randint(1, 30)),
+                })
+        self.inserir(QuestionarioNeuroLearn, respostas)
+        self.inserir(PerfilAprendizagem, perfis)
+
+    def gerar_testes_cognitivos(self, alunos):
+        rng = self.rng
+        testes = []
+        for aluno in alunos:
+            for tipo in TESTES_COGNITIVOS:
+                if rng.random() < 0.5:
+                    testes.append({
+                        'aluno_id': aluno['id'],
+                        'tipo_teste': tipo,
+                        'pontuacao': max(0, min(100, int(rng.gauss(65, 15)))),
+                        'tempo_resposta': int(rng.lognormvariate(4.5, 0.4)),
+                        'data_teste': self.data_passada(self.args.meses * 30),
+                        'resultados_detalhados': json.dumps({'acertos': rng.randint(3, 10), 'total': 10}),
+                    })
+        self.inserir(TestePerfiliCognitivo, testes)
+
+    def gerar_progresso_trilhas(self, alunos):
+        rng = self.rng
+        progressos = []
+        for aluno in alunos:
+            quantidade = min(poisson(rng, 3), len(self.trilha_ids))
+            escolhidas = set(rng.choices(self.trilha_ids, weights=self.peso_trilhas, k=quantidade))
+            for trilha_id in escolhidas:
+                progresso = round(min(100.0, rng.betavariate(1.2, 0.9) * 110), 1)
+                inicio = self.data_passada(self.args.meses * 30)
+                progressos.append({
+                    'aluno_id': aluno['id'],
+                    'trilha_id': trilha_id,
+                    'progresso': progresso,
+                    'tempo_gasto': int(progresso * rng.uniform(0.3, 1.2)),
+                    'data_inicio': inicio,
+                    'data_conclusao': inicio + timedelta(days=rng.randint(1, 20)) if progresso >= 100 else None,
+                    'dificuldade_percebida': rng.randint(1, 5) if rng.random() < 0.4 else None,
+                })
+        self.inserir(ProgressoTrilha, progressos)
+
+    def gerar_cronogramas(self, alunos):
+        rng = self.rng
+        cronogramas = []
+        for aluno in alunos:
+            if rng.random() >= 0.6:
+                continue
+            inicio = (self.referencia - timedelta(days=rng.randint(7, self.args.meses * 30 + 7))).date()
+            cronogramas.append({
+                'aluno_id': aluno['id'],
+                'data_inicio': inicio,
+                'data_fim': inicio + timedelta(days=rng.choice([30, 60, 90])),
+                'objetivo': rng.choice(['Melhorar notas', 'Preparar para provas', 'Revisar conteúdos']),
+                'horas_por_dia': rng.choice([0.5, 1.0, 1.5, 2.0]),
+                'dias_semana': rng.choice(['1,2,3,4,5', '1,3,5', '2,4', '1,2,3,4,5,6']),
+                'horario_preferido': rng.choice(['manha', 'tarde', 'noite']),
+                'tempo_pausa': 10,
+                'tempo_sessao': rng.choice([25, 30, 45]),
+                'lembretes_ativos': rng.random() < 0.7,
+                'ativo': True,
+            })
+        if not cronogramas:
+            return
+        self.inserir(CronogramaEstudo, cronogramas)
+
+        ids = self.mapear(CronogramaEstudo.aluno_id, CronogramaEstudo.id,
+                          [c['aluno_id'] for c in cronogramas])
+
+        horas = {'manha': 8, 'tarde': 14, 'noite': 19}
+        sessoes = []
+        hoje = self.referencia.date()
+        for c in cronogramas:
+            dias = {int(d) for d in c['dias_semana'].split(',')}
+            assiduidade = rng.betavariate(4, 2)
+            dia = c['data_inicio']
+            fim = min(c['data_fim'], hoje + timedelta(days=7))
+            while dia <= fim:
+                if dia.isoweekday() in dias:
+                    passada = dia < hoje
+                    realizada = passada and rng.random() < assiduidade
+                    sessoes.append({
+                        'cronograma_id': ids[c['aluno_id']],
+                        'data_sessao': datetime.combine(dia, datetime.min.time()).replace(hour=horas[c['horario_preferido']]),
+                        'duracao_planejada': c['tempo_sessao'],
+                        'duracao_real': max(5, int(rng.gauss(c['tempo_sessao'], 8))) if realizada else None,
+                        'realizada': realizada,
+                        'nivel_concentracao': rng.randint(1, 5) if realizada else None,
+                        'trilha_estudada': rng.choices(self.trilha_ids, weights=self.peso_trilhas)[0] if realizada else None,
+                    })
+                dia += timedelta(days=1)
+        self.inserir(SessaoEstudo, sessoes)
+
+    def gerar_monitoramento(self, alunos):
+        rng = self.rng
+        dias = self.args.meses * 30
+        eventos = []
+        for aluno in alunos:
+            # Engajamento varia muito entre alunos (log-normal)
+            media_dia = self.args.eventos_dia * rng.lognormvariate(-0.3, 0.8)
+            for deslocamento in range(dias):
+                dia = self.referencia - timedelta(days=deslocamento)
+                fator = 0.25 if dia.weekday() >= 5 else 1.0
+                for _ in range(poisson(rng, media_dia * fator)):
+                    hora = rng.choices(range(24), weights=PESO_HORAS)[0]
+                    tipo = escolher_ponderado(rng, ACOES)
+                    eventos.append({
+                        'aluno_id': aluno['id'],
+                        'data_acao': dia.replace(hour=hora, minute=rng.randrange(60), second=rng.randrange(60)),
+                        'tipo_acao': tipo,
+                        'contexto': 'sistema' if tipo in ('login', 'logout') else f'trilha_{rng.choice(self.trilha_ids)}',
+                        'tempo_gasto': int(rng.lognormvariate(5, 1)) if tipo == 'fim_atividade' else None,
+                        'dispositivo': escolher_ponderado(rng, DISPOSITIVOS),
+                        'resultado': 'erro' if tipo == 'erro' else 'sucesso',
+                        'detalhes': None,
+                    })
+            # Limita a memória usada em execuções grandes
+            if len(eventos) >= self.args.lote * 10:
+                self.inserir(MonitoramentoComportamento, eventos)
+                eventos = []
+        self.inserir(MonitoramentoComportamento, eventos)
+
+    def gerar_acessibilidade_e_assistente(self, alunos):
+        rng = self.rng
+        configuracoes, interacoes = [], []
+        for aluno in alunos:
+            if rng.random() < 0.2:
+                configuracoes.append({
+                    'usuario_id': aluno['usuario_id'],
+                    'modo_escuro': rng.random() < 0.5,
+                    'alto_contraste': rng.random() < 0.1,
+                    'tamanho_fonte': rng.choice(['normal', 'normal', 'grande', 'muito-grande']),
+                    'navegacao_simplificada': rng.random() < 0.15,
+                    'reducao_animacoes': rng.random() < 0.2,
+                })
+            if rng.random() < 0.3:
+                for _ in range(rng.randint(1, 6)):
+                    interacoes.append({
+                        'usuario_id': aluno['usuario_id'],
+                        'mensagem_usuario': rng.choice(PERGUNTAS_ASSISTENTE),
+                        'resposta_assistente': 'Resposta gerada para teste de carga.',
+                        'contexto': rng.choice(CONTEXTOS_ASSISTENTE),
+                        'satisfacao_resposta': rng.choice([None, 3, 4, 5, 5]),
+                        'data_interacao': self.data_passada(self.args.meses * 30),
+                    })
+        self.inserir(ConfiguracaoAcessibilidade, configuracoes)
+        self.inserir(InteracaoAssistente, interacoes)
+
+    def executar(self):
+        inicio = time.perf_counter()
+        print("🏗️  Catálogo: professores, trilhas e biblioteca...")
+        self.gerar_professores()
+        self.gerar_trilhas()
+        self.gerar_biblioteca()
+        migrar_tags()
+        print(f"👥 Gerando {self.args.alunos} alunos...")
+        self.gerar_alunos()
+        reconstruir_vetores()
+        reconstruir_agregados()
+        return time.perf_counter() - inicio
+
+
+def limpar_dados_carga():
+    """Remove tudo o que foi criado por este gerador"""
+    usuarios = db.session.query(Usuario.id).filter(Usuario.email.like(f'{PREFIXO_EMAIL}%'))
+    alunos = db.session.query(Aluno.id).filter(Aluno.usuario_id.in_(usuarios.subquery()))
+    cronogramas = db.session.query(CronogramaEstudo.id).filter(CronogramaEstudo.aluno_id.in_(alunos.subquery()))
+    trilhas = db.session.query(TrilhaAprendizado.id).filter(TrilhaAprendizado.url_conteudo.like(f'{URL_CARGA}/%'))
+
+    SessaoEstudo.query.filter(SessaoEstudo.cronograma_id.in_(cronogramas.subquery())).delete(synchronize_session=False)
+    for modelo in (QuestionarioNeuroLearn, PerfilAprendizagem, TestePerfiliCognitivo,
+                   ProgressoTrilha, CronogramaEstudo, MonitoramentoComportamento, VetorPerfilAluno,
+                   RecomendacaoTrilha, CalculoRecomendacao):
+        modelo.query.filter(modelo.aluno_id.in_(alunos.subquery())).delete(synchronize_session=False)
+    ProgressoTrilha.query.filter(ProgressoTrilha.trilha_id.in_(trilhas.subquery())).delete(synchronize_session=False)
+    for modelo in (ConfiguracaoAcessibilidade, InteracaoAssistente, ConversaAssistente, Aluno, Professor):
+        modelo.query.filter(modelo.usuario_id.in_(usuarios.subquery())).delete(synchronize_session=False)
+    Usuario.query.filter(Usuario.email.like(f'{PREFIXO_EMAIL}%')).delete(synchronize_session=False)
+    conteudos = db.session.query(BibliotecaConteudo.id).filter(BibliotecaConteudo.url_conteudo.like(f'{URL_CARGA}/%'))
+    TrilhaPerfilAlvo.query.filter(TrilhaPerfilAlvo.trilha_id.in_(trilhas.subquery())).delete(synchronize_session=False)
+    ConteudoTag.query.filter(ConteudoTag.conteudo_id.in_(conteudos.subquery())).delete(synchronize_session=False)
+    TrilhaAprendizado.query.filter(TrilhaAprendizado.url_conteudo.like(f'{URL_CARGA}/%')).delete(synchronize_session=False)
+    BibliotecaConteudo.query.filter(BibliotecaConteudo.url_conteudo.like(f'{URL_CARGA}/%')).delete(synchronize_session=False)
+    db.session.commit()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera dados sintéticos em escala para testes de carga')
+    parser.add_argument('--alunos', type=int, default=1000, help='quantidade de alunos (padrão: 1000)')
+    parser.add_argument('--professores', type=int, help='quantidade de professores (padrão: 1 a cada 30 alunos)')
+    parser.add_argument('--trilhas', type=int, default=200, help='trilhas no catálogo (padrão: 200)')
+    parser.add_argument('--conteudos', type=int, default=500, help='conteúdos da biblioteca (padrão: 500)')
+    parser.add_argument('--meses', type=int, default=3, help='meses de histórico de monitoramento (padrão: 3)')
+    parser.add_argument('--eventos-dia', type=float, default=2.0, help='média de eventos por aluno por dia útil (padrão: 2)')
+    parser.add_argument('--semente', type=int, default=42, help='semente do gerador aleatório (padrão: 42)')
+    parser.add_argument('--data-referencia', type=date.fromisoformat, default=date.today(),
+                        help='"hoje" dos dados, AAAA-MM-DD (padrão: data atual)')
+    parser.add_argument('--lote', type=int, default=5000, help='linhas por INSERT/commit (padrão: 5000)')
+    parser.add_argument('--bloco-alunos', type=int, default=2000, help='alunos gerados por vez (padrão: 2000)')
+    parser.add_argument('--limpar', action='store_true', help='remove os dados de carga e sai')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if args.limpar:
+            limpar_dados_carga()
+            reconstruir_agregados()
+            print("🧹 Dados de carga removidos")
+            raise SystemExit(0)
+
+        if Usuario.query.filter(Usuario.email.like(f'{PREFIXO_EMAIL}%')).first():
+            print("❌ Já existem dados de carga. Rode com --limpar antes de gerar novamente.")
+            raise SystemExit(1)
+
+        # Dados descartáveis: dispensa o fsync a cada commit
+        db.session.execute(db.text('PRAGMA synchronous = OFF'))
+
+        gerador = GeradorCarga(args)
+        duracao = gerador.executar()
+
+        print(f"\n🎉 Dados de carga gerados em {duracao:.1f}s (semente {args.semente})")
+        for tabela, quantidade in sorted(gerador.inseridos.items()):
+            print(f"   {tabela:<32} {quantidade:>10}")
+        print(f"\n🔑 Senha de todos os usuários: {SENHA_CARGA}")
@@ -6,10 +6,13 @@ from datetime import datetime, timedelta
 # Adicionar o diretório do projeto ao path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app import app, db, Usuario, Aluno, Professor, QuestionarioNeuroLearn, PerfilAprendizagem
+from fabrica import create_app
+from modelos import db, Usuario, Aluno, Professor, QuestionarioNeuroLearn, PerfilAprendizagem
 from werkzeug.security import generate_password_hash
 import json
 
+app = create_app()
+
 def gerar_dados_teste():
     """Gera dados de teste: 1 professor e 10 alunos com questionários respondidos"""
     
@@ -53,6 +56,9 @@ def gerar_dados_teste():
         # 2. CRIAR 10 ALUNOS
         print("\n👥 Criando 10 alunos...")
         
+        # Todos os alunos de teste usam a mesma senha: um único hash basta
+        senha_hash_alunos = generate_password_hash('123456')
+        
         nomes_alunos = [
             'Ana Clara Santos',
             'Bruno Oliveira',
@@ -87,11 +93,11 @@ def gerar_dados_teste():
             usuario_aluno = Usuario(
                 nome=nome,
                 email=email,
-                senha_hash=generate_password_hash('123456'),
+                senha_hash=senha_hash_alunos,
                 tipo='aluno'
             )
             db.session.add(usuario_aluno)
-            db.session.commit()
+            db.session.flush()  # obtém o id; usuário e aluno vão no mesmo commit
             
             # Criar perfil do aluno
             aluno = Aluno(
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Importação em massa de alunos a partir da lista da turma (CSV ou XLSX)
+1. Lê e valida todas as linhas antes de gravar qualquer coisa
+2. Gera os hashes de senha em paralelo (ProcessPoolExecutor com processos
+   novos via spawn: nada de fork() de um worker web com threads rodando)
+3. Insere Usuario + Aluno em lotes, todos numa única transação (ou o
+   arquivo inteiro é gravado, ou nada)
+4. Produz um relatório de erros por linha
+
+Colunas (cabeçalho na primeira linha):
+    nome, email, serie_ano, idade             obrigatórias
+    senha, professor_responsavel, email_escola opcionais
+
+Sem coluna senha, cada aluno recebe uma senha provisória, listada no
+arquivo de credenciais para o professor distribuir.
+
+Pela web (/importar-alunos) o arquivo pode ter até IMPORTACAO_LIMITE_WEB
+alunos, para a requisição não passar do timeout do worker; listas maiores
+(a escola inteira) vão pela linha de comando.
+
+Uso:
+    python importacao_alunos.py turma_7a.csv --professor "Prof. Ana"
+    python importacao_alunos.py escola.xlsx --ignorar-invalidos --relatorio erros.csv
+"""
+
+import argparse
+import csv
+import io
+import multiprocessing
+import os
+import secrets
+import string
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import openpyxl
+except ImportError:  # openpyxl é opcional; sem ele só CSV é aceito
+    openpyxl = None
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from autenticacao import gerar_hash_senha, validar_email, validar_senha
+from modelos import db, Usuario, Aluno
+
+COLUNAS_OBRIGATORIAS = ['nome', 'email', 'serie_ano', 'idade']
+COLUNAS_OPCIONAIS = ['senha', 'professor_responsavel', 'email_escola']
+
+TAMANHO_LOTE = 500
+# Linhas aceitas numa importação feita dentro da requisição web
+LIMITE_WEB = int(os.environ.get('IMPORTACAO_LIMITE_WEB', 100))
+IDADE_MINIMA, IDADE_MAXIMA = 5, 100
+
+
+class ErroImportacao(Exception):
+    """Arquivo ilegível ou sem as colunas obrigatórias"""
+
+
+# ===== LEITURA =====
+
+def _normalizar_cabecalho(cabecalho):
+    return [str(c or '').strip().lower().replace(' ', '_') for c in cabecalho]
+
+def ler_csv(conteudo):
+    """Lê bytes de um CSV (UTF-8 com ou sem BOM, ou Windows-1252 do Excel; separador , ou ;)"""
+    try:
+        texto = conteudo.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        try:
+            texto = conteudo.decode('cp1252')
+        except UnicodeDecodeError:
+            raise ErroImportacao('Codificação do CSV não reconhecida: salve o arquivo como CSV UTF-8')
+    try:
+        dialeto = csv.Sniffer().sniff(texto[:4096], delimiters=',;')
+    except csv.Error:
+        dialeto = csv.excel
+    leitor = csv.reader(io.StringIO(texto), dialeto)
+    return list(leitor)
+
+def ler_xlsx(conteudo):
+    """Lê a primeira planilha de um arquivo XLSX"""
+    if openpyxl is None:
+        raise ErroImportacao('Suporte a XLSX requer o pacote openpyxl')
+    planilha = openpyxl.load_workbook(io.BytesIO(conteudo), read_only=True, data_only=True).active
+    return [['' if valor is None else str(valor) for valor in linha]
+            for linha in planilha.iter_rows(values_only=True)]
+
+def ler_planilha(nome_arquivo, conteudo):
+    """Retorna a lista de dicionários (um por linha) e valida o cabeçalho"""
+    extensao = os.path.splitext(nome_arquivo)[1].lower()
+    if extensao == '.csv':
+        linhas = ler_csv(conteudo)
+    elif extensao in ('.xlsx', '.xlsm'):
+        linhas = ler_xlsx(conteudo)
+    else:
+        raise ErroImportacao('Formato não suportado: use .csv ou .xlsx')
+
+    if not linhas:
+        raise ErroImportacao('Arquivo vazio')
+
+    cabecalho = _normalizar_cabecalho(linhas[0])
+    faltando = [c for c in COLUNAS_OBRIGATORIAS if c not in cabecalho]
+    if faltando:
+        raise ErroImportacao(f"Colunas obrigatórias ausentes: {', '.join(faltando)}")
+
+    registros = []
+    for valores in linhas[1:]:
+        if not any(str(v).strip() for v in valores):
+            continue  # linha em branco
+        registro = {coluna: str(valor).strip() for coluna, valor in zip(cabecalho, valores)}
+        registros.append(registro)
+    return registros
+
+
+# ===== VALIDAÇÃO =====
+
+def gerar_senha_provisoria():
+    """Senha aleatória que atende aos critérios de validar_senha"""
+    alfabeto = string.ascii_letters + string.digits
+    return ''.join(secrets.choice(alfabeto) for _ in range(8)) + secrets.choice('23456789') + secrets.choice('!@#$%&*')
+
+def emails_ja_cadastrados(emails):
+    """Emails da lista que já existem no banco (consulta em blocos)"""
+    existentes = set()
+    emails = list(emails)
+    for i in range(0, len(emails), TAMANHO_LOTE):
+        bloco = emails[i:i + TAMANHO_LOTE]
+        existentes.update(email for (email,) in
+                          db.session.query(Usuario.email).filter(Usuario.email.in_(bloco)))
+    return existentes
+
+def validar_registros(registros, professor_padrao=None):
+    """Valida todas as linhas; retorna (alunos_validos, erros)
+
+    Cada erro é {'linha', 'email', 'campo', 'mensagem'}; a linha considera o
+    cabeçalho como linha 1, como numa planilha.
+    """
+    erros = []
+    validos = []
+    vistos = {}
+
+    for indice, registro in enumerate(registros, start=2):
+        erros_linha = []
+
+        def erro(campo, mensagem):
+            erros_linha.append({'linha': indice, 'email': registro.get('email', ''),
+                                'campo': campo, 'mensagem': mensagem})
+
+        for coluna in COLUNAS_OBRIGATORIAS:
+            if not registro.get(coluna):
+                erro(coluna, 'Campo obrigatório vazio')
+
+        email = registro.get('email', '').lower()
+        if email:
+            if not validar_email(email):
+                erro('email', 'Email inválido')
+            elif email in vistos:
+                erro('email', f'Email repetido (linha {vistos[email]})')
+            else:
+                vistos[email] = indice
+
+        idade = None
+        if registro.get('idade'):
+            try:
+                idade = int(float(registro['idade']))
+                if not IDADE_MINIMA <= idade <= IDADE_MAXIMA:
+                    erro('idade', f'Idade fora do intervalo {IDADE_MINIMA}-{IDADE_MAXIMA}')
+            except (ValueError, OverflowError):
+                erro('idade', 'Idade deve ser um número')
+
+        senha = registro.get('senha', '')
+        senha_provisoria = not senha
+        if senha:
+            valida, mensagem = validar_senha(senha)
+            if not valida:
+                erro('senha', mensagem)
+        else:
+            senha = gerar_senha_provisoria()
+
+        professor = registro.get('professor_responsavel') or professor_padrao
+        if not professor:
+            erro('professor_responsavel', 'Informe o professor responsável')
+
+        if erros_linha:
+            erros.extend(erros_linha)
+            continue
+
+        validos.append({
+            'linha': indice,
+            'nome': registro['nome'][:100],
+            'email': email,
+            'senha': senha,
+            'senha_provisoria': senha_provisoria,
+            'serie_ano': registro['serie_ano'][:20],
+            'professor_responsavel': professor[:100],
+            'idade': idade,
+            'email_escola': registro.get('email_escola') or None,
+        })
+
+    # Emails já cadastrados: uma consulta para o arquivo inteiro
+    existentes = emails_ja_cadastrados(a['email'] for a in validos)
+    if existentes:
+        for aluno in validos:
+            if aluno['email'] in existentes:
+                erros.append({'linha': aluno['linha'], 'email': aluno['email'],
+                              'campo': 'email', 'mensagem': 'Email já cadastrado'})
+        validos = [a for a in validos if a['email'] not in existentes]
+
+    erros.sort(key=lambda e: e['linha'])
+    return validos, erros
+
+
+# ===== GRAVAÇÃO =====
+
+def gerar_hashes(senhas, processos=None):
+    """Gera os hashes em paralelo; o custo do PBKDF2 é CPU pura"""
+    if len(senhas) < 50:
+        return [gerar_hash_senha(senha) for senha in senhas]
+    processos = processos or os.cpu_count() or 1
+    tamanho_bloco = max(1, len(senhas) // (processos * 4))
+    # spawn: fork() de um processo com threads (logs, telemetria, executores) pode travar
+    with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return list(executor.map(gerar_hash_senha, senhas, chunksize=tamanho_bloco))
+
+def inserir_alunos(alunos, hashes, tamanho_lote=TAMANHO_LOTE):
+    """Insere Usuario + Aluno em lotes e faz um único commit no fim
+
+    Se algum lote falhar nada é gravado (ErroImportacao).
+    """
+    tabela_usuario = Usuario.__table__
+    tabela_aluno = Aluno.__table__
+
+    try:
+        for i in range(0, len(alunos), tamanho_lote):
+            lote = alunos[i:i + tamanho_lote]
+            db.session.execute(tabela_usuario.insert(), [
+                {'nome': a['nome'], 'email': a['email'], 'senha_hash': h, 'tipo': 'aluno'}
+                for a, h in zip(lote, hashes[i:i + tamanho_lote])
+            ])
+            # O executemany não devolve ids: recupera pelo email (único)
+            ids = dict(db.session.query(Usuario.email, Usuario.id)
+                       .filter(Usuario.email.in_([a['email'] for a in lote])))
+            db.session.execute(tabela_aluno.insert(), [
+                {
+                    'usuario_id': ids[a['email']],
+                    'email_escola': a['email_escola'],
+                    'serie_ano': a['serie_ano'],
+                    'professor_responsavel': a['professor_responsavel'],
+                    'idade': a['idade'],
+                    'questionario_completo': False,
+                    'perfil_gerado': False,
+                }
+                for a in lote
+            ])
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise ErroImportacao(f'Falha ao gravar os alunos; nenhum foi importado ({e.__class__.__name__})')
+    return len(alunos)
+
+def importar_alunos(nome_arquivo, conteudo, professor_padrao=None, ignorar_invalidos=False, processos=None,
+                    limite_linhas=None):
+    """Executa a importação completa e retorna o resumo
+
+    Com erros de validação nada é gravado, a menos que ignorar_invalidos
+    seja True (nesse caso as linhas válidas são importadas). Acima de
+    limite_linhas o arquivo é recusado (ErroImportacao).
+    """
+    inicio = time.perf_counter()
+    registros = ler_planilha(nome_arquivo, conteudo)
+    if limite_linhas and len(registros) > limite_linhas:
+        raise ErroImportacao(f'Arquivo com {len(registros)} alunos: pela web o limite é {limite_linhas}. '
+                             'Divida a lista por turma ou use python importacao_alunos.py <arquivo>')
+    validos, erros = validar_registros(registros, professor_padrao)
+
+    resultado = {
+        'total_linhas': len(registros),
+        'validos': len(validos),
+        'erros': erros,
+        'importados': 0,
+        'credenciais': [],
+    }
+
+    if erros and not ignorar_invalidos:
+        resultado['tempo_s'] = round(time.perf_counter() - inicio, 2)
+        return resultado
+
+    hashes = gerar_hashes([a['senha'] for a in validos], processos)
+    resultado['importados'] = inserir_alunos(validos, hashes)
+    resultado['credenciais'] = [
+        {'nome': a['nome'], 'email': a['email'], 'senha_provisoria': a['senha']}
+        for a in validos if a['senha_provisoria']
+    ]
+    resultado['tempo_s'] = round(time.perf_counter() - inicio, 2)
+    return resultado
+
+def relatorio_erros_csv(erros):
+    """Relatório de erros em CSV (linha, email, campo, mensagem)"""
+    saida = io.StringIO()
+    escritor = csv.DictWriter(saida, fieldnames=['linha', 'email', 'campo', 'mensagem'])
+    escritor.writeheader()
+    escritor.writerows(erros)
+    return saida.getvalue()
+
+
+if __name__ == '__main__':
+    from fabrica import create_app
+
+    parser = argparse.ArgumentParser(description='Importa alunos em massa a partir de CSV/XLSX')
+    parser.add_argument('arquivo', help='lista da turma (.csv ou .xlsx)')
+    parser.add_argument('--professor', help='professor responsável quando a coluna estiver vazia')
+    parser.add_argument('--ignorar-invalidos', action='store_true', help='importa as linhas válidas mesmo havendo erros')
+    parser.add_argument('--processos', type=int, help='processos para gerar os hashes (padrão: nº de CPUs)')
+    parser.add_argument('--relatorio', default='relatorio_importacao.csv', help='arquivo do relatório de erros')
+    parser.add_argument('--credenciais', default='credenciais_provisorias.csv', help='arquivo com as senhas provisórias')
+    args = parser.parse_args()
+
+    with open(args.arquivo, 'rb') as f:
+        conteudo = f.read()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            resultado = importar_alunos(args.arquivo, conteudo, args.professor,
+                                        args.ignorar_invalidos, args.processos)
+        except ErroImportacao as e:
+            print(f"❌ {e}")
+            raise SystemExit(1)
+
+    print(f"\n📥 IMPORTAÇÃO DE ALUNOS: {args.arquivo}")
+    print(f"   Linhas lidas: {resultado['total_linhas']}")
+    print(f"   Válidas: {resultado['validos']}")
+    print(f"   Com erro: {len({e['linha'] for e in resultado['erros']})}")
+    print(f"   Importadas: {resultado['importados']} em {resultado['tempo_s']}s")
+
+    if resultado['erros']:
+        with open(args.relatorio, 'w', encoding='utf-8', newline='') as f:
+            f.write(relatorio_erros_csv(resultado['erros']))
+        print(f"⚠️  Relatório de erros: {args.relatorio}")
+        if not resultado['importados']:
+            print("   Nada foi gravado. Corrija o arquivo ou use --ignorar-invalidos.")
+
+    if resultado['credenciais']:
+        with open(args.credenciais, 'w', encoding='utf-8', newline='') as f:
+            escritor = csv.DictWriter(f, fieldnames=['nome', 'email', 'senha_provisoria'])
+            escritor.writeheader()
+            escritor.writerows(resultado['credenciais'])
+        print(f"🔑 Senhas provisórias: {args.credenciais}")
@@ -1,6 +1,9 @@
-from app import app, db, Usuario, Aluno, Professor, QuestionarioNeuroLearn, PerfilAprendizagem, Atividade, RespostaAluno, AnaliseIA
+from fabrica import create_app
+from modelos import db, Usuario, Aluno, Professor, QuestionarioNeuroLearn, PerfilAprendizagem, Atividade, RespostaAluno, AnaliseIA
 from werkzeug.security import generate_password_hash
 
+app = create_app()
+
 def init_database():
     with app.app_context():
         # Apagar todas as tabelas
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentação de consultas SQL por requisição
+Eventos do SQLAlchemy contam as consultas e somam o tempo de banco de cada
+requisição, agrupando os comandos pelo "formato" (SQL sem os valores).
+O mesmo formato executado muitas vezes numa requisição é o sintoma clássico
+de N+1 (relacionamento lazy acessado dentro de um loop ou template).
+
+- Em debug (ou com INSTRUMENTACAO_SQL_HEADERS=true): headers X-Consultas-SQL,
+  X-Tempo-SQL-ms e X-SQL-Repetidas em todas as respostas
+- Em produção: uma linha de log por requisição no logger 'neurolearn.sql',
+  em nível WARNING quando há suspeita de N+1 ou consultas demais
+"""
+
+import logging
+import os
+import re
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('neurolearn.sql')
+
+# Quantas execuções do mesmo formato numa requisição caracterizam N+1
+LIMITE_REPETICOES = int(os.environ.get('SQL_LIMITE_REPETICOES', 5))
+# Acima deste total de consultas a requisição é registrada como WARNING
+LIMITE_CONSULTAS = int(os.environ.get('SQL_LIMITE_CONSULTAS', 30))
+
+_ESPACOS = re.compile(r'\s+')
+_LISTA_PARAMETROS = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+
+def formato_consulta(statement):
+    """SQL normalizado: espaços colapsados e listas IN (?, ?, ...) reduzidas a (?...)"""
+    return _LISTA_PARAMETROS.sub('(?...)', _ESPACOS.sub(' ', statement).strip())
+
+def _estatisticas_requisicao():
+    if 'sql_consultas' not in g:
+        g.sql_consultas = 0
+        g.sql_tempo_ms = 0.0
+        g.sql_formatos = {}
+    return g
+
+def _antes_execucao(conn, cursor, statement, parameters, context, executemany):
+    # No contexto da execução (e não na conexão do pool): uma consulta que
+    # falha não deixa um início pendurado para a próxima
+    if has_request_context() and context is not None:
+        context._inicio_consulta = time.perf_counter()
+
+def _depois_execucao(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, '_inicio_consulta', None)
+    if inicio is None or not has_request_context():
+        return
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+
+    estado = _estatisticas_requisicao()
+    estado.sql_consultas += 1
+    estado.sql_tempo_ms += duracao_ms
+    formato = formato_consulta(statement)
+    contagem, tempo = estado.sql_formatos.get(formato, (0, 0.0))
+    estado.sql_formatos[formato] = (contagem + 1, tempo + duracao_ms)
+
+def resumo_sql(limite_repeticoes=None):
+    """Resumo da requisição atual: total, tempo e formatos repetidos"""
+    limite = limite_repeticoes or LIMITE_REPETICOES
+    estado = _estatisticas_requisicao()
+    repetidas = sorted(
+        ((contagem, round(tempo, 2), formato)
+         for formato, (contagem, tempo) in estado.sql_formatos.items() if contagem >= limite),
+        reverse=True
+    )
+    return {
+        'consultas': estado.sql_consultas,
+        'tempo_ms': round(estado.sql_tempo_ms, 2),
+        'repetidas': [{'execucoes': c, 'tempo_ms': t, 'sql': f} for c, t, f in repetidas],
+    }
+
+def registrar_instrumentacao_sql(app):
+    """Liga os eventos do SQLAlchemy e o relatório por requisição"""
+    if not event.contains(Engine, 'before_cursor_execute', _antes_execucao):
+        event.listen(Engine, 'before_cursor_execute', _antes_execucao)
+        event.listen(Engine, 'after_cursor_execute', _depois_execucao)
+
+    headers_forcados = os.environ.get('INSTRUMENTACAO_SQL_HEADERS', 'False').lower() == 'true'
+
+    @app.after_request
+    def relatar_consultas_sql(response):
+        resumo = resumo_sql()
+        if app.debug or headers_forcados:
+            response.headers['X-Consultas-SQL'] = str(resumo['consultas'])
+            response.headers['X-Tempo-SQL-ms'] = f"{resumo['tempo_ms']:.2f}"
+            response.headers['X-SQL-Repetidas'] = str(len(resumo['repetidas']))
+
+        suspeita = resumo['repetidas'] or resumo['consultas'] > LIMITE_CONSULTAS
+        nivel = logging.WARNING if suspeita else logging.INFO
+        if logger.isEnabledFor(nivel):
+            logger.log(nivel, 'sql rota=%s metodo=%s status=%s consultas=%d tempo_ms=%.2f repetidas=%d',
+                       request.endpoint, request.method, response.status_code,
+                       resumo['consultas'], resumo['tempo_ms'], len(resumo['repetidas']))
+            for item in resumo['repetidas']:
+                logger.log(nivel, 'sql possivel N+1 rota=%s execucoes=%d tempo_ms=%.2f sql=%s',
+                           request.endpoint, item['execucoes'], item['tempo_ms'], item['sql'][:300])
+        return response
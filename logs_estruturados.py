@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Logs estruturados e assíncronos do NeuroLearn
+A requisição só monta o registro e o coloca numa fila (QueueHandler); uma
+thread de fundo (QueueListener) faz a escrita em stdout, que sob o gunicorn
+pode bloquear quando o pipe está lento. Se a fila encher, os registros
+excedentes são descartados e contados em vez de travar a requisição.
+
+- Uma linha JSON por registro, com request_id, rota e campos extras
+  (LOG_FORMATO=texto para leitura no terminal)
+- Cada requisição recebe um request_id (reaproveita o header X-Request-ID)
+  devolvido na resposta, e gera uma linha de acesso com a duração e o
+  resumo SQL no logger 'neurolearn.http'
+- Níveis por módulo: LOG_NIVEIS="neurolearn.sql=WARNING,neurolearn.http=INFO"
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+NIVEL_PADRAO = os.environ.get('LOG_NIVEL', 'INFO').upper()
+NIVEIS_MODULOS = os.environ.get('LOG_NIVEIS', '')
+FORMATO = os.environ.get('LOG_FORMATO', 'json').lower()
+TAMANHO_FILA = int(os.environ.get('LOG_FILA_MAXIMO', 10000))
+
+# Atributos padrão do LogRecord; o que não estiver aqui veio de extra=
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_estado = {'listener': None, 'handler': None}
+
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro, incluindo os campos passados em extra="""
+
+    def format(self, record):
+        dados = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensagem': record.getMessage(),
+        }
+        for chave, valor in vars(record).items():
+            if chave not in _ATRIBUTOS_PADRAO and not chave.startswith('_'):
+                dados[chave] = valor
+        if record.exc_text:
+            dados['excecao'] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class FormatadorTexto(logging.Formatter):
+    """Formato legível para desenvolvimento: campos extras como chave=valor e o request_id"""
+
+    def format(self, record):
+        linha = f"{datetime.fromtimestamp(record.created).strftime('%H:%M:%S')} {record.levelname:<7} " \
+                f"{record.name}: {record.getMessage()}"
+        extras = [f'{chave}={valor}' for chave, valor in vars(record).items()
+                  if chave not in _ATRIBUTOS_PADRAO and chave not in ('request_id', 'rota') and not chave.startswith('_')]
+        if extras:
+            linha += ' ' + ' '.join(extras)
+        if getattr(record, 'request_id', None):
+            linha += f" [{record.request_id}]"
+        if record.exc_text:
+            linha += '\n' + record.exc_text
+        return linha
+
+
+class FiltroRequisicao(logging.Filter):
+    """Anexa request_id e rota da requisição atual (roda na thread da requisição)"""
+
+    def filter(self, record):
+        from flask import g, has_request_context, request
+
+        if has_request_context() and not hasattr(record, 'request_id'):
+            record.request_id = g.get('request_id')
+            record.rota = request.endpoint
+        return True
+
+
+class HandlerFila(logging.handlers.QueueHandler):
+    """QueueHandler que descarta (e conta) registros quando a fila está cheia"""
+
+    def __init__(self, fila):
+        super().__init__(fila)
+        self.descartados = 0
+
+    def prepare(self, record):
+        # Resolve mensagem e traceback aqui: args e exc_info podem não ser serializáveis
+        # ou mudar depois que a requisição seguir em frente
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+
+def aplicar_niveis(niveis=NIVEIS_MODULOS):
+    """Aplica 'logger=NIVEL,logger=NIVEL' aos loggers correspondentes"""
+    for item in niveis.split(','):
+        if '=' in item:
+            nome, nivel = item.split('=', 1)
+            logging.getLogger(nome.strip()).setLevel(nivel.strip().upper())
+
+def configurar_logs(nivel=NIVEL_PADRAO, formato=FORMATO):
+    """Liga o logger 'neurolearn' à fila e inicia a thread de escrita (uma vez por processo)"""
+    raiz = logging.getLogger('neurolearn')
+    if _estado['handler'] is not None:
+        return _estado['handler']
+
+    saida = logging.StreamHandler(sys.stdout)
+    saida.setFormatter(FormatadorJSON() if formato == 'json' else FormatadorTexto())
+
+    handler = HandlerFila(queue.Queue(TAMANHO_FILA))
+    handler.addFilter(FiltroRequisicao())
+    listener = logging.handlers.QueueListener(handler.queue, saida, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    raiz.addHandler(handler)
+    raiz.setLevel(nivel)
+    raiz.propagate = False
+    aplicar_niveis()
+
+    _estado.update(listener=listener, handler=handler)
+    return handler
+
+def registrar_logs(app):
+    """request_id por requisição e linha de acesso com a duração"""
+    from flask import g, request
+
+    configurar_logs()
+    acesso = logging.getLogger('neurolearn.http')
+
+    @app.before_request
+    def iniciar_log_requisicao():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16]
+        g.inicio_log = time.perf_counter()
+
+    @app.after_request
+    def registrar_acesso(response):
+        inicio = g.get('inicio_log')
+        if inicio is None:
+            return response
+        response.headers['X-Request-ID'] = g.request_id
+        if request.endpoint != 'static' and acesso.isEnabledFor(logging.INFO):
+            acesso.info('requisicao', extra={
+                'metodo': request.method,
+                'caminho': request.path,
+                'status': response.status_code,
+                'duracao_ms': round((time.perf_counter() - inicio) * 1000, 2),
+                'sql_consultas': g.get('sql_consultas', 0),
+                'sql_tempo_ms': round(g.get('sql_tempo_ms', 0.0), 2),
+            })
+        return response
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métricas no formato texto do Prometheus, exportadas em /metrics
+Cada processo (worker) mantém suas métricas em memória, protegidas por um
+lock, e grava periodicamente um snapshot JSON em METRICAS_DIR. Na coleta,
+/metrics junta os snapshots de todos os workers: contadores e histogramas
+são somados; medidores (gauges) de processos que já terminaram são
+descartados. Os snapshots de processos encerrados (ou de um PID reutilizado)
+são somados em encerrados.json e apagados, então o diretório só tem um
+arquivo por worker vivo e os contadores nunca diminuem.
+
+Sem METRICAS_TOKEN, /metrics só atende conexões diretas do localhost.
+
+Métricas principais:
+- neurolearn_requisicao_segundos        latência por rota (histograma)
+- neurolearn_requisicoes_em_andamento   requisições em andamento
+- neurolearn_db_segundos                tempo de banco por rota (histograma)
+- neurolearn_gemini_segundos            latência das chamadas ao Gemini
+- neurolearn_gemini_erros_total         erros do Gemini por tipo (http_429, timeout...)
+- neurolearn_cache_total                acertos/faltas por cache
+- neurolearn_fila_tamanho               profundidade das filas de segundo plano
+- neurolearn_login_etapa_segundos       duração das etapas do login
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos (uso local, um processo só)
+    fcntl = None
+
+DIRETORIO_METRICAS = os.environ.get('METRICAS_DIR') or \
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.metricas')
+# Segundos entre gravações do snapshot de cada processo
+INTERVALO_SNAPSHOT = float(os.environ.get('METRICAS_INTERVALO', 5))
+
+ARQUIVO_ENCERRADOS = 'encerrados.json'
+ARQUIVO_TRAVA = '.trava'
+
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_GEMINI = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0)
+
+_SEPARADOR = '\x1f'
+
+logger = logging.getLogger('neurolearn.metricas')
+
+
+# ===== TIPOS DE MÉTRICA =====
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, registro, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.valores = {}
+        self._lock = registro.lock
+
+    def _chave(self, rotulos):
+        return _SEPARADOR.join(str(rotulos.get(r, '')) for r in self.rotulos)
+
+
+class Contador(_Metrica):
+    tipo = 'counter'
+
+    def inc(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self.valores[chave] = self.valores.get(chave, 0) + valor
+
+
+class Medidor(_Metrica):
+    """Gauge; com funcao, o valor é lido no momento do snapshot"""
+    tipo = 'gauge'
+
+    def __init__(self, registro, nome, ajuda, rotulos=(), funcao=None):
+        super().__init__(registro, nome, ajuda, rotulos)
+        self.funcao = funcao
+
+    def inc(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self.valores[chave] = self.valores.get(chave, 0) + valor
+
+    def dec(self, valor=1, **rotulos):
+        self.inc(-valor, **rotulos)
+
+    def definir(self, valor, **rotulos):
+        with self._lock:
+            self.valores[self._chave(rotulos)] = valor
+
+
+class Histograma(_Metrica):
+    tipo = 'histogram'
+
+    def __init__(self, registro, nome, ajuda, rotulos=(), limites=LIMITES_LATENCIA):
+        super().__init__(registro, nome, ajuda, rotulos)
+        self.limites = tuple(limites)
+
+    def observar(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            dados = self.valores.get(chave)
+            if dados is None:
+                dados = self.valores[chave] = {'baldes': [0] * len(self.limites), 'soma': 0.0, 'contagem': 0}
+            for i, limite in enumerate(self.limites):
+                if valor <= limite:
+                    dados['baldes'][i] += 1
+                    break
+            dados['soma'] += valor
+            dados['contagem'] += 1
+
+
+# ===== REGISTRO =====
+
+class Registro:
+    """Conjunto de métricas do processo e gravação dos snapshots"""
+
+    def __init__(self, diretorio=DIRETORIO_METRICAS):
+        self.lock = threading.Lock()
+        self.metricas = {}
+        self.diretorio = diretorio
+        self._ultimo_snapshot = 0.0
+        # Distingue este processo de um anterior com o mesmo PID
+        self.processo = f'{os.getpid()}-{time.time_ns()}'
+        self._encerrados_verificados = False
+
+    def _registrar(self, metrica):
+        self.metricas[metrica.nome] = metrica
+        return metrica
+
+    def contador(self, nome, ajuda, rotulos=()):
+        return self._registrar(Contador(self, nome, ajuda, rotulos))
+
+    def medidor(self, nome, ajuda, rotulos=(), funcao=None):
+        return self._registrar(Medidor(self, nome, ajuda, rotulos, funcao))
+
+    def histograma(self, nome, ajuda, rotulos=(), limites=LIMITES_LATENCIA):
+        return self._registrar(Histograma(self, nome, ajuda, rotulos, limites))
+
+    def snapshot(self):
+        """Estado atual do processo, serializável em JSON"""
+        for metrica in self.metricas.values():
+            if isinstance(metrica, Medidor) and metrica.funcao:
+                for rotulos, valor in metrica.funcao():
+                    metrica.definir(valor, **rotulos)
+        with self.lock:
+            return {
+                'pid': os.getpid(),
+                'processo': self.processo,
+                'momento': time.time(),
+                'metricas': {
+                    nome: {
+                        'tipo': m.tipo,
+                        'ajuda': m.ajuda,
+                        'rotulos': list(m.rotulos),
+                        'limites': list(getattr(m, 'limites', ())),
+                        'valores': json.loads(json.dumps(m.valores)),
+                    }
+                    for nome, m in self.metricas.items()
+                }
+            }
+
+    def gravar_snapshot(self, forcar=False):
+        """Grava o snapshot do processo se o intervalo passou (escrita atômica)"""
+        agora = time.monotonic()
+        if not forcar and agora - self._ultimo_snapshot < INTERVALO_SNAPSHOT:
+            return
+        self._ultimo_snapshot = agora
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            if not self._encerrados_verificados:
+                # Antes da primeira gravação: um arquivo antigo com o mesmo PID seria sobrescrito
+                self.arquivar_encerrados()
+                self._encerrados_verificados = True
+            self._gravar_json(f'{os.getpid()}.json', self.snapshot())
+        except OSError as e:
+            logger.warning('Erro ao gravar métricas: %s', e)
+
+    def _gravar_json(self, nome, dados):
+        """Escrita atômica (arquivo temporário + os.replace)"""
+        destino = os.path.join(self.diretorio, nome)
+        temporario = f'{destino}.{os.getpid()}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(dados, f)
+        os.replace(temporario, destino)
+
+    def _ler_json(self, nome):
+        try:
+            with open(os.path.join(self.diretorio, nome), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None  # arquivo apagado, sendo substituído ou corrompido
+
+    @contextmanager
+    def _trava(self, exclusiva=True):
+        """Trava entre processos do diretório de snapshots"""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.diretorio, ARQUIVO_TRAVA), 'a') as arquivo:
+            fcntl.flock(arquivo, fcntl.LOCK_EX if exclusiva else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+    def arquivar_encerrados(self):
+        """Soma em encerrados.json os snapshots de processos que terminaram e apaga os arquivos"""
+        if not os.path.isdir(self.diretorio):
+            return 0
+        with self._trava():
+            encerrados = []
+            for nome in os.listdir(self.diretorio):
+                if not nome.endswith('.json') or nome == ARQUIVO_ENCERRADOS:
+                    continue
+                snapshot = self._ler_json(nome)
+                if snapshot is None:
+                    continue
+                if snapshot['pid'] == os.getpid():
+                    if snapshot.get('processo') == self.processo:
+                        continue
+                elif _processo_vivo(snapshot['pid']):
+                    continue
+                encerrados.append((nome, snapshot))
+            if not encerrados:
+                return 0
+            anterior = self._ler_json(ARQUIVO_ENCERRADOS)
+            acumulado = mesclar_snapshots(([anterior] if anterior else []) + [s for _, s in encerrados],
+                                          incluir_gauges=False)
+            self._gravar_json(ARQUIVO_ENCERRADOS, {'pid': None, 'momento': time.time(), 'metricas': acumulado})
+            for nome, _ in encerrados:
+                os.remove(os.path.join(self.diretorio, nome))
+        return len(encerrados)
+
+    def ler_snapshots(self):
+        """Snapshots dos processos vivos e dos encerrados (o do processo atual é sempre o mais recente)"""
+        snapshots = [self.snapshot()]
+        if not os.path.isdir(self.diretorio):
+            return snapshots
+        self.arquivar_encerrados()
+        with self._trava(exclusiva=False):
+            for nome in os.listdir(self.diretorio):
+                if not nome.endswith('.json') or nome == f'{os.getpid()}.json':
+                    continue
+                snapshot = self._ler_json(nome)
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+        return snapshots
+
+
+def _processo_vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def mesclar_snapshots(snapshots, incluir_gauges=True):
+    """Soma contadores e histogramas; gauges só de processos vivos"""
+    resultado = {}
+    for snapshot in snapshots:
+        # pid None: encerrados.json (sem gauges)
+        vivo = incluir_gauges and snapshot['pid'] is not None and \
+            (snapshot['pid'] == os.getpid() or _processo_vivo(snapshot['pid']))
+        for nome, dados in snapshot['metricas'].items():
+            if dados['tipo'] == 'gauge' and not vivo:
+                continue
+            destino = resultado.setdefault(nome, {**dados, 'valores': {}})
+            for chave, valor in dados['valores'].items():
+                if dados['tipo'] == 'histogram':
+                    atual = destino['valores'].setdefault(
+                        chave, {'baldes': [0] * len(dados['limites']), 'soma': 0.0, 'contagem': 0})
+                    atual['baldes'] = [a + b for a, b in zip(atual['baldes'], valor['baldes'])]
+                    atual['soma'] += valor['soma']
+                    atual['contagem'] += valor['contagem']
+                else:
+                    destino['valores'][chave] = destino['valores'].get(chave, 0) + valor
+    return resultado
+
+def _formatar_rotulos(nomes, chave, extra=None):
+    valores = chave.split(_SEPARADOR) if nomes else []
+    pares = [(n, v) for n, v in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    if not pares:
+        return ''
+    escapar = lambda v: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{n}="{escapar(v)}"' for n, v in pares) + '}'
+
+def _formatar_numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+def exportar_texto(metricas):
+    """Formato de exposição em texto do Prometheus (versão 0.0.4)"""
+    linhas = []
+    for nome in sorted(metricas):
+        dados = metricas[nome]
+        linhas.append(f"# HELP {nome} {dados['ajuda']}")
+        linhas.append(f"# TYPE {nome} {dados['tipo']}")
+        for chave in sorted(dados['valores']):
+            valor = dados['valores'][chave]
+            if dados['tipo'] == 'histogram':
+                acumulado = 0
+                for limite, quantidade in zip(dados['limites'], valor['baldes']):
+                    acumulado += quantidade
+                    rotulos = _formatar_rotulos(dados['rotulos'], chave, ('le', _formatar_numero(float(limite))))
+                    linhas.append(f"{nome}_bucket{rotulos} {acumulado}")
+                rotulos = _formatar_rotulos(dados['rotulos'], chave, ('le', '+Inf'))
+                linhas.append(f"{nome}_bucket{rotulos} {valor['contagem']}")
+                rotulos = _formatar_rotulos(dados['rotulos'], chave)
+                linhas.append(f"{nome}_sum{rotulos} {_formatar_numero(float(valor['soma']))}")
+                linhas.append(f"{nome}_count{rotulos} {valor['contagem']}")
+            else:
+                linhas.append(f"{nome}{_formatar_rotulos(dados['rotulos'], chave)} {_formatar_numero(valor)}")
+    return '\n'.join(linhas) + '\n'
+
+
+# ===== MÉTRICAS DA APLICAÇÃO =====
+
+registro = Registro()
+
+requisicao_segundos = registro.histograma(
+    'neurolearn_requisicao_segundos', 'Latência das requisições por rota', ('rota', 'metodo', 'status'))
+requisicoes_em_andamento = registro.medidor(
+    'neurolearn_requisicoes_em_andamento', 'Requisições sendo atendidas no momento')
+db_segundos = registro.histograma(
+    'neurolearn_db_segundos', 'Tempo de banco por requisição, por rota', ('rota',))
+db_consultas_total = registro.contador(
+    'neurolearn_db_consultas_total', 'Consultas SQL executadas, por rota', ('rota',))
+gemini_segundos = registro.histograma(
+    'neurolearn_gemini_segundos', 'Latência das chamadas ao Gemini', ('operacao',), LIMITES_GEMINI)
+gemini_primeiro_token_segundos = registro.histograma(
+    'neurolearn_gemini_primeiro_token_segundos', 'Tempo até o primeiro trecho nas chamadas em streaming',
+    ('operacao',), LIMITES_GEMINI)
+gemini_erros_total = registro.contador(
+    'neurolearn_gemini_erros_total', 'Falhas nas chamadas ao Gemini por tipo', ('operacao', 'tipo'))
+cache_total = registro.contador(
+    'neurolearn_cache_total', 'Consultas aos caches da aplicação', ('cache', 'resultado'))
+login_etapa_segundos = registro.histograma(
+    'neurolearn_login_etapa_segundos', 'Duração de cada etapa do login', ('etapa',))
+
+_filas = {}
+fila_tamanho = registro.medidor(
+    'neurolearn_fila_tamanho', 'Itens aguardando nas filas de segundo plano', ('fila',),
+    funcao=lambda: [({'fila': nome}, funcao()) for nome, funcao in list(_filas.items())])
+
+def registrar_fila(nome, funcao_tamanho):
+    """Expõe a profundidade de uma fila de segundo plano (lida a cada snapshot)"""
+    _filas[nome] = funcao_tamanho
+
+def registrar_cache(cache, acerto):
+    cache_total.inc(cache=cache, resultado='acerto' if acerto else 'falta')
+
+
+def registrar_metricas(app):
+    """Mede as requisições e registra a rota /metrics"""
+    from flask import Response, abort, g, request
+
+    token = os.environ.get('METRICAS_TOKEN')
+
+    @app.before_request
+    def iniciar_medicao():
+        g.inicio_metricas = time.perf_counter()
+        requisicoes_em_andamento.inc()
+
+    @app.after_request
+    def registrar_status(response):
+        g.status_metricas = response.status_code
+        return response
+
+    @app.teardown_request
+    def finalizar_medicao(erro=None):
+        inicio = g.pop('inicio_metricas', None)
+        if inicio is None:
+            return
+        requisicoes_em_andamento.dec()
+        rota = request.endpoint or 'desconhecida'
+        status = g.pop('status_metricas', 500 if erro else 200)
+        requisicao_segundos.observar(time.perf_counter() - inicio, rota=rota, metodo=request.method, status=status)
+
+        if 'sql_consultas' in g:
+            db_segundos.observar(g.sql_tempo_ms / 1000, rota=rota)
+            db_consultas_total.inc(g.sql_consultas, rota=rota)
+
+        registro.gravar_snapshot()
+
+    @app.route('/metrics')
+    def metrics():
+        if token:
+            if request.headers.get('Authorization') != f'Bearer {token}':
+                abort(401)
+        elif request.remote_addr not in ('127.0.0.1', '::1') or \
+                'X-Forwarded-For' in request.headers or 'X-Real-IP' in request.headers:
+            # Sem token só o Prometheus local, sem proxy no meio (o proxy chega como localhost)
+            abort(403)
+        registro.gravar_snapshot(forcar=True)
+        texto = exportar_texto(mesclar_snapshots(registro.ler_snapshots()))
+        return Response(texto, mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -1,14 +1,10 @@
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
 import sqlite3
 import os
 
-# Configuração da aplicação
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///sistema_educacional.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+from fabrica import create_app
 
-db = SQLAlchemy(app)
+# Configuração da aplicação
+app = create_app()
 
 def migrar_banco():
     """Migra o banco de dados adicionando a coluna idade se ela não existir"""
@@ -43,9 +39,58 @@ def migrar_banco():
     finally:
         conn.close()
 
+def migrar_busca_biblioteca():
+    """Cria o índice FTS5 da biblioteca e os triggers que o mantêm"""
+    from busca_biblioteca import criar_indice_busca
+
+    if criar_indice_busca():
+        print("Índice de busca da biblioteca criado e populado.")
+    else:
+        print("Índice de busca da biblioteca já existe.")
+
+def migrar_tags_normalizadas():
+    """Cria as tabelas de tags/perfis-alvo e converte as colunas texto existentes"""
+    from modelos import db
+    from tags import migrar_tags
+
+    db.create_all()
+    resultado = migrar_tags()
+    print(f"Tags normalizadas: {resultado['tags']} tags, {resultado['conteudo_tags']} associações, "
+          f"{resultado['trilha_perfis']} perfis-alvo de trilhas.")
+
+def migrar_vetores_similares():
+    """Cria a tabela de vetores do questionário e calcula os dos alunos existentes"""
+    from modelos import db
+    from alunos_similares import reconstruir_vetores
+
+    db.create_all()
+    print(f"Vetores de alunos semelhantes: {reconstruir_vetores()} alunos.")
+
+def migrar_agregados_turma():
+    """Cria a tabela de agregados por turma e calcula os contadores atuais"""
+    from modelos import db
+    from analytics_turma import reconstruir_agregados
+
+    db.create_all()
+    print(f"Analytics das turmas: {reconstruir_agregados()} contadores.")
+
+def migrar_conversas_assistente():
+    """Cria a tabela de conversas do assistente e liga as interações a ela"""
+    from conversas_assistente import migrar_conversas
+
+    if migrar_conversas():
+        print("Coluna 'conversa_id' adicionada à tabela interacao_assistente.")
+    else:
+        print("Conversas do assistente já configuradas.")
+
 if __name__ == '__main__':
     with app.app_context():
         print("Iniciando migração do banco de dados...")
         migrar_banco()
+        migrar_busca_biblioteca()
+        migrar_tags_normalizadas()
+        migrar_vetores_similares()
+        migrar_agregados_turma()
+        migrar_conversas_assistente()
         print("Migração concluída!")
 
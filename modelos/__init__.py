@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modelos do banco de dados do NeuroLearn
+Podem ser importados sem a aplicação web (rotas, IA, filtros de relatório):
+
+    from fabrica import create_app
+    from modelos import db, Usuario, Aluno
+
+    app = create_app()
+    with app.app_context():
+        print(Aluno.query.count())
+"""
+
+from modelos.base import db
+from modelos.usuarios import (
+    Usuario, Aluno, Professor, ConfiguracaoAcessibilidade, InteracaoAssistente, ConversaAssistente
+)
+from modelos.atividades import Atividade, RespostaAluno, AnaliseIA
+from modelos.neurolearn import (
+    QuestionarioNeuroLearn, VetorPerfilAluno, PerfilAprendizagem, ExecucaoAgrupamento, CentroidePerfil,
+    AgregadoTurma, TestePerfiliCognitivo
+)
+from modelos.estudos import (
+    TrilhaAprendizado, RecomendacaoTrilha, CalculoRecomendacao, ProgressoTrilha, CronogramaEstudo, SessaoEstudo,
+    BibliotecaConteudo, MonitoramentoComportamento, Tag, ConteudoTag, TrilhaPerfilAlvo
+)
+
+__all__ = [
+    'db',
+    'Usuario', 'Aluno', 'Professor', 'ConfiguracaoAcessibilidade', 'InteracaoAssistente', 'ConversaAssistente',
+    'Atividade', 'RespostaAluno', 'AnaliseIA',
+    'QuestionarioNeuroLearn', 'VetorPerfilAluno', 'PerfilAprendizagem', 'ExecucaoAgrupamento',
+    'CentroidePerfil', 'AgregadoTurma', 'TestePerfiliCognitivo',
+    'TrilhaAprendizado', 'RecomendacaoTrilha', 'CalculoRecomendacao', 'ProgressoTrilha', 'CronogramaEstudo', 'SessaoEstudo',
+    'BibliotecaConteudo', 'MonitoramentoComportamento', 'Tag', 'ConteudoTag', 'TrilhaPerfilAlvo',
+]
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modelos de atividades propostas pelos professores e respostas dos alunos
+"""
+
+from datetime import datetime
+
+from modelos.base import db
+
+class Atividade(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    titulo = db.Column(db.String(200), nullable=False)
+    descricao = db.Column(db.Text, nullable=False)
+    tipo = db.Column(db.String(50), nullable=False)  # 'logica', 'memoria', 'criatividade', etc.
+    professor_id = db.Column(db.Integer, db.ForeignKey('professor.id'), nullable=False)
+    data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
+    data_limite = db.Column(db.DateTime)  # Data limite para entrega
+    arquivo_anexo = db.Column(db.String(200))  # Nome do arquivo anexado
+    arquivo_original = db.Column(db.String(200))  # Nome original do arquivo
+    pontuacao_maxima = db.Column(db.Integer, default=100)
+    instrucoes_especiais = db.Column(db.Text)  # Instruções adicionais
+    professor = db.relationship('Professor', backref='atividades')
+
+class RespostaAluno(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False)
+    atividade_id = db.Column(db.Integer, db.ForeignKey('atividade.id'), nullable=False)
+    resposta = db.Column(db.Text, nullable=False)
+    tempo_resposta = db.Column(db.Integer)  # em segundos
+    data_envio = db.Column(db.DateTime, default=datetime.utcnow)
+    aluno = db.relationship('Aluno', backref='respostas')
+    atividade = db.relationship('Atividade', backref='respostas')
+
+class AnaliseIA(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False)
+    tipo_analise = db.Column(db.String(100), nullable=False)
+    resultado = db.Column(db.Text, nullable=False)
+    confianca = db.Column(db.Float)  # 0-1
+    data_analise = db.Column(db.DateTime, default=datetime.utcnow)
+    aluno = db.relationship('Aluno', backref='analises')
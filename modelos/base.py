@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Handle do SQLAlchemy compartilhado pelos modelos
+O vínculo com a aplicação Flask é feito em create_app() (fabrica.py)
+"""
+
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
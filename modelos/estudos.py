@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modelos de trilhas, cronogramas, biblioteca de conteúdo e monitoramento
+"""
+
+from datetime import datetime
+
+from modelos.base import db
+
+class TrilhaAprendizado(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(200), nullable=False)
+    descricao = db.Column(db.Text)
+    tipo_conteudo = db.Column(db.String(50), nullable=False)  # audio, texto, jogo, video
+    nivel_dificuldade = db.Column(db.String(20), nullable=False)  # facil, medio, dificil
+    area_conhecimento = db.Column(db.String(100), nullable=False)  # matematica, portugues, ciencias, etc
+    perfil_alvo = db.Column(db.String(100))  # tipo de perfil mais adequado
+    duracao_estimada = db.Column(db.Integer)  # em minutos
+    url_conteudo = db.Column(db.String(500))
+    arquivo_conteudo = db.Column(db.String(200))
+    ativo = db.Column(db.Boolean, default=True)
+    data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
+
+class RecomendacaoTrilha(db.Model):
+    """Top-N de trilhas por aluno, pré-calculado por recomendacoes_trilhas.py"""
+    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), primary_key=True)
+    posicao = db.Column(db.Integer, primary_key=True)  # 1 = mais recomendada
+    trilha_id = db.Column(db.Integer, db.ForeignKey('trilha_aprendizado.id'), nullable=False)
+    pontuacao = db.Column(db.Float, nullable=False)
+    motivo = db.Column(db.String(20))  # perfil, modalidade, nivel, area
+    data_calculo = db.Column(db.DateTime, default=datetime.utcnow)
+    trilha = db.relationship('TrilhaAprendizado')
+
+class CalculoRecomendacao(db.Model):
+    """Quando a lista do aluno foi calculada (inclusive as vazias, que não têm linha em RecomendacaoTrilha)"""
+    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), primary_key=True)
+    data_calculo = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class ProgressoTrilha(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False)
+    trilha_id = db.Column(db.Integer, db.ForeignKey('trilha_aprendizado.id'), nullable=False)
+    progresso = db.Column(db.Float, default=0.0)  # 0.0 a 100.0
+    tempo_gasto = db.Column(db.Integer, default=0)  # em minutos
+    data_inicio = db.Column(db.DateTime, default=datetime.utcnow)
+    data_conclusao = db.Column(db.DateTime)
+    feedback_aluno = db.Column(db.Text)
+    dificuldade_percebida = db.Column(db.Integer)  # 1-5
+    aluno = db.relationship('Aluno', backref='progressos_trilha')
+    trilha = db.relationship('TrilhaAprendizado', backref='progressos')
+
+class CronogramaEstudo(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False)
+    data_inicio = db.Column(db.Date, nullable=False)
+    data_fim = db.Column(db.Date, nullable=False)
+    objetivo = db.Column(db.String(200), nullable=False)
+    horas_por_dia = db.Column(db.Float, nullable=False)
+    dias_semana = db.Column(db.String(20), nullable=False)  # "1,2,3,4,5" para seg-sex
+    horario_preferido = db.Column(db.String(20))  # "manha", "tarde", "noite"
+    tempo_pausa = db.Column(db.Integer, default=10)  # minutos de pausa
+    tempo_sessao = db.Column(db.Integer, default=25)  # minutos por sessão (pomodoro)
+    lembretes_ativos = db.Column(db.Boolean, default=True)
+    ativo = db.Column(db.Boolean, default=True)
+    aluno = db.relationship('Aluno', backref='cronogramas')
+
+class SessaoEstudo(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    cronograma_id = db.Column(db.Integer, db.ForeignKey('cronograma_estudo.id'), nullable=False)
+    data_sessao = db.Column(db.DateTime, nullable=False)
+    duracao_planejada = db.Column(db.Integer, nullable=False)  # minutos
+    duracao_real = db.Column(db.Integer)  # minutos
+    realizada = db.Column(db.Boolean, default=False)
+    feedback = db.Column(db.Text)
+    nivel_concentracao = db.Column(db.Integer)  # 1-5
+    trilha_estudada = db.Column(db.Integer, db.ForeignKey('trilha_aprendizado.id'))
+    cronograma = db.relationship('CronogramaEstudo', backref='sessoes')
+    trilha = db.relationship('TrilhaAprendizado', backref='sessoes_estudo')
+
+class BibliotecaConteudo(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    titulo = db.Column(db.String(200), nullable=False)
+    descricao = db.Column(db.Text)
+    tipo = db.Column(db.String(50), nullable=False)  # podcast, video, jogo
+    categoria = db.Column(db.String(100), nullable=False)  # matematica, portugues, ciencias, historia, etc
+    nivel_ensino = db.Column(db.String(20))  # fundamental1, fundamental2, medio
+    url_conteudo = db.Column(db.String(500))
+    arquivo_conteudo = db.Column(db.String(200))
+    tem_legenda = db.Column(db.Boolean, default=False)
+    tem_libras = db.Column(db.Boolean, default=False)
+    tem_transcricao = db.Column(db.String(500))  # arquivo de transcrição
+    duracao = db.Column(db.Integer)  # em minutos
+    classificacao_etaria = db.Column(db.String(10))  # livre, 10, 12, 14, 16, 18
+    tags = db.Column(db.String(500))  # tags separadas por vírgula
+    ativo = db.Column(db.Boolean, default=True)
+    data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Índices normalizados das colunas texto (tags, perfil_alvo); mantidos por tags.py
+class Tag(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(80), nullable=False, unique=True)  # normalizada: minúsculas, sem acentos
+    rotulo = db.Column(db.String(80))  # como foi digitada pela primeira vez
+
+class ConteudoTag(db.Model):
+    conteudo_id = db.Column(db.Integer, db.ForeignKey('biblioteca_conteudo.id'), primary_key=True)
+    tag_id = db.Column(db.Integer, db.ForeignKey('tag.id'), primary_key=True)
+    # A chave primária atende "tags do conteúdo"; este índice atende "conteúdos da tag"
+    __table_args__ = (db.Index('ix_conteudo_tag_tag_conteudo', 'tag_id', 'conteudo_id'),)
+
+class TrilhaPerfilAlvo(db.Model):
+    trilha_id = db.Column(db.Integer, db.ForeignKey('trilha_aprendizado.id'), primary_key=True)
+    tipo_perfil = db.Column(db.String(100), primary_key=True)  # normalizado como Tag.nome
+    __table_args__ = (db.Index('ix_trilha_perfil_alvo_perfil_trilha', 'tipo_perfil', 'trilha_id'),)
+
+class MonitoramentoComportamento(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False)
+    data_acao = db.Column(db.DateTime, default=datetime.utcnow)
+    tipo_acao = db.Column(db.String(50), nullable=False)  # login, logout, inicio_atividade, fim_atividade, pausa, erro, acerto
+    contexto = db.Column(db.String(100))  # qual atividade, trilha, etc
+    tempo_gasto = db.Column(db.Integer)  # em segundos
+    dispositivo = db.Column(db.String(50))  # mobile, desktop, tablet
+    resultado = db.Column(db.String(20))  # sucesso, erro, incompleto
+    detalhes = db.Column(db.Text)  # informações adicionais em JSON
+    aluno = db.relationship('Aluno', backref='monitoramentos')
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modelos do questionário NeuroLearn, perfis de aprendizagem e testes cognitivos
+"""
+
+from datetime import datetime
+
+from modelos.base import db
+
+class QuestionarioNeuroLearn(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False)
+    bloco = db.Column(db.Integer, nullable=False)  # 1-7 (blocos temáticos)
+    questao = db.Column(db.Integer, nullable=False)  # 1-67
+    resposta = db.Column(db.Integer, nullable=False)  # 1-5 (escala)
+    data_resposta = db.Column(db.DateTime, default=datetime.utcnow)
+    aluno = db.relationship('Aluno', backref='questionario_respostas')
+
+class VetorPerfilAluno(db.Model):
+    """Respostas do questionário em forma vetorial para busca de alunos semelhantes"""
+    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), primary_key=True)
+    vetor = db.Column(db.LargeBinary, nullable=False)  # float32: 67 respostas + 7 médias de bloco
+    data_atualizacao = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class PerfilAprendizagem(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False, unique=True)
+    perfil_geral = db.Column(db.Text)
+    potenciais_expressivos = db.Column(db.Text)
+    potenciais_cognitivos = db.Column(db.Text)
+    indicios_neurodivergencias = db.Column(db.Text)
+    recomendacoes_professores = db.Column(db.Text)
+    reforco_motivacional = db.Column(db.Text)
+    tipo_perfil = db.Column(db.String(100))  # para filtros do professor
+    data_geracao = db.Column(db.DateTime, default=datetime.utcnow)
+    aluno = db.relationship('Aluno', backref=db.backref('perfil_aprendizagem', uselist=False))
+
+class ExecucaoAgrupamento(db.Model):
+    """Rodada do agrupamento k-means de perfis (agrupamento_perfis.py)"""
+    id = db.Column(db.Integer, primary_key=True)
+    escola = db.Column(db.String(120), nullable=False, default='', index=True)  # '' = todos os alunos
+    periodo = db.Column(db.String(10), nullable=False)  # ex.: 2025.2
+    k = db.Column(db.Integer, nullable=False)
+    total_alunos = db.Column(db.Integer, nullable=False)
+    inercia = db.Column(db.Float)  # soma das distâncias² ao centróide
+    ativa = db.Column(db.Boolean, default=True)  # usada na classificação ao salvar o questionário
+    data_execucao = db.Column(db.DateTime, default=datetime.utcnow)
+    centroides = db.relationship('CentroidePerfil', backref='execucao', order_by='CentroidePerfil.indice',
+                                 cascade='all, delete-orphan')
+
+class CentroidePerfil(db.Model):
+    execucao_id = db.Column(db.Integer, db.ForeignKey('execucao_agrupamento.id'), primary_key=True)
+    indice = db.Column(db.Integer, primary_key=True)  # 0 = maior grupo
+    tipo_perfil = db.Column(db.String(100), nullable=False)
+    medias = db.Column(db.LargeBinary, nullable=False)  # float32[7]: médias dos blocos (1-5)
+    tamanho = db.Column(db.Integer, nullable=False)
+
+class AgregadoTurma(db.Model):
+    """Contadores por turma (série + professor), mantidos a cada gravação por analytics_turma.py"""
+    serie_ano = db.Column(db.String(20), primary_key=True)
+    professor_responsavel = db.Column(db.String(100), primary_key=True)
+    metrica = db.Column(db.String(20), primary_key=True)  # questionario, bloco, resposta, tipo_perfil, consistencia, trilhas
+    item = db.Column(db.String(100), primary_key=True)  # ex.: bloco '3', resposta '12:4'
+    contagem = db.Column(db.Integer, nullable=False, default=0)
+    soma = db.Column(db.Float, nullable=False, default=0.0)
+    soma_quadrados = db.Column(db.Float, nullable=False, default=0.0)
+
+class TestePerfiliCognitivo(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    aluno_id = db.Column(db.Integer, db.ForeignKey('aluno.id'), nullable=False)
+    tipo_teste = db.Column(db.String(50), nullable=False)  # visual, auditivo, sinestesico, logico
+    pontuacao = db.Column(db.Integer, nullable=False)
+    tempo_resposta = db.Column(db.Integer)  # em segundos
+    data_teste = db.Column(db.DateTime, default=datetime.utcnow)
+    resultados_detalhados = db.Column(db.Text)  # JSON com detalhes
+    aluno = db.relationship('Aluno', backref='testes_cognitivos')
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modelos de usuários: contas, perfis de aluno/professor, acessibilidade e assistente
+"""
+
+from datetime import datetime
+
+from modelos.base import db
+
+class Usuario(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(100), unique=True, nullable=False)
+    senha_hash = db.Column(db.String(100), nullable=False)
+    tipo = db.Column(db.String(20), nullable=False)  # 'professor' ou 'aluno'
+    data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Aluno(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    email_escola = db.Column(db.String(100))  # ID da escola ou email escolar
+    serie_ano = db.Column(db.String(20), nullable=False)
+    professor_responsavel = db.Column(db.String(100), nullable=False)
+    idade = db.Column(db.Integer, nullable=False)
+    questionario_completo = db.Column(db.Boolean, default=False)
+    perfil_gerado = db.Column(db.Boolean, default=False)
+    observacoes = db.Column(db.Text)
+    usuario = db.relationship('Usuario', backref=db.backref('aluno_perfil', uselist=False))
+
+class Professor(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    disciplina = db.Column(db.String(100))
+    formacao = db.Column(db.String(200))
+    usuario = db.relationship('Usuario', backref=db.backref('professor_perfil', uselist=False))
+
+class ConfiguracaoAcessibilidade(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False, unique=True)
+    modo_escuro = db.Column(db.Boolean, default=False)
+    alto_contraste = db.Column(db.Boolean, default=False)
+    tamanho_fonte = db.Column(db.String(20), default='normal')  # pequeno, normal, grande, muito-grande
+    audio_leitura = db.Column(db.Boolean, default=False)
+    velocidade_audio = db.Column(db.Float, default=1.0)  # 0.5 a 2.0
+    navegacao_simplificada = db.Column(db.Boolean, default=False)
+    reducao_animacoes = db.Column(db.Boolean, default=False)
+    notificacoes_visuais = db.Column(db.Boolean, default=True)
+    notificacoes_sonoras = db.Column(db.Boolean, default=True)
+    cores_personalizadas = db.Column(db.String(500))  # JSON com cores customizadas
+    usuario = db.relationship('Usuario', backref=db.backref('config_acessibilidade', uselist=False))
+
+class InteracaoAssistente(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    mensagem_usuario = db.Column(db.Text, nullable=False)
+    resposta_assistente = db.Column(db.Text, nullable=False)
+    contexto = db.Column(db.String(100))  # dashboard, atividade, cronograma, etc
+    satisfacao_resposta = db.Column(db.Integer)  # 1-5, avaliação do usuário
+    data_interacao = db.Column(db.DateTime, default=datetime.utcnow)
+    resolveu_duvida = db.Column(db.Boolean)
+    conversa_id = db.Column(db.Integer, db.ForeignKey('conversa_assistente.id'))  # nulo: interação avulsa
+    usuario = db.relationship('Usuario', backref='interacoes_assistente')
+    conversa = db.relationship('ConversaAssistente')
+    # Histórico da conversa: WHERE conversa_id = ? AND id > ? ORDER BY id DESC LIMIT n
+    __table_args__ = (db.Index('ix_interacao_assistente_conversa_id', 'conversa_id', 'id'),)
+
+class ConversaAssistente(db.Model):
+    """Fio de conversa com o assistente: resumo acumulado + turnos recentes (conversas_assistente.py)"""
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    contexto = db.Column(db.String(100))
+    resumo = db.Column(db.Text, nullable=False, default='')
+    resumo_ate_id = db.Column(db.Integer, nullable=False, default=0)  # última InteracaoAssistente no resumo
+    turnos = db.Column(db.Integer, nullable=False, default=0)
+    data_inicio = db.Column(db.DateTime, default=datetime.utcnow)
+    data_atualizacao = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (db.Index('ix_conversa_assistente_usuario_contexto', 'usuario_id', 'contexto', 'data_atualizacao'),)
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfilador de requisições lentas (opt-in, PERFILADOR_ATIVO=true)
+Duas formas de captura, gravadas em PERFILADOR_DIR junto com a rota, os
+parâmetros e o resumo SQL da requisição:
+
+- cProfile em uma fração sorteada das requisições (PERFILADOR_TAXA)
+- Amostragem de pilhas para as demais: uma thread lê a pilha de cada
+  requisição em andamento a cada PERFILADOR_INTERVALO_MS e o resultado só é
+  gravado se a requisição passar de PERFILADOR_LIMITE_MS
+
+Os perfis podem ser vistos em /admin/perfis, liberado apenas para os emails
+listados em PERFILADOR_ADMINS.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+ATIVO = os.environ.get('PERFILADOR_ATIVO', 'False').lower() == 'true'
+DIRETORIO_PERFIS = os.environ.get('PERFILADOR_DIR') or \
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.perfis')
+# Fração das requisições perfiladas com cProfile (0.01 = 1%)
+TAXA_AMOSTRAGEM = float(os.environ.get('PERFILADOR_TAXA', 0.01))
+# Requisições acima deste tempo têm a amostragem de pilhas gravada (0 desliga)
+LIMITE_LENTA_MS = float(os.environ.get('PERFILADOR_LIMITE_MS', 1000))
+INTERVALO_AMOSTRAS_MS = float(os.environ.get('PERFILADOR_INTERVALO_MS', 10))
+# Perfis mantidos em disco; os mais antigos são apagados
+MAXIMO_PERFIS = int(os.environ.get('PERFILADOR_MAXIMO', 200))
+ADMINS = {email.strip().lower() for email in os.environ.get('PERFILADOR_ADMINS', '').split(',') if email.strip()}
+
+PROFUNDIDADE_MAXIMA = 80
+_PARAMETRO_SENSIVEL = re.compile(r'senha|password|token|key|secret', re.IGNORECASE)
+_ID_PERFIL = re.compile(r'^[\w\-]+$')
+
+logger = logging.getLogger('neurolearn.perfilador')
+
+
+# ===== AMOSTRAGEM DE PILHAS =====
+
+def pilha_colapsada(frame):
+    """Pilha no formato 'colapsado' dos flame graphs: raiz;...;folha"""
+    funcoes = []
+    while frame is not None and len(funcoes) < PROFUNDIDADE_MAXIMA:
+        codigo = frame.f_code
+        funcoes.append(f'{os.path.basename(codigo.co_filename)}:{codigo.co_name}')
+        frame = frame.f_back
+    return ';'.join(reversed(funcoes))
+
+class AmostradorPilhas:
+    """Thread única que amostra as pilhas das threads com requisição em andamento"""
+
+    def __init__(self, intervalo_ms=INTERVALO_AMOSTRAS_MS):
+        self.intervalo = intervalo_ms / 1000
+        self._ativos = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _garantir_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._executar, name='perfilador', daemon=True)
+            self._thread.start()
+
+    def iniciar(self, thread_id):
+        with self._lock:
+            self._ativos[thread_id] = Counter()
+            self._garantir_thread()
+
+    def parar(self, thread_id):
+        with self._lock:
+            return self._ativos.pop(thread_id, Counter())
+
+    def _executar(self):
+        while True:
+            time.sleep(self.intervalo)
+            with self._lock:
+                if not self._ativos:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, amostras in self._ativos.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        amostras[pilha_colapsada(frame)] += 1
+
+amostrador = AmostradorPilhas()
+
+
+# ===== RESUMOS =====
+
+def resumo_cprofile(perfil, limite=40):
+    """Funções com maior tempo acumulado"""
+    estatisticas = pstats.Stats(perfil).stats
+    funcoes = sorted(estatisticas.items(), key=lambda item: item[1][3], reverse=True)[:limite]
+    return [{
+        'funcao': f'{os.path.basename(arquivo)}:{linha}({nome})',
+        'chamadas': chamadas,
+        'tempo_proprio_ms': round(proprio * 1000, 2),
+        'tempo_acumulado_ms': round(acumulado * 1000, 2),
+    } for (arquivo, linha, nome), (_, chamadas, proprio, acumulado, _) in funcoes]
+
+def resumo_amostras(amostras, limite=40):
+    """Pilhas mais frequentes e funções em que a thread estava (folha da pilha)"""
+    folhas = Counter()
+    for pilha, quantidade in amostras.items():
+        folhas[pilha.rsplit(';', 1)[-1]] += quantidade
+    return {
+        'total': sum(amostras.values()),
+        'intervalo_ms': INTERVALO_AMOSTRAS_MS,
+        'funcoes': [{'funcao': f, 'amostras': q} for f, q in folhas.most_common(limite)],
+        'pilhas': [{'pilha': p, 'amostras': q} for p, q in amostras.most_common(limite)],
+    }
+
+def parametros_requisicao(request):
+    """Query string e argumentos da rota; do formulário só os nomes dos campos"""
+    consulta = {chave: ('***' if _PARAMETRO_SENSIVEL.search(chave) else valor)
+                for chave, valor in request.args.items()}
+    return {
+        'rota': request.view_args or {},
+        'consulta': consulta,
+        'formulario': sorted(request.form.keys()) if request.method == 'POST' else [],
+    }
+
+
+# ===== ARMAZENAMENTO =====
+
+_sequencia = 0
+_lock_sequencia = threading.Lock()
+
+def _novo_id():
+    global _sequencia
+    with _lock_sequencia:
+        _sequencia += 1
+        return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{_sequencia}"
+
+def gravar_perfil(dados, perfil=None):
+    """Grava o JSON do perfil (e o .prof do cProfile) e apaga os excedentes"""
+    os.makedirs(DIRETORIO_PERFIS, exist_ok=True)
+    dados['id'] = _novo_id()
+    caminho = os.path.join(DIRETORIO_PERFIS, dados['id'])
+    if perfil is not None:
+        perfil.dump_stats(caminho + '.prof')
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(dados, arquivo, ensure_ascii=False)
+    os.replace(temporario, caminho + '.json')
+    limpar_perfis_antigos()
+    return dados['id']
+
+def limpar_perfis_antigos(maximo=MAXIMO_PERFIS):
+    perfis = sorted(nome for nome in os.listdir(DIRETORIO_PERFIS) if nome.endswith('.json'))
+    for nome in perfis[:-maximo] if len(perfis) > maximo else []:
+        for extensao in ('.json', '.prof'):
+            try:
+                os.remove(os.path.join(DIRETORIO_PERFIS, nome[:-5] + extensao))
+            except OSError:
+                pass
+
+def listar_perfis():
+    """Metadados dos perfis gravados, do mais recente para o mais antigo"""
+    if not os.path.isdir(DIRETORIO_PERFIS):
+        return []
+    perfis = []
+    for nome in sorted(os.listdir(DIRETORIO_PERFIS), reverse=True):
+        if nome.endswith('.json'):
+            perfil = carregar_perfil(nome[:-5])
+            if perfil:
+                perfis.append({chave: perfil.get(chave) for chave in
+                               ('id', 'data', 'rota', 'metodo', 'status', 'duracao_ms', 'tipo', 'sql')})
+    return perfis
+
+def carregar_perfil(perfil_id):
+    if not _ID_PERFIL.match(perfil_id):
+        return None
+    try:
+        with open(os.path.join(DIRETORIO_PERFIS, perfil_id + '.json'), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+
+
+# ===== INTEGRAÇÃO COM O FLASK =====
+
+def usuario_admin():
+    """True se o usuário logado está em PERFILADOR_ADMINS"""
+    from flask import session
+    from modelos import Usuario
+
+    if not ADMINS or 'usuario_id' not in session:
+        return False
+    usuario = Usuario.query.get(session['usuario_id'])
+    return usuario is not None and usuario.email.lower() in ADMINS
+
+def registrar_perfilador(app):
+    """Liga a captura (se ativa) e registra o visualizador /admin/perfis"""
+    from flask import abort, g, jsonify, render_template, request, send_from_directory
+    from instrumentacao_sql import resumo_sql
+
+    if ATIVO:
+        @app.before_request
+        def iniciar_perfil():
+            if request.endpoint in ('static', 'metrics') or request.path.startswith('/admin/perfis'):
+                return
+            g.inicio_perfil = time.perf_counter()
+            if random.random() < TAXA_AMOSTRAGEM:
+                perfil = cProfile.Profile()
+                try:
+                    perfil.enable()
+                    g.perfil_cprofile = perfil
+                    return
+                except ValueError:
+                    # Outro perfilador já ativo nesta thread
+                    pass
+            if LIMITE_LENTA_MS > 0:
+                g.perfil_thread = threading.get_ident()
+                amostrador.iniciar(g.perfil_thread)
+
+        @app.after_request
+        def status_perfil(response):
+            g.status_perfil = response.status_code
+            return response
+
+        @app.teardown_request
+        def finalizar_perfil(erro=None):
+            inicio = g.pop('inicio_perfil', None)
+            if inicio is None:
+                return
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            perfil = g.pop('perfil_cprofile', None)
+            thread_id = g.pop('perfil_thread', None)
+            if perfil is not None:
+                perfil.disable()
+            amostras = amostrador.parar(thread_id) if thread_id is not None else None
+
+            if perfil is None and duracao_ms < LIMITE_LENTA_MS:
+                return
+            dados = {
+                'data': datetime.now().isoformat(timespec='seconds'),
+                'rota': request.endpoint,
+                'caminho': request.path,
+                'metodo': request.method,
+                'status': g.pop('status_perfil', 500 if erro else 200),
+                'duracao_ms': round(duracao_ms, 2),
+                'parametros': parametros_requisicao(request),
+                'sql': resumo_sql(),
+            }
+            if perfil is not None:
+                dados['tipo'] = 'cprofile'
+                dados['funcoes'] = resumo_cprofile(perfil)
+            else:
+                dados['tipo'] = 'amostragem'
+                dados['amostras'] = resumo_amostras(amostras)
+            try:
+                gravar_perfil(dados, perfil)
+            except OSError as e:
+                logger.warning('Falha ao gravar perfil de %s: %s', request.endpoint, e)
+
+    @app.route('/admin/perfis')
+    def admin_perfis():
+        if not usuario_admin():
+            abort(404)
+        perfis = listar_perfis()
+        if request.args.get('formato') == 'json':
+            return jsonify(perfis)
+        return render_template('admin_perfis.html', perfis=perfis, perfil=None, ativo=ATIVO)
+
+    @app.route('/admin/perfis/<perfil_id>')
+    def admin_perfil_detalhe(perfil_id):
+        if not usuario_admin():
+            abort(404)
+        perfil = carregar_perfil(perfil_id)
+        if perfil is None:
+            abort(404)
+        if request.args.get('formato') == 'json':
+            return jsonify(perfil)
+        return render_template('admin_perfis.html', perfis=None, perfil=perfil, ativo=ATIVO)
+
+    @app.route('/admin/perfis/<perfil_id>/prof')
+    def admin_perfil_download(perfil_id):
+        """Arquivo do cProfile, para abrir com snakeviz ou pstats"""
+        if not usuario_admin() or not _ID_PERFIL.match(perfil_id):
+            abort(404)
+        return send_from_directory(DIRETORIO_PERFIS, perfil_id + '.prof', as_attachment=True)
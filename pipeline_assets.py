@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline de assets estáticos do NeuroLearn
+- Baixa (vendoriza) Bootstrap e Font Awesome para static/vendor
+- Gera cópias com hash de conteúdo no nome em static/dist
+- Escreve o manifesto usado pelo helper asset_url() dos templates
+- Gera variantes .gz/.br de cada arquivo, servidas pelo middleware de compressão
+
+Uso:
+    python pipeline_assets.py            # baixa o que faltar e constrói static/dist
+    python pipeline_assets.py --forcar   # baixa novamente todas as bibliotecas
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import urllib.request
+
+DIRETORIO_STATIC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIRETORIO_DIST = os.path.join(DIRETORIO_STATIC, 'dist')
+ARQUIVO_MANIFESTO = os.path.join(DIRETORIO_DIST, 'manifest.json')
+
+# Pastas de static/ que entram no pipeline (uploads e logo ficam de fora)
+ORIGENS = ['css', 'js', 'vendor']
+
+# Apenas estes tipos recebem hash no nome; fontes mantêm o nome porque são
+# referenciadas por caminho relativo dentro do CSS do Font Awesome
+EXTENSOES_COM_HASH = {'.css', '.js'}
+
+# Um ano: arquivos com hash no nome nunca mudam de conteúdo
+MAX_AGE_DIST = 365 * 24 * 60 * 60
+
+_FA = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0'
+_BS = 'https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist'
+
+# Caminho em static/ -> URL de origem. Também serve de fallback quando o
+# pipeline ainda não foi executado na máquina de desenvolvimento.
+BIBLIOTECAS_VENDOR = {
+    'vendor/bootstrap-5.1.3/css/bootstrap.min.css': f'{_BS}/css/bootstrap.min.css',
+    'vendor/bootstrap-5.1.3/js/bootstrap.bundle.min.js': f'{_BS}/js/bootstrap.bundle.min.js',
+    'vendor/fontawesome-6.0.0/css/all.min.css': f'{_FA}/css/all.min.css',
+}
+for _fonte in ['fa-solid-900', 'fa-regular-400', 'fa-brands-400', 'fa-v4compatibility']:
+    for _ext in ['woff2', 'ttf']:
+        BIBLIOTECAS_VENDOR[f'vendor/fontawesome-6.0.0/webfonts/{_fonte}.{_ext}'] = f'{_FA}/webfonts/{_fonte}.{_ext}'
+
+
+# ===== CONSTRUÇÃO =====
+
+def baixar_vendor(forcar=False):
+    """Baixa as bibliotecas externas para static/vendor"""
+    for caminho, url in BIBLIOTECAS_VENDOR.items():
+        destino = os.path.join(DIRETORIO_STATIC, caminho)
+        if os.path.exists(destino) and not forcar:
+            continue
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        print(f"⬇️  {url}")
+        with urllib.request.urlopen(url, timeout=30) as resposta:
+            conteudo = resposta.read()
+        with open(destino, 'wb') as f:
+            f.write(conteudo)
+
+def hash_conteudo(conteudo):
+    """Hash curto usado no nome dos arquivos"""
+    return hashlib.sha256(conteudo).hexdigest()[:12]
+
+def construir_dist():
+    """Copia os assets para static/dist com hash no nome e gera o manifesto"""
+    from compressao import gerar_variantes_precomprimidas
+
+    if os.path.exists(DIRETORIO_DIST):
+        shutil.rmtree(DIRETORIO_DIST)
+
+    manifesto = {}
+    for origem in ORIGENS:
+        raiz_origem = os.path.join(DIRETORIO_STATIC, origem)
+        for pasta, _, arquivos in os.walk(raiz_origem):
+            for nome in sorted(arquivos):
+                caminho_absoluto = os.path.join(pasta, nome)
+                relativo = os.path.relpath(caminho_absoluto, DIRETORIO_STATIC).replace(os.sep, '/')
+
+                with open(caminho_absoluto, 'rb') as f:
+                    conteudo = f.read()
+
+                base, extensao = os.path.splitext(relativo)
+                if extensao in EXTENSOES_COM_HASH:
+                    destino = f"{base}.{hash_conteudo(conteudo)}{extensao}"
+                else:
+                    destino = relativo
+
+                caminho_destino = os.path.join(DIRETORIO_DIST, destino)
+                os.makedirs(os.path.dirname(caminho_destino), exist_ok=True)
+                with open(caminho_destino, 'wb') as f:
+                    f.write(conteudo)
+                gerar_variantes_precomprimidas(caminho_destino)
+
+                manifesto[relativo] = f"dist/{destino}"
+
+    with open(ARQUIVO_MANIFESTO, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, indent=2, sort_keys=True)
+
+    return manifesto
+
+
+# ===== USO NA APLICAÇÃO =====
+
+def registrar_assets(app):
+    """Registra asset_url() nos templates e o cache longo para static/dist"""
+    from flask import request, url_for
+
+    estado = {'manifesto': None, 'mtime': None}
+
+    def carregar_manifesto():
+        try:
+            mtime = os.path.getmtime(ARQUIVO_MANIFESTO)
+        except OSError:
+            return {}
+        # Em debug o manifesto é relido quando o pipeline roda de novo
+        if estado['manifesto'] is None or (app.debug and mtime != estado['mtime']):
+            with open(ARQUIVO_MANIFESTO, encoding='utf-8') as f:
+                estado['manifesto'] = json.load(f)
+            estado['mtime'] = mtime
+        return estado['manifesto']
+
+    def asset_url(caminho):
+        """URL de um asset: versão com hash, arquivo local ou CDN como último recurso"""
+        manifesto = carregar_manifesto()
+        if caminho in manifesto:
+            return url_for('static', filename=manifesto[caminho])
+        if os.path.exists(os.path.join(DIRETORIO_STATIC, caminho)):
+            return url_for('static', filename=caminho)
+        if caminho in BIBLIOTECAS_VENDOR:
+            return BIBLIOTECAS_VENDOR[caminho]
+        return url_for('static', filename=caminho)
+
+    app.jinja_env.globals['asset_url'] = asset_url
+
+    @app.after_request
+    def cache_longo_assets(response):
+        if request.path.startswith('/static/dist/') and response.status_code == 200:
+            response.headers['Cache-Control'] = f'public, max-age={MAX_AGE_DIST}, immutable'
+        return response
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Constrói os assets estáticos do NeuroLearn')
+    parser.add_argument('--forcar', action='store_true', help='baixa novamente as bibliotecas externas')
+    parser.add_argument('--sem-download', action='store_true', help='usa apenas o que já está em static/')
+    args = parser.parse_args()
+
+    if not args.sem_download:
+        baixar_vendor(forcar=args.forcar)
+    manifesto = construir_dist()
+    print(f"✅ {len(manifesto)} arquivos em static/dist (manifesto: {ARQUIVO_MANIFESTO})")
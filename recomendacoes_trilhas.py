@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recomendação de trilhas de aprendizagem por aluno
+A pontuação é calculada de uma vez para um bloco de alunos × todas as
+trilhas ativas (matrizes NumPy) e só o top-N de cada aluno é gravado em
+RecomendacaoTrilha; a página de trilhas apenas lê essa lista curta.
+CalculoRecomendacao marca os alunos já calculados, para que uma lista vazia
+(todas as trilhas concluídas, nenhuma compatível) não seja recalculada a
+cada visita.
+
+Componentes da pontuação (pesos em PESOS):
+- perfil:      tipo_perfil do aluno entre os perfis-alvo da trilha
+- modalidade:  testes cognitivos (visual, auditivo, sinestésico, lógico) ou,
+               sem testes, os blocos do questionário correspondentes, contra
+               o tipo de conteúdo da trilha (vídeo, áudio, jogo, texto)
+- nivel:       proximidade entre o nível do aluno (blocos de atenção e
+               aprendizagem) e a dificuldade da trilha
+- area:        áreas das trilhas que o aluno já cursou
+Trilhas concluídas saem da lista; trilhas em andamento ganham um bônus.
+
+Atualização incremental:
+- atualizar_recomendacoes_aluno: perfil, teste cognitivo ou progresso mudou
+- atualizar_recomendacoes_trilha: trilha criada/alterada; só os alunos em
+  que a trilha entraria no top-N são recalculados (em segundo plano)
+
+Uso:
+    python recomendacoes_trilhas.py --recalcular
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from modelos import (
+    db, Aluno, QuestionarioNeuroLearn, PerfilAprendizagem, TestePerfiliCognitivo,
+    TrilhaAprendizado, TrilhaPerfilAlvo, ProgressoTrilha, RecomendacaoTrilha, CalculoRecomendacao
+)
+from tags import normalizar_tag
+
+logger = logging.getLogger('neurolearn.recomendacoes')
+
+TOP_N = int(os.environ.get('RECOMENDACOES_TOP_N', 10))
+# Segundos até a matriz de trilhas ser relida (outros workers criando trilhas)
+TTL_TRILHAS = float(os.environ.get('RECOMENDACOES_TTL_TRILHAS', 300))
+TAMANHO_BLOCO = 500
+
+PESOS = {'perfil': 0.35, 'modalidade': 0.30, 'nivel': 0.15, 'area': 0.20}
+BONUS_EM_ANDAMENTO = 0.10
+
+MODALIDADES = ('visual', 'auditivo', 'sinestesico', 'logico')
+# Bloco do questionário usado como estimativa de cada modalidade quando não há teste
+BLOCO_MODALIDADE = {'visual': 1, 'auditivo': 3, 'sinestesico': 7, 'logico': 4}
+MODALIDADES_CONTEUDO = {
+    'video': {'visual': 1.0, 'auditivo': 0.3},
+    'audio': {'auditivo': 1.0},
+    'jogo': {'sinestesico': 1.0, 'logico': 0.3},
+    'texto': {'logico': 0.7, 'visual': 0.3},
+}
+DIFICULDADES = {'facil': 0.0, 'medio': 0.5, 'dificil': 1.0}
+NUM_BLOCOS = 7
+
+
+# ===== MATRIZ DE TRILHAS =====
+
+class MatrizTrilhas:
+    """Atributos das trilhas ativas em forma vetorial (linhas na ordem de ids)"""
+
+    def __init__(self, trilhas, perfis_alvo):
+        self.ids = np.array([t.id for t in trilhas], dtype=np.int64)
+        self.posicao = {trilha_id: i for i, trilha_id in enumerate(self.ids.tolist())}
+        self.perfis = sorted({perfil for perfis in perfis_alvo.values() for perfil in perfis})
+        self.areas = sorted({normalizar_tag(t.area_conhecimento) for t in trilhas})
+        indice_perfil = {perfil: j for j, perfil in enumerate(self.perfis)}
+        indice_area = {area: j for j, area in enumerate(self.areas)}
+
+        total = len(trilhas)
+        self.matriz_perfis = np.zeros((total, len(self.perfis)), dtype=np.float32)
+        self.modalidades = np.zeros((total, len(MODALIDADES)), dtype=np.float32)
+        self.dificuldade = np.full(total, 0.5, dtype=np.float32)
+        self.matriz_areas = np.zeros((total, len(self.areas)), dtype=np.float32)
+        for i, trilha in enumerate(trilhas):
+            for perfil in perfis_alvo.get(trilha.id, ()):
+                self.matriz_perfis[i, indice_perfil[perfil]] = 1.0
+            for modalidade, peso in MODALIDADES_CONTEUDO.get(normalizar_tag(trilha.tipo_conteudo), {}).items():
+                self.modalidades[i, MODALIDADES.index(modalidade)] = peso
+            self.dificuldade[i] = DIFICULDADES.get(normalizar_tag(trilha.nivel_dificuldade), 0.5)
+            self.matriz_areas[i, indice_area[normalizar_tag(trilha.area_conhecimento)]] = 1.0
+
+    def __len__(self):
+        return len(self.ids)
+
+def carregar_matriz_trilhas():
+    trilhas = TrilhaAprendizado.query.filter(TrilhaAprendizado.ativo == True).order_by(TrilhaAprendizado.id).all()
+    perfis_alvo = {}
+    for trilha_id, tipo_perfil in db.session.query(TrilhaPerfilAlvo.trilha_id, TrilhaPerfilAlvo.tipo_perfil):
+        perfis_alvo.setdefault(trilha_id, []).append(tipo_perfil)
+    return MatrizTrilhas(trilhas, perfis_alvo)
+
+_cache_trilhas = {'matriz': None, 'validade': 0.0}
+_lock_trilhas = threading.Lock()
+
+def obter_matriz_trilhas():
+    with _lock_trilhas:
+        if _cache_trilhas['matriz'] is None or time.monotonic() >= _cache_trilhas['validade']:
+            _cache_trilhas['matriz'] = carregar_matriz_trilhas()
+            _cache_trilhas['validade'] = time.monotonic() + TTL_TRILHAS
+        return _cache_trilhas['matriz']
+
+def invalidar_matriz_trilhas():
+    with _lock_trilhas:
+        _cache_trilhas['matriz'] = None
+
+
+# ===== ATRIBUTOS DOS ALUNOS =====
+
+def _em_blocos(ids, tamanho=900):
+    for inicio in range(0, len(ids), tamanho):
+        yield ids[inicio:inicio + tamanho]
+
+def carregar_alunos(aluno_ids, trilhas):
+    """Atributos de um bloco de alunos, alinhados às colunas da matriz de trilhas"""
+    total = len(aluno_ids)
+    linha = {aluno_id: i for i, aluno_id in enumerate(aluno_ids)}
+    medias = np.full((total, NUM_BLOCOS), np.nan, dtype=np.float32)
+    testes = np.full((total, len(MODALIDADES)), np.nan, dtype=np.float32)
+    perfis = np.zeros((total, len(trilhas.perfis)), dtype=np.float32)
+    areas = np.zeros((total, len(trilhas.areas)), dtype=np.float32)
+    concluidas = np.zeros((total, len(trilhas)), dtype=bool)
+    em_andamento = np.zeros((total, len(trilhas)), dtype=bool)
+    indice_perfil = {perfil: j for j, perfil in enumerate(trilhas.perfis)}
+
+    for ids in _em_blocos(aluno_ids):
+        for aluno_id, bloco, media in db.session.query(
+            QuestionarioNeuroLearn.aluno_id, QuestionarioNeuroLearn.bloco, func.avg(QuestionarioNeuroLearn.resposta)
+        ).filter(QuestionarioNeuroLearn.aluno_id.in_(ids)).group_by(
+            QuestionarioNeuroLearn.aluno_id, QuestionarioNeuroLearn.bloco
+        ):
+            if 1 <= bloco <= NUM_BLOCOS:
+                medias[linha[aluno_id], bloco - 1] = (media - 1) / 4
+
+        for aluno_id, tipo_perfil in db.session.query(
+            PerfilAprendizagem.aluno_id, PerfilAprendizagem.tipo_perfil
+        ).filter(PerfilAprendizagem.aluno_id.in_(ids)):
+            j = indice_perfil.get(normalizar_tag(tipo_perfil))
+            if j is not None:
+                perfis[linha[aluno_id], j] = 1.0
+
+        for aluno_id, tipo_teste, pontuacao in db.session.query(
+            TestePerfiliCognitivo.aluno_id, TestePerfiliCognitivo.tipo_teste, func.max(TestePerfiliCognitivo.pontuacao)
+        ).filter(TestePerfiliCognitivo.aluno_id.in_(ids)).group_by(
+            TestePerfiliCognitivo.aluno_id, TestePerfiliCognitivo.tipo_teste
+        ):
+            modalidade = normalizar_tag(tipo_teste)
+            if modalidade in MODALIDADES:
+                testes[linha[aluno_id], MODALIDADES.index(modalidade)] = min(max(pontuacao, 0), 100) / 100
+
+        for aluno_id, trilha_id, progresso in db.session.query(
+            ProgressoTrilha.aluno_id, ProgressoTrilha.trilha_id, ProgressoTrilha.progresso
+        ).filter(ProgressoTrilha.aluno_id.in_(ids)):
+            j = trilhas.posicao.get(trilha_id)
+            if j is None:
+                continue
+            i = linha[aluno_id]
+            progresso = progresso or 0.0
+            if progresso >= 100.0:
+                concluidas[i, j] = True
+            else:
+                em_andamento[i, j] = True
+            # Histórico de áreas: trilhas cursadas pesam pelo quanto avançaram
+            areas[i] += trilhas.matriz_areas[j] * (0.5 + min(progresso, 100.0) / 200)
+
+    # Sem resposta num bloco: valor neutro
+    medias = np.where(np.isnan(medias), 0.5, medias)
+    estimativa = medias[:, [BLOCO_MODALIDADE[m] - 1 for m in MODALIDADES]]
+    modalidades = np.where(np.isnan(testes), estimativa, testes)
+    nivel = (medias[:, 1] + medias[:, 4]) / 2  # atenção e foco + aprendizagem
+    soma_areas = areas.sum(axis=1, keepdims=True)
+    areas = np.divide(areas, soma_areas, out=np.zeros_like(areas), where=soma_areas > 0)
+
+    return {
+        'perfis': perfis, 'modalidades': modalidades, 'nivel': nivel, 'areas': areas,
+        'concluidas': concluidas, 'em_andamento': em_andamento,
+    }
+
+
+# ===== PONTUAÇÃO =====
+
+def pontuar(alunos, trilhas):
+    """Matriz alunos × trilhas com a pontuação e os componentes ponderados"""
+    pesos_modalidade = trilhas.modalidades.sum(axis=1)
+    pesos_modalidade[pesos_modalidade == 0] = 1.0
+    componentes = {
+        'perfil': PESOS['perfil'] * (alunos['perfis'] @ trilhas.matriz_perfis.T),
+        'modalidade': PESOS['modalidade'] * (alunos['modalidades'] @ trilhas.modalidades.T) / pesos_modalidade,
+        'nivel': PESOS['nivel'] * (1.0 - np.abs(alunos['nivel'][:, None] - trilhas.dificuldade[None, :])),
+        'area': PESOS['area'] * (alunos['areas'] @ trilhas.matriz_areas.T),
+    }
+    pontuacao = sum(componentes.values()) + BONUS_EM_ANDAMENTO * alunos['em_andamento']
+    pontuacao = np.where(alunos['concluidas'], -np.inf, pontuacao).astype(np.float32)
+    return pontuacao, componentes
+
+def melhores(pontuacao, n=TOP_N):
+    """Índices das n maiores pontuações de cada linha, em ordem decrescente"""
+    n = min(n, pontuacao.shape[1])
+    if n == 0:
+        return np.zeros((pontuacao.shape[0], 0), dtype=np.int64)
+    candidatos = np.argpartition(-pontuacao, n - 1, axis=1)[:, :n]
+    ordem = np.argsort(-np.take_along_axis(pontuacao, candidatos, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidatos, ordem, axis=1)
+
+
+# ===== GRAVAÇÃO =====
+
+def recalcular_recomendacoes(aluno_ids=None, tamanho_bloco=TAMANHO_BLOCO, n=TOP_N):
+    """Recalcula e grava o top-N dos alunos informados (todos, se None)"""
+    trilhas = obter_matriz_trilhas()
+    if aluno_ids is None:
+        aluno_ids = [aluno_id for (aluno_id,) in db.session.query(Aluno.id).order_by(Aluno.id)]
+    agora = datetime.utcnow()
+    nomes_componentes = list(PESOS)
+    gravadas = 0
+
+    for inicio in range(0, len(aluno_ids), tamanho_bloco):
+        bloco = list(aluno_ids[inicio:inicio + tamanho_bloco])
+        registros = []
+        if len(trilhas):
+            pontuacao, componentes = pontuar(carregar_alunos(bloco, trilhas), trilhas)
+            escolhidas = melhores(pontuacao, n)
+            pilha = np.stack([componentes[nome] for nome in nomes_componentes])
+            for i, aluno_id in enumerate(bloco):
+                for posicao, j in enumerate(escolhidas[i].tolist(), start=1):
+                    if not np.isfinite(pontuacao[i, j]):
+                        break
+                    registros.append({
+                        'aluno_id': aluno_id,
+                        'posicao': posicao,
+                        'trilha_id': int(trilhas.ids[j]),
+                        'pontuacao': round(float(pontuacao[i, j]), 4),
+                        'motivo': nomes_componentes[int(pilha[:, i, j].argmax())],
+                        'data_calculo': agora,
+                    })
+        for ids in _em_blocos(bloco):
+            RecomendacaoTrilha.query.filter(RecomendacaoTrilha.aluno_id.in_(ids)).delete(synchronize_session=False)
+            CalculoRecomendacao.query.filter(CalculoRecomendacao.aluno_id.in_(ids)).delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(RecomendacaoTrilha, registros)
+        db.session.bulk_insert_mappings(CalculoRecomendacao,
+                                        [{'aluno_id': aluno_id, 'data_calculo': agora} for aluno_id in bloco])
+        db.session.commit()
+        gravadas += len(registros)
+    return gravadas
+
+def atualizar_recomendacoes_aluno(aluno_id):
+    """Perfil, teste ou progresso do aluno mudou: recalcula só a lista dele"""
+    try:
+        recalcular_recomendacoes([aluno_id])
+    except Exception:
+        db.session.rollback()
+        logger.exception('Erro ao atualizar recomendações', extra={'aluno_id': aluno_id})
+
+def alunos_afetados_por_trilha(trilha_id, tamanho_bloco=TAMANHO_BLOCO, n=TOP_N):
+    """Alunos em cuja lista a trilha entraria (ou já está) após a mudança"""
+    trilhas = obter_matriz_trilhas()
+    j = trilhas.posicao.get(trilha_id)
+    atuais = {aluno_id for (aluno_id,) in
+              db.session.query(RecomendacaoTrilha.aluno_id).filter_by(trilha_id=trilha_id)}
+    if j is None:
+        # Trilha desativada/removida: sai da lista de quem a tinha
+        return sorted(atuais)
+
+    limites = dict(db.session.query(RecomendacaoTrilha.aluno_id, func.min(RecomendacaoTrilha.pontuacao))
+                   .group_by(RecomendacaoTrilha.aluno_id)
+                   .having(func.count() >= n))
+    aluno_ids = [aluno_id for (aluno_id,) in db.session.query(Aluno.id).order_by(Aluno.id)]
+    afetados = set(atuais)
+    for inicio in range(0, len(aluno_ids), tamanho_bloco):
+        bloco = aluno_ids[inicio:inicio + tamanho_bloco]
+        pontuacao, _ = pontuar(carregar_alunos(bloco, trilhas), trilhas)
+        coluna = pontuacao[:, j]
+        limite = np.array([limites.get(aluno_id, -np.inf) for aluno_id in bloco], dtype=np.float32)
+        afetados.update(np.array(bloco)[np.isfinite(coluna) & (coluna > limite)].tolist())
+    return sorted(afetados)
+
+def atualizar_recomendacoes_trilha(trilha_id):
+    """Trilha criada ou alterada: recalcula apenas os alunos afetados"""
+    invalidar_matriz_trilhas()
+    try:
+        afetados = alunos_afetados_por_trilha(trilha_id)
+        gravadas = recalcular_recomendacoes(afetados) if afetados else 0
+        logger.info('Recomendações atualizadas pela trilha',
+                    extra={'trilha_id': trilha_id, 'alunos': len(afetados), 'gravadas': gravadas})
+    except Exception:
+        db.session.rollback()
+        logger.exception('Erro ao atualizar recomendações da trilha', extra={'trilha_id': trilha_id})
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='recomendacoes')
+
+def agendar_atualizacao_trilha(app, trilha_id):
+    """Roda atualizar_recomendacoes_trilha fora da requisição"""
+    def tarefa():
+        with app.app_context():
+            try:
+                atualizar_recomendacoes_trilha(trilha_id)
+            finally:
+                db.session.remove()
+    invalidar_matriz_trilhas()
+    return _executor.submit(tarefa)
+
+
+# ===== LEITURA =====
+
+def recomendacoes_do_aluno(aluno_id, limite=TOP_N):
+    """Trilhas recomendadas em ordem; calcula na hora se a lista do aluno nunca foi calculada"""
+    consulta = RecomendacaoTrilha.query.options(joinedload(RecomendacaoTrilha.trilha)).filter(
+        RecomendacaoTrilha.aluno_id == aluno_id
+    ).order_by(RecomendacaoTrilha.posicao).limit(limite)
+    recomendacoes = consulta.all()
+    # Lista vazia já calculada continua vazia até o perfil, um teste ou o progresso mudar
+    if not recomendacoes and CalculoRecomendacao.query.get(aluno_id) is None:
+        atualizar_recomendacoes_aluno(aluno_id)
+        recomendacoes = consulta.all()
+    return [r for r in recomendacoes if r.trilha is not None and r.trilha.ativo]
+
+
+if __name__ == '__main__':
+    import argparse
+    from fabrica import create_app
+
+    parser = argparse.ArgumentParser(description='Recomendações de trilhas pré-calculadas')
+    parser.add_argument('--recalcular', action='store_true', help='recalcula o top-N de todos os alunos')
+    parser.add_argument('--top', type=int, default=TOP_N, help=f'trilhas por aluno (padrão: {TOP_N})')
+    parser.add_argument('--bloco', type=int, default=TAMANHO_BLOCO, help=f'alunos por bloco (padrão: {TAMANHO_BLOCO})')
+    args = parser.parse_args()
+
+    if args.recalcular:
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            inicio = time.perf_counter()
+            gravadas = recalcular_recomendacoes(tamanho_bloco=args.bloco, n=args.top)
+            print(f"✅ {gravadas} recomendações gravadas em {time.perf_counter() - inicio:.2f}s")
+    else:
+        parser.print_help()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor local que imita a API generateContent do Google Gemini
+Permite testar carga e latência dos fluxos de IA (/salvar-questionario,
+/responder-atividade, /conversar-assistente) sem rede e de forma
+reproduzível.
+
+- Latência configurável: fixa, uniforme, normal ou log-normal
+- Taxa de erros 500 e de 429 aleatórios, além de rajadas periódicas de 429
+- Respostas prontas conforme o prompt: perfil de aprendizagem em JSON
+  (opcionalmente cercado por ```json, como o modelo real costuma fazer),
+  análise de atividade em JSON ou texto do assistente
+- streamGenerateContent?alt=sse: a mesma resposta em trechos SSE, o
+  primeiro após a latência sorteada e os demais a cada --intervalo-trecho ms
+
+Uso:
+    python servidor_gemini_stub.py --latencia lognormal:900:0.5 --taxa-erro 0.02
+    GEMINI_URL=http://127.0.0.1:8089/v1beta/models/gemini-2.0-flash:generateContent python app.py
+
+Estatísticas do stub: GET http://127.0.0.1:8089/estatisticas
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TIPOS_PERFIL = ['Pensador Criativo', 'Organizador Metódico', 'Comunicador Social',
+                'Observador Detalhista', 'Perfil Equilibrado']
+
+ROTA_GENERATE = re.compile(r'^/v1beta/models/[\w.\-]+:(generateContent|streamGenerateContent)$')
+PALAVRAS_POR_TRECHO = 4
+
+
+# ===== LATÊNCIA =====
+
+def criar_latencia(especificacao, rng):
+    """Converte 'tipo:parâmetros' (em ms) numa função que sorteia a latência em segundos
+
+    fixa:500 | uniforme:200:1500 | normal:800:200 | lognormal:800:0.5 (mediana, sigma)
+    """
+    partes = especificacao.split(':')
+    tipo, valores = partes[0], [float(v) for v in partes[1:]]
+    if tipo == 'fixa':
+        return lambda: valores[0] / 1000
+    if tipo == 'uniforme':
+        return lambda: rng.uniform(valores[0], valores[1]) / 1000
+    if tipo == 'normal':
+        return lambda: max(0.0, rng.gauss(valores[0], valores[1])) / 1000
+    if tipo == 'lognormal':
+        mu = math.log(valores[0])
+        return lambda: rng.lognormvariate(mu, valores[1]) / 1000
+    raise ValueError(f'Distribuição de latência desconhecida: {tipo}')
+
+
+# ===== RESPOSTAS PRONTAS =====
+
+def resposta_perfil(rng, cercado):
+    tipo = rng.choice(TIPOS_PERFIL)
+    perfil = {
+        'perfil_geral': f'O aluno apresenta um perfil {tipo.lower()}, com boa disposição para aprender.',
+        'potenciais_expressivos': 'Expressa-se bem por meio de atividades práticas e visuais.',
+        'potenciais_cognitivos': 'Destaque em raciocínio lógico e memória visual.',
+        'indicios_neurodivergencias': 'Não há indícios significativos; recomenda-se observação contínua.',
+        'recomendacoes_professores': ['Usar recursos visuais', 'Dividir tarefas longas em etapas',
+                                      'Oferecer feedback frequente'],
+        'reforco_motivacional': 'Você é capaz de grandes conquistas. Continue se dedicando!',
+        'tipo_perfil': tipo,
+    }
+    texto = json.dumps(perfil, ensure_ascii=False, indent=2)
+    return f'```json\n{texto}\n```' if cercado else texto
+
+def resposta_analise(rng):
+    return json.dumps({
+        'padroes_identificados': ['Respostas objetivas', 'Bom tempo de resposta'],
+        'possiveis_neurodivergencias': [],
+        'estrategias_pedagogicas': ['Atividades com desafios progressivos'],
+        'nivel_confianca': rng.randint(55, 90),
+    }, ensure_ascii=False)
+
+def resposta_assistente(rng):
+    return rng.choice([
+        'Ótima pergunta! Vamos pensar juntos, passo a passo.',
+        'Uma boa estratégia é dividir o estudo em blocos curtos de 25 minutos, com pausas.',
+        'Tente reler o enunciado com calma e destacar as palavras mais importantes.',
+    ])
+
+def dividir_trechos(texto, palavras=PALAVRAS_POR_TRECHO):
+    """Quebra o texto em pedaços de algumas palavras, preservando os espaços"""
+    tokens = re.findall(r'\s*\S+\s*', texto) or [texto]
+    return [''.join(tokens[i:i + palavras]) for i in range(0, len(tokens), palavras)]
+
+def gerar_texto(prompt, rng, fracao_cercada):
+    if 'perfil_geral' in prompt:
+        return resposta_perfil(rng, rng.random() < fracao_cercada)
+    if 'Ontopsicologia' in prompt or 'Padrões identificados' in prompt:
+        return resposta_analise(rng)
+    return resposta_assistente(rng)
+
+def corpo_generate(texto, prompt, final=True):
+    candidato = {'content': {'parts': [{'text': texto}], 'role': 'model'}, 'index': 0}
+    if final:
+        candidato['finishReason'] = 'STOP'
+    return {
+        'candidates': [candidato],
+        'usageMetadata': {
+            'promptTokenCount': len(prompt) // 4,
+            'candidatesTokenCount': len(texto) // 4,
+            'totalTokenCount': (len(prompt) + len(texto)) // 4,
+        },
+        'modelVersion': 'gemini-stub',
+    }
+
+def corpo_erro(codigo, status, mensagem):
+    return {'error': {'code': codigo, 'message': mensagem, 'status': status}}
+
+
+# ===== SERVIDOR =====
+
+class EstadoStub:
+    """Configuração e contadores compartilhados entre as threads do servidor"""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.semente)
+        self.lock = threading.Lock()
+        self.latencia = criar_latencia(args.latencia, self.rng)
+        self.inicio = time.monotonic()
+        self.contadores = {'requisicoes': 0, 'ok': 0, 'erro_500': 0, 'erro_429': 0, 'invalidas': 0}
+
+    def contar(self, chave):
+        with self.lock:
+            self.contadores[chave] += 1
+
+    def em_rajada_429(self):
+        """True durante a janela de rajada de cada período (ex.: 5s a cada 60s)"""
+        if not self.args.rajada_429:
+            return False
+        periodo, duracao = (float(v) for v in self.args.rajada_429.split(':'))
+        return (time.monotonic() - self.inicio) % periodo < duracao
+
+    def sortear(self):
+        """Decide o desfecho e a latência da requisição (com o lock, para ser determinístico)"""
+        with self.lock:
+            latencia = self.latencia()
+            sorteio = self.rng.random()
+        if self.em_rajada_429() or sorteio < self.args.taxa_429:
+            return 429, latencia
+        if sorteio < self.args.taxa_429 + self.args.taxa_erro:
+            return 500, latencia
+        return 200, latencia
+
+
+class ManipuladorGemini(BaseHTTPRequestHandler):
+    estado = None
+    protocol_version = 'HTTP/1.1'
+
+    def _responder(self, codigo, corpo):
+        dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(dados)))
+        if codigo == 429:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _responder_stream(self, texto, prompt):
+        """Envia a resposta em eventos SSE, um chunk HTTP por trecho"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        trechos = dividir_trechos(texto)
+        for posicao, trecho in enumerate(trechos):
+            if posicao:
+                time.sleep(self.estado.args.intervalo_trecho / 1000)
+            corpo = corpo_generate(trecho, prompt, final=posicao == len(trechos) - 1)
+            dados = f'data: {json.dumps(corpo, ensure_ascii=False)}\r\n\r\n'.encode('utf-8')
+            self.wfile.write(f'{len(dados):X}\r\n'.encode('ascii') + dados + b'\r\n')
+        self.wfile.write(b'0\r\n\r\n')
+
+    def do_GET(self):
+        if self.path == '/estatisticas':
+            with self.estado.lock:
+                contadores = dict(self.estado.contadores)
+            self._responder(200, contadores)
+        else:
+            self._responder(404, corpo_erro(404, 'NOT_FOUND', 'Rota não encontrada'))
+
+    def do_POST(self):
+        estado = self.estado
+        caminho = self.path.split('?', 1)[0]
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        bruto = self.rfile.read(tamanho) if tamanho else b''
+
+        rota = ROTA_GENERATE.match(caminho)
+        if not rota:
+            self._responder(404, corpo_erro(404, 'NOT_FOUND', 'Rota não encontrada'))
+            return
+
+        estado.contar('requisicoes')
+        try:
+            pedido = json.loads(bruto or b'{}')
+            prompt = ''.join(parte.get('text', '')
+                             for conteudo in pedido['contents']
+                             for parte in conteudo.get('parts', []))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            estado.contar('invalidas')
+            self._responder(400, corpo_erro(400, 'INVALID_ARGUMENT', 'Corpo da requisição inválido'))
+            return
+
+        codigo, latencia = estado.sortear()
+        time.sleep(latencia)
+
+        if codigo == 429:
+            estado.contar('erro_429')
+            self._responder(429, corpo_erro(429, 'RESOURCE_EXHAUSTED', 'Resource has been exhausted (e.g. check quota).'))
+        elif codigo == 500:
+            estado.contar('erro_500')
+            self._responder(500, corpo_erro(500, 'INTERNAL', 'An internal error has occurred.'))
+        else:
+            with estado.lock:
+                texto = gerar_texto(prompt, estado.rng, estado.args.cercado)
+            estado.contar('ok')
+            if rota.group(1) == 'streamGenerateContent':
+                self._responder_stream(texto, prompt)
+            else:
+                self._responder(200, corpo_generate(texto, prompt))
+
+    def log_message(self, formato, *args):
+        if not self.estado.args.silencioso:
+            super().log_message(formato, *args)
+
+
+def criar_servidor(args):
+    ManipuladorGemini.estado = EstadoStub(args)
+    return ThreadingHTTPServer((args.host, args.porta), ManipuladorGemini)
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description='Servidor local que imita a API do Gemini')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8089)
+    parser.add_argument('--latencia', default='lognormal:800:0.5',
+                        help='fixa:MS | uniforme:MIN:MAX | normal:MEDIA:DESVIO | lognormal:MEDIANA:SIGMA (padrão: lognormal:800:0.5)')
+    parser.add_argument('--taxa-erro', type=float, default=0.0, help='fração de respostas 500 (padrão: 0)')
+    parser.add_argument('--taxa-429', type=float, default=0.0, help='fração de respostas 429 aleatórias (padrão: 0)')
+    parser.add_argument('--rajada-429', help='PERIODO:DURACAO em segundos, ex.: 60:5 = 5s de 429 a cada minuto')
+    parser.add_argument('--cercado', type=float, default=0.5,
+                        help='fração de perfis em JSON cercados por ```json (padrão: 0.5)')
+    parser.add_argument('--intervalo-trecho', type=float, default=60,
+                        help='ms entre os trechos das respostas em streaming (padrão: 60)')
+    parser.add_argument('--semente', type=int, default=42, help='semente dos sorteios (padrão: 42)')
+    parser.add_argument('--silencioso', action='store_true', help='não registra cada requisição')
+    return parser
+
+
+if __name__ == '__main__':
+    args = criar_parser().parse_args()
+    servidor = criar_servidor(args)
+    url = f'http://{args.host}:{args.porta}/v1beta/models/gemini-2.0-flash:generateContent'
+    print(f"🤖 Stub do Gemini em http://{args.host}:{args.porta}")
+    print(f"   Latência: {args.latencia}  |  erros 500: {args.taxa_erro:.1%}  |  429: {args.taxa_429:.1%}"
+          + (f"  |  rajadas 429: {args.rajada_429}" if args.rajada_429 else ''))
+    print(f"   Aponte a aplicação com: GEMINI_URL={url}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stub encerrado")
@@ -0,0 +1,260 @@
+// Sistema de modo escuro e acessibilidade
+
+// O template base marca o <body> com data-logado (este arquivo é estático)
+function usuarioLogado() {
+    return document.body.dataset.logado === 'true';
+}
+
+// Tamanhos de fonte da interface -> valores gravados em ConfiguracaoAcessibilidade
+const TAMANHOS_FONTE_SERVIDOR = {
+    'small': 'pequeno',
+    'normal': 'normal',
+    'large': 'grande',
+    'extra-large': 'muito-grande'
+};
+
+// Configurações do usuário embutidas pelo servidor em base.html (null se não houver)
+function lerConfiguracoesServidor() {
+    const elemento = document.getElementById('config-acessibilidade');
+    if (!elemento) {
+        return null;
+    }
+    try {
+        return JSON.parse(elemento.textContent);
+    } catch (error) {
+        return null;
+    }
+}
+
+class AccessibilityManager {
+    constructor() {
+        this.loadSettings();
+        this.applySettings();
+        this.bindEvents();
+    }
+    
+    loadSettings() {
+        // Carregar configurações do localStorage ou servidor
+        this.settings = {
+            darkMode: localStorage.getItem('darkMode') === 'true',
+            highContrast: localStorage.getItem('highContrast') === 'true',
+            fontSize: localStorage.getItem('fontSize') || 'normal',
+            reduceAnimations: localStorage.getItem('reduceAnimations') === 'true',
+            simpleNavigation: localStorage.getItem('simpleNavigation') === 'true'
+        };
+        
+        // Se usuário logado, usar as configurações já embutidas no HTML pelo servidor
+        const serverSettings = lerConfiguracoesServidor();
+        if (serverSettings) {
+            this.settings = { ...this.settings, ...serverSettings };
+        }
+    }
+    
+    applySettings() {
+        const html = document.documentElement;
+        const body = document.body;
+        
+        // Modo escuro
+        if (this.settings.darkMode) {
+            html.setAttribute('data-theme', 'dark');
+            this.updateDarkModeButton(true);
+        } else {
+            html.setAttribute('data-theme', 'light');
+            this.updateDarkModeButton(false);
+        }
+        
+        // Alto contraste
+        body.classList.toggle('high-contrast', this.settings.highContrast);
+        
+        // Tamanho da fonte
+        body.classList.remove('font-small', 'font-normal', 'font-large', 'font-extra-large');
+        body.classList.add(`font-${this.settings.fontSize}`);
+        
+        // Redução de animações
+        body.classList.toggle('reduce-animations', this.settings.reduceAnimations);
+        
+        // Navegação simplificada
+        const navbar = document.querySelector('.navbar');
+        if (navbar) {
+            navbar.classList.toggle('simple-navigation', this.settings.simpleNavigation);
+        }
+    }
+    
+    updateDarkModeButton(isDark) {
+        const icon = document.getElementById('darkModeIcon');
+        if (icon) {
+            icon.className = isDark ? 'fas fa-sun' : 'fas fa-moon';
+        }
+    }
+    
+    toggleDarkMode() {
+        this.settings.darkMode = !this.settings.darkMode;
+        this.saveSettings();
+        this.applySettings();
+    }
+    
+    saveSettings() {
+        // Salvar no localStorage
+        for (const [key, value] of Object.entries(this.settings)) {
+            localStorage.setItem(key, value);
+        }
+        
+        // Se usuário logado, salvar no servidor
+        if (usuarioLogado()) {
+            this.saveServerSettings();
+        }
+    }
+    
+    async saveServerSettings() {
+        try {
+            await fetch('/salvar-configuracoes-acessibilidade', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    modo_escuro: this.settings.darkMode,
+                    alto_contraste: this.settings.highContrast,
+                    tamanho_fonte: TAMANHOS_FONTE_SERVIDOR[this.settings.fontSize] || 'normal',
+                    reducao_animacoes: this.settings.reduceAnimations,
+                    navegacao_simplificada: this.settings.simpleNavigation
+                })
+            });
+        } catch (error) {
+            console.log('Erro ao salvar configurações no servidor');
+        }
+    }
+    
+    bindEvents() {
+        // Atalhos de teclado para acessibilidade
+        document.addEventListener('keydown', (e) => {
+            // Ctrl + Shift + D = Toggle modo escuro
+            if (e.ctrlKey && e.shiftKey && e.key === 'D') {
+                e.preventDefault();
+                this.toggleDarkMode();
+            }
+            
+            // Ctrl + Shift + = = Aumentar fonte
+            if (e.ctrlKey && e.shiftKey && e.key === '+') {
+                e.preventDefault();
+                this.increaseFontSize();
+            }
+            
+            // Ctrl + Shift + - = Diminuir fonte
+            if (e.ctrlKey && e.shiftKey && e.key === '-') {
+                e.preventDefault();
+                this.decreaseFontSize();
+            }
+        });
+    }
+    
+    increaseFontSize() {
+        const sizes = ['small', 'normal', 'large', 'extra-large'];
+        const currentIndex = sizes.indexOf(this.settings.fontSize);
+        if (currentIndex < sizes.length - 1) {
+            this.settings.fontSize = sizes[currentIndex + 1];
+            this.saveSettings();
+            this.applySettings();
+        }
+    }
+    
+    decreaseFontSize() {
+        const sizes = ['small', 'normal', 'large', 'extra-large'];
+        const currentIndex = sizes.indexOf(this.settings.fontSize);
+        if (currentIndex > 0) {
+            this.settings.fontSize = sizes[currentIndex - 1];
+            this.saveSettings();
+            this.applySettings();
+        }
+    }
+}
+
+// Inicializar gerenciador de acessibilidade
+let accessibilityManager;
+
+document.addEventListener('DOMContentLoaded', function() {
+    accessibilityManager = new AccessibilityManager();
+});
+
+// Função global para toggle do modo escuro
+function toggleDarkMode() {
+    if (accessibilityManager) {
+        accessibilityManager.toggleDarkMode();
+    }
+}
+
+// Função para mostrar loading
+function showLoading(element) {
+    const originalText = element.innerHTML;
+    element.innerHTML = '<span class="loading-spinner me-2"></span>Carregando...';
+    element.disabled = true;
+    return originalText;
+}
+
+function hideLoading(element, originalText) {
+    element.innerHTML = originalText;
+    element.disabled = false;
+}
+
+// Melhorar experiência de formulários
+document.addEventListener('DOMContentLoaded', function() {
+    // Auto-focus no primeiro campo de formulário
+    const firstInput = document.querySelector('form input:not([type="hidden"]):first-of-type');
+    if (firstInput && !window.location.hash) {
+        firstInput.focus();
+    }
+    
+    // Validação em tempo real
+    const forms = document.querySelectorAll('form');
+    forms.forEach(form => {
+        const inputs = form.querySelectorAll('input, select, textarea');
+        inputs.forEach(input => {
+            input.addEventListener('blur', function() {
+                if (this.checkValidity()) {
+                    this.classList.remove('is-invalid');
+                    this.classList.add('is-valid');
+                } else {
+                    this.classList.remove('is-valid');
+                    this.classList.add('is-invalid');
+                }
+            });
+        });
+    });
+});
+
+// Notificações melhoradas
+function showNotification(message, type = 'info', duration = 5000) {
+    const alertDiv = document.createElement('div');
+    alertDiv.className = `alert alert-${type} alert-dismissible fade show position-fixed`;
+    alertDiv.style.cssText = 'top: 20px; right: 20px; z-index: 9999; min-width: 300px;';
+    alertDiv.innerHTML = `
+        ${message}
+        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+    `;
+    
+    document.body.appendChild(alertDiv);
+    
+    // Auto-remover após duração especificada
+    setTimeout(() => {
+        if (alertDiv.parentNode) {
+            alertDiv.remove();
+        }
+    }, duration);
+}
+
+// Interceptar erros de carregamento de imagem
+document.addEventListener('DOMContentLoaded', function() {
+    const images = document.querySelectorAll('img');
+    images.forEach(img => {
+        img.addEventListener('error', function() {
+            // Fallback para ícone se imagem não carregar
+            if (this.classList.contains('logo')) {
+                this.style.display = 'none';
+                const fallback = this.nextElementSibling;
+                if (fallback && fallback.tagName === 'I') {
+                    fallback.style.display = 'inline';
+                }
+            }
+        });
+    });
+});
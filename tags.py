@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tags da biblioteca e perfis-alvo das trilhas em tabelas normalizadas
+As colunas texto (BibliotecaConteudo.tags, TrilhaAprendizado.perfil_alvo)
+continuam sendo a fonte editada pelos formulários; daqui saem as tabelas
+Tag/ConteudoTag e TrilhaPerfilAlvo, indexadas, usadas nas consultas.
+Comparar valores normalizados também elimina os falsos positivos do
+LIKE '%...%' (ex.: 'arte' casando com 'astronomia-e-artes').
+
+- normalizar_tag: minúsculas, sem acentos e espaços colapsados
+- sincronizar_*: regrava as associações de um conteúdo/trilha (sem commit)
+- filtrar_por_tags / trilhas_para_perfil: consultas por índice
+- migrar_tags: reconstrói tudo a partir das colunas texto
+
+Uso:
+    python tags.py --migrar
+"""
+
+import re
+import unicodedata
+
+from sqlalchemy import func
+
+from modelos import db, BibliotecaConteudo, TrilhaAprendizado, Tag, ConteudoTag, TrilhaPerfilAlvo
+
+_SEPARADORES = re.compile(r'[,;]')
+_ESPACOS = re.compile(r'\s+')
+TAMANHO_LOTE = 1000
+TAMANHO_TAG = 80  # Tag.nome / Tag.rotulo
+
+
+# ===== NORMALIZAÇÃO =====
+
+def normalizar_tag(texto):
+    """'  Matemática  Básica ' -> 'matematica basica'"""
+    sem_acentos = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode('ascii')
+    return _ESPACOS.sub(' ', sem_acentos).strip().lower()
+
+def nome_tag(texto):
+    """Nome normalizado já no tamanho da coluna (tags longas com o mesmo início são a mesma)"""
+    return normalizar_tag(texto)[:TAMANHO_TAG].rstrip()
+
+def separar_tags(texto):
+    """Lista (nome normalizado, rótulo original) sem repetições, na ordem digitada"""
+    vistos = {}
+    for parte in _SEPARADORES.split(texto or ''):
+        nome = nome_tag(parte)
+        if nome and nome not in vistos:
+            vistos[nome] = parte.strip()[:TAMANHO_TAG]
+    return list(vistos.items())
+
+def obter_ids_tags(tags, criar=False):
+    """{nome: id} das tags informadas ([(nome, rótulo)] ou [nome]); cria as que faltam se criar=True"""
+    rotulos = dict(tag if isinstance(tag, tuple) else (nome_tag(tag), tag[:TAMANHO_TAG]) for tag in tags)
+    if not rotulos:
+        return {}
+    ids = {}
+    nomes = list(rotulos)
+    for inicio in range(0, len(nomes), 900):
+        ids.update(db.session.query(Tag.nome, Tag.id).filter(Tag.nome.in_(nomes[inicio:inicio + 900])))
+    faltando = [nome for nome in rotulos if nome not in ids]
+    if criar and faltando:
+        novas = [Tag(nome=nome, rotulo=rotulos[nome]) for nome in faltando]
+        db.session.add_all(novas)
+        db.session.flush()
+        ids.update((tag.nome, tag.id) for tag in novas)
+    return ids
+
+
+# ===== SINCRONIZAÇÃO =====
+
+def sincronizar_tags_conteudo(conteudo):
+    """Regrava ConteudoTag a partir de conteudo.tags (o chamador faz o commit)"""
+    if conteudo.id is None:
+        db.session.flush()
+    ids = obter_ids_tags(separar_tags(conteudo.tags), criar=True)
+    ConteudoTag.query.filter_by(conteudo_id=conteudo.id).delete(synchronize_session=False)
+    db.session.bulk_insert_mappings(ConteudoTag, [
+        {'conteudo_id': conteudo.id, 'tag_id': tag_id} for tag_id in ids.values()
+    ])
+
+def sincronizar_perfis_trilha(trilha):
+    """Regrava TrilhaPerfilAlvo a partir de trilha.perfil_alvo (o chamador faz o commit)"""
+    if trilha.id is None:
+        db.session.flush()
+    TrilhaPerfilAlvo.query.filter_by(trilha_id=trilha.id).delete(synchronize_session=False)
+    db.session.bulk_insert_mappings(TrilhaPerfilAlvo, [
+        {'trilha_id': trilha.id, 'tipo_perfil': nome} for nome, _ in separar_tags(trilha.perfil_alvo)
+    ])
+
+
+# ===== CONSULTAS =====
+
+def filtrar_por_tags(query, tags, todas=False):
+    """Restringe uma consulta de BibliotecaConteudo às tags informadas
+
+    todas=False: conteúdos com qualquer uma das tags
+    todas=True: conteúdos com todas as tags (tag inexistente = nenhum resultado)
+    """
+    nomes = sorted({nome_tag(tag) for tag in tags if nome_tag(tag)})
+    if not nomes:
+        return query
+    ids = obter_ids_tags(nomes)
+    if todas and len(ids) < len(nomes):
+        return query.filter(db.false())
+
+    conteudos = db.session.query(ConteudoTag.conteudo_id).filter(ConteudoTag.tag_id.in_(list(ids.values())))
+    if todas:
+        conteudos = conteudos.group_by(ConteudoTag.conteudo_id).having(func.count() == len(ids))
+    return query.filter(BibliotecaConteudo.id.in_(conteudos))
+
+def trilhas_para_perfil(tipo_perfil, somente_ativas=True):
+    """Trilhas cujo perfil-alvo é exatamente o tipo de perfil informado"""
+    query = TrilhaAprendizado.query.join(
+        TrilhaPerfilAlvo, TrilhaPerfilAlvo.trilha_id == TrilhaAprendizado.id
+    ).filter(TrilhaPerfilAlvo.tipo_perfil == normalizar_tag(tipo_perfil))
+    if somente_ativas:
+        query = query.filter(TrilhaAprendizado.ativo == True)
+    return query
+
+
+# ===== MIGRAÇÃO =====
+
+def migrar_tags(tamanho_lote=TAMANHO_LOTE):
+    """Reconstrói Tag/ConteudoTag e TrilhaPerfilAlvo a partir das colunas texto
+
+    Idempotente: as associações são apagadas e regravadas em lote; tags já
+    existentes mantêm o id. Retorna as quantidades gravadas.
+    """
+    conteudos = [(conteudo_id, separar_tags(texto)) for conteudo_id, texto in
+                 db.session.query(BibliotecaConteudo.id, BibliotecaConteudo.tags)]
+    todas = {}
+    for _, tags in conteudos:
+        for nome, rotulo in tags:
+            todas.setdefault(nome, rotulo)
+    ids = obter_ids_tags(list(todas.items()), criar=True)
+
+    ConteudoTag.query.delete(synchronize_session=False)
+    pares = [{'conteudo_id': conteudo_id, 'tag_id': ids[nome]}
+             for conteudo_id, tags in conteudos for nome, _ in tags]
+    for inicio in range(0, len(pares), tamanho_lote):
+        db.session.bulk_insert_mappings(ConteudoTag, pares[inicio:inicio + tamanho_lote])
+
+    TrilhaPerfilAlvo.query.delete(synchronize_session=False)
+    perfis = [{'trilha_id': trilha_id, 'tipo_perfil': nome}
+              for trilha_id, texto in db.session.query(TrilhaAprendizado.id, TrilhaAprendizado.perfil_alvo)
+              for nome, _ in separar_tags(texto)]
+    for inicio in range(0, len(perfis), tamanho_lote):
+        db.session.bulk_insert_mappings(TrilhaPerfilAlvo, perfis[inicio:inicio + tamanho_lote])
+
+    db.session.commit()
+    return {'tags': len(ids), 'conteudo_tags': len(pares), 'trilha_perfis': len(perfis)}
+
+
+if __name__ == '__main__':
+    import argparse
+    from fabrica import create_app
+
+    parser = argparse.ArgumentParser(description='Tabelas normalizadas de tags e perfis-alvo')
+    parser.add_argument('--migrar', action='store_true', help='cria as tabelas e reconstrói as associações')
+    args = parser.parse_args()
+
+    if args.migrar:
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            resultado = migrar_tags()
+            print(f"✅ {resultado['tags']} tags, {resultado['conteudo_tags']} associações de conteúdo, "
+                  f"{resultado['trilha_perfis']} perfis-alvo de trilhas")
+    else:
+        parser.print_help()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Telemetria assíncrona de comportamento do NeuroLearn
+Eventos como login/logout entram numa fila em memória e uma thread de fundo
+grava em lote na tabela MonitoramentoComportamento, fora do caminho da
+requisição. Se a fila encher (banco lento), novos eventos são descartados e
+contados em vez de atrasar o aluno.
+"""
+
+import json
+import logging
+import queue
+import threading
+from datetime import datetime
+
+from modelos import db, MonitoramentoComportamento
+from metricas import registro, registrar_fila
+
+logger = logging.getLogger('neurolearn.telemetria')
+
+telemetria_descartados_total = registro.contador(
+    'neurolearn_telemetria_descartados_total', 'Eventos de telemetria descartados com a fila cheia')
+
+def detectar_dispositivo(user_agent):
+    """Classificação simplificada do dispositivo pelo User-Agent"""
+    if 'Mobile' in user_agent:
+        return 'mobile'
+    elif 'Tablet' in user_agent:
+        return 'tablet'
+    return 'desktop'
+
+
+class FilaTelemetria:
+    """Fila de eventos gravada em lote por uma thread daemon"""
+
+    def __init__(self, tamanho_maximo=10000, tamanho_lote=200, intervalo=1.0):
+        self.fila = queue.Queue(maxsize=tamanho_maximo)
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.descartados = 0
+        self.gravados = 0
+        self.app = None
+        self._thread = None
+        self._lock = threading.Lock()
+        registrar_fila('telemetria', self.tamanho)
+
+    def iniciar(self, app):
+        """Associa a aplicação e inicia a thread de gravação (uma vez por processo)"""
+        self.app = app
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._executar, name='telemetria', daemon=True)
+                self._thread.start()
+
+    def registrar(self, aluno_id, tipo_acao, contexto, user_agent='', tempo_gasto=None,
+                  resultado='sucesso', detalhes=None):
+        """Enfileira um evento; nunca bloqueia a requisição"""
+        evento = {
+            'aluno_id': aluno_id,
+            'data_acao': datetime.utcnow(),
+            'tipo_acao': tipo_acao,
+            'contexto': contexto,
+            'tempo_gasto': tempo_gasto,
+            'dispositivo': detectar_dispositivo(user_agent or ''),
+            'resultado': resultado,
+            'detalhes': json.dumps(detalhes) if detalhes else None,
+        }
+        try:
+            self.fila.put_nowait(evento)
+        except queue.Full:
+            self.descartados += 1
+            telemetria_descartados_total.inc()
+
+    def tamanho(self):
+        return self.fila.qsize()
+
+    def _executar(self):
+        while True:
+            lote = [self.fila.get()]
+            # Junta o que chegar durante o intervalo, até o tamanho do lote
+            try:
+                while len(lote) < self.tamanho_lote:
+                    lote.append(self.fila.get(timeout=self.intervalo))
+            except queue.Empty:
+                pass
+            self._gravar(lote)
+
+    def _gravar(self, lote):
+        with self.app.app_context():
+            try:
+                db.session.bulk_insert_mappings(MonitoramentoComportamento, lote)
+                db.session.commit()
+                self.gravados += len(lote)
+            except Exception:
+                db.session.rollback()
+                logger.exception('Erro ao gravar telemetria', extra={'eventos': len(lote)})
+            finally:
+                db.session.remove()
+
+
+# Instância única por processo
+telemetria = FilaTelemetria()
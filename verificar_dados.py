@@ -4,7 +4,10 @@ import os
 # Adicionar o diretório do projeto ao path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app import app, db, Usuario, Aluno, Professor, QuestionarioNeuroLearn, PerfilAprendizagem
+from fabrica import create_app
+from modelos import db, Usuario, Aluno, Professor, QuestionarioNeuroLearn, PerfilAprendizagem
+
+app = create_app()
 
 def verificar_dados():
     """Verifica se os dados de teste foram criados corretamente"""